@@ -4,11 +4,12 @@ import discord
 from discord import NotFound, HTTPException
 from discord.ext import commands
 
-from utils import Lang, Utils, Emoji
+from utils import Lang, Utils, Emoji, Permissions
 from utils.Database import ArtChannel
 
 from cogs.BaseCog import BaseCog
 from utils.Utils import CHANNEL_ID_MATCHER
+from utils.Permissions import Capability
 
 
 class ArtCollector(BaseCog):
@@ -22,7 +23,7 @@ class ArtCollector(BaseCog):
         self.collection_channels = dict()
 
     async def cog_check(self, ctx):
-        return ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     async def on_ready(self):
         # Load channels
@@ -204,10 +205,10 @@ class ArtCollector(BaseCog):
         except KeyError as ex:
             return
 
-        ctx = await self.bot.get_context(message)
+        guild_id = message.channel.guild.id
         tags = []
 
-        for tag in self.channels[ctx.guild.id][message.channel.id].keys():
+        for tag in self.channels[guild_id][message.channel.id].keys():
             tags.append(f"\\b{re.escape(tag)}\\b")
         tag_pattern = '|'.join(tags)
         tag_matcher = re.compile(tag_pattern, re.IGNORECASE)
@@ -215,7 +216,7 @@ class ArtCollector(BaseCog):
 
         async def do_collect(my_message, my_tag):
             content_shown = False
-            my_channel = self.bot.get_channel(self.channels[ctx.guild.id][my_message.channel.id][my_tag.lower()])
+            my_channel = self.bot.get_channel(self.channels[guild_id][my_message.channel.id][my_tag.lower()])
             for attachment in my_message.attachments:
                 embed = discord.Embed(
                     timestamp=my_message.created_at,
@@ -267,7 +268,7 @@ class ArtCollector(BaseCog):
             user_is_bot = u_id == self.bot.user.id
 
             # TODO: add role-based check?
-            has_permission = my_member.guild_permissions.mute_members or await self.bot.member_is_admin(my_member.id)
+            has_permission = await Permissions.member_has(my_member, Capability.MUTE_MEMBERS | Capability.BOT_ADMIN)
 
             if user_is_bot or not has_permission:
                 return
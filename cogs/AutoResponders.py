@@ -16,8 +16,10 @@ from discord.ext import commands, tasks
 from discord.utils import utcnow
 
 from cogs.BaseCog import BaseCog
-from utils import Lang, Utils, Questions, Emoji, Configuration, Logging
+from utils import Lang, Utils, Questions, Emoji, Configuration, Logging, LiteralMatcher, RegexService, Permissions, \
+    MessageCache
 from utils.Database import AutoResponder
+from utils.Permissions import Capability
 
 
 @dataclass
@@ -54,11 +56,17 @@ class AutoResponders(BaseCog):
     }
 
     trigger_length_max = 300
+    trigger_list_max = 10
+    trigger_options_max = 25
+    trigger_probe_timeout = 0.5
     action_expiry_default = 86400
 
     def __init__(self, bot):
         super().__init__(bot)
         self.triggers = dict()
+        self.trigger_ids = dict()
+        self.matchers = dict()
+        self.quarantine = dict()
         self.mod_messages = dict()
         self.mod_action_expiry = dict()
         self.ar_list = dict()
@@ -75,9 +83,17 @@ class AutoResponders(BaseCog):
 
     def cog_unload(self):
         self.clean_old_autoresponders.cancel()
+        # WordCounter shares the matchers, only the trigger keys go
+        LiteralMatcher.clear_all_guild_matchers('ar')
+
+    async def shutdown(self):
+        RegexService.shutdown()
 
     async def init_guild(self, guild):
         self.triggers[guild.id] = dict()
+        self.trigger_ids[guild.id] = dict()
+        self.matchers[guild.id] = dict()
+        self.quarantine[guild.id] = set()
         self.mod_messages[guild.id] = dict()
         self.ar_list[guild.id] = []
         self.ar_list_messages[guild.id] = dict()
@@ -93,14 +109,17 @@ class AutoResponders(BaseCog):
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         del self.triggers[guild.id]
+        del self.trigger_ids[guild.id]
+        del self.matchers[guild.id]
+        del self.quarantine[guild.id]
+        LiteralMatcher.remove_guild_matcher(guild.id)
         del self.mod_messages[guild.id]
         del self.ar_list[guild.id]
         del self.ar_list_messages[guild.id]
         del self.mod_action_expiry[guild.id]
         try:
             Configuration.del_persistent_var(f"mod_messages_{guild.id}", True)
-            del Configuration.MASTER_CONFIG[f'auto_action_expiry_seconds_{guild.id}']
-            Configuration.save()
+            Configuration.del_var(f'auto_action_expiry_seconds_{guild.id}')
         except Exception as e:
             Logging.error(f"Could not save config when removing auto_action_expiry_seconds_{guild.id}")
         await AutoResponder.filter(serverid=guild.id).delete()
@@ -128,7 +147,7 @@ class AutoResponders(BaseCog):
     async def cog_check(self, ctx):
         if ctx.guild is None:
             return False
-        return ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     def get_flag_name(self, index):
         for key, value in self.flags.items():
@@ -183,62 +202,208 @@ class AutoResponders(BaseCog):
         guilds = self.bot.guilds if ctx is None else [ctx.guild]
         for guild in guilds:
             self.triggers[guild.id] = dict()
+            self.trigger_ids[guild.id] = dict()
+            self.matchers[guild.id] = dict()
+            self.quarantine[guild.id] = set()
+            LiteralMatcher.clear_guild_matcher(guild.id, 'ar')
             for responder in await AutoResponder.filter(serverid=guild.id).order_by("id"):
-                # interpret flags bitmask and store for reference
-                flags = dict()
-                for index in self.flags.values():
-                    flags[index] = responder.flags & 1 << index
+                await self.cache_trigger(guild.id, responder)
+        self.loaded = True
 
-                # use JSON object for random response
-                try:
-                    response = json.loads(responder.response)
-                except JSONDecodeError as e:
-                    try:
-                        # leading and trailing quotes are checked
-                        response = json.loads(responder.response[1:-1])
-                    except JSONDecodeError as e:
-                        # not json. do not raise exception, use string instead
-                        response = responder.response
+    async def cache_trigger(self, guild_id, responder: AutoResponder):
+        """
+        Parse a single AutoResponder row and store it, along with its compiled pattern, in the trigger cache
 
-                if isinstance(response, int):
-                    response = str(response)
+        :param guild_id: guild the trigger belongs to
+        :param responder: AutoResponder db row
+        """
+        if guild_id not in self.triggers:
+            self.triggers[guild_id] = dict()
+        if guild_id not in self.trigger_ids:
+            self.trigger_ids[guild_id] = dict()
+        if guild_id not in self.matchers:
+            self.matchers[guild_id] = dict()
+        if guild_id not in self.quarantine:
+            self.quarantine[guild_id] = set()
+
+        # interpret flags bitmask and store for reference
+        flags = dict()
+        for index in self.flags.values():
+            flags[index] = responder.flags & 1 << index
+
+        # use JSON object for random response
+        try:
+            response = json.loads(responder.response)
+        except JSONDecodeError as e:
+            try:
+                # leading and trailing quotes are checked
+                response = json.loads(responder.response[1:-1])
+            except JSONDecodeError as e:
+                # not json. do not raise exception, use string instead
+                response = responder.response
 
-                # use JSON object to require each of several triggers in any order
-                try:
-                    # TODO: enforce structure and depth limit. Currently written to accept 1D and 2D array of strings
-                    match_list = json.loads(responder.trigger)
-                    if not isinstance(match_list, list):
-                        match_list = None
-
-                    # 1D Array means a matching string will have each word in the list, in any order
-                    # A list in any index of the list means any *one* word in the 2nd level list will match
-                    # e.g. ["one", ["two", "three"]] will match a string that has "one" AND ("two" OR "three")
-                    # "this is one of two example sentences that will match."
-                    # "there are three examples and this one will match as well."
-                    # "A sentence like this one will NOT match."
-                except JSONDecodeError as e:
-                    # not json. do not raise exception
-                    match_list = None
-
-                trigger = responder.trigger
-                chance = responder.chance / 10000  # chance is 0-10,000. make it look more like a percentage
+        if isinstance(response, int):
+            response = str(response)
 
-                try:
-                    if self.triggers[guild.id][trigger]:
-                        await Logging.bot_log(f"Duplicate trigger: {responder.id}) {trigger}")
-                except KeyError as e:
-                    pass
+        # use JSON object to require each of several triggers in any order
+        try:
+            # TODO: enforce structure and depth limit. Currently written to accept 1D and 2D array of strings
+            match_list = json.loads(responder.trigger)
+            if not isinstance(match_list, list):
+                match_list = None
+
+            # 1D Array means a matching string will have each word in the list, in any order
+            # A list in any index of the list means any *one* word in the 2nd level list will match
+            # e.g. ["one", ["two", "three"]] will match a string that has "one" AND ("two" OR "three")
+            # "this is one of two example sentences that will match."
+            # "there are three examples and this one will match as well."
+            # "A sentence like this one will NOT match."
+        except JSONDecodeError as e:
+            # not json. do not raise exception
+            match_list = None
+
+        trigger = responder.trigger
+        chance = responder.chance / 10000  # chance is 0-10,000. make it look more like a percentage
+
+        existing = self.triggers[guild_id].get(trigger)
+        if existing and existing['id'] != responder.id:
+            await Logging.bot_log(f"Duplicate trigger: {responder.id}) {trigger}")
+
+        # trigger text may have changed since the last time this id was cached
+        old_trigger = self.trigger_ids[guild_id].get(responder.id)
+        if old_trigger is not None and old_trigger != trigger:
+            self.triggers[guild_id].pop(old_trigger, None)
+
+        self.triggers[guild_id][trigger] = {
+            'id': responder.id,
+            'match_list': match_list,
+            'response': response,
+            'flags': flags,
+            'chance': chance,
+            'responsechannelid': responder.responsechannelid,
+            'listenchannelid': responder.listenchannelid
+        }
+        self.trigger_ids[guild_id][responder.id] = trigger
+
+        # changed triggers get another chance
+        self.quarantine[guild_id].discard(responder.id)
+
+        literal_matcher = LiteralMatcher.get_guild_matcher(guild_id)
+        literal_matcher.discard(('ar', responder.id))
+        try:
+            self.matchers[guild_id][responder.id] = self.compile_trigger(
+                trigger,
+                match_list,
+                flags[self.flags['full_match']],
+                flags[self.flags['match_case']])
+        except (TypeError, IndexError, re.error) as e:
+            # malformed list trigger. leave it out of matching, but keep it listed so it can be fixed
+            self.matchers[guild_id].pop(responder.id, None)
+            await Utils.handle_exception(f"failed to compile ar trigger {responder.id}) {trigger}", self.bot, e)
+            return
 
-                self.triggers[guild.id][trigger] = {
-                    'id': responder.id,
-                    'match_list': match_list,
-                    'response': response,
-                    'flags': flags,
-                    'chance': chance,
-                    'responsechannelid': responder.responsechannelid,
-                    'listenchannelid': responder.listenchannelid
-                }
-        self.loaded = True
+        literals = self.get_trigger_literals(trigger, match_list)
+        if literals:
+            for literal in literals:
+                literal_matcher.add(literal, ('ar', responder.id))
+        else:
+            literal_matcher.add_always(('ar', responder.id))
+
+    def uncache_trigger(self, guild_id, trigger):
+        """
+        Remove a trigger and its compiled pattern from the trigger cache
+
+        :param guild_id: guild the trigger belongs to
+        :param trigger: raw trigger string
+        """
+        data = self.triggers.get(guild_id, dict()).pop(trigger, None)
+        if data is not None:
+            self.trigger_ids[guild_id].pop(data['id'], None)
+            self.matchers[guild_id].pop(data['id'], None)
+            self.quarantine[guild_id].discard(data['id'])
+            LiteralMatcher.get_guild_matcher(guild_id).discard(('ar', data['id']))
+
+    @staticmethod
+    def get_trigger_literals(trigger, match_list) -> list:
+        """
+        Pick literals for the prefilter. Any message the trigger matches contains at least one of them.
+
+        Spaces in triggers match any run of whitespace, so literals are single words taken from the trigger.
+
+        :param trigger: raw trigger string
+        :param match_list: parsed list trigger, or None
+        :return: list of literals. Empty list when no literal is required for a match
+        """
+        def longest_word(text):
+            words = str(text).split()
+            return max(words, key=len) if words else None
+
+        if match_list is None or not isinstance(match_list, list):
+            word = longest_word(trigger)
+            return [word] if word else []
+
+        # every top-level item must match. a single word is the narrowest filter
+        required = [longest_word(item) for item in match_list if not isinstance(item, list)]
+        required = [word for word in required if word]
+        if required:
+            return [max(required, key=len)]
+
+        # only "any one of" groups. the first group where every option has a literal will do
+        for group in match_list:
+            options = [longest_word(token) for token in group]
+            if options and all(options):
+                return options
+        return []
+
+    @staticmethod
+    def compile_trigger(trigger, match_list, full_match, match_case) -> re.Pattern:
+        """
+        Build the search pattern for a trigger
+
+        :param trigger: raw trigger string
+        :param match_list: parsed list trigger, or None
+        :param full_match: full_match flag value
+        :param match_case: match_case flag value
+        :return: compiled pattern
+        """
+        def add_bounds(my_word):
+            if re.match(r'\w', my_word[0]):
+                my_word = rf"\b{my_word}"
+            if re.match(r'\w', my_word[-1]):
+                my_word = rf"{my_word}\b"
+            return my_word
+
+        if match_list is not None and isinstance(match_list, list):
+            # full match done as whole word match per item in list when using list-match
+            words = []
+            for word in match_list:
+                if isinstance(word, list):
+                    sub_list = []
+                    for token in word:
+                        token = re.escape(token)
+                        if full_match:
+                            token = add_bounds(token)
+                        sub_list.append(token)
+                    # a list of words at this level indicates one word from a list must match
+                    word = f"({'|'.join(sub_list)})"
+                else:
+                    word = re.escape(word)
+                    if full_match:
+                        word = add_bounds(word)
+                # escape the words and join together as a series of look-ahead searches
+                words.append(f'(?=.*{word})')
+            # anchored, because look-aheads that span the whole message only need to be tried from the start.
+            # unanchored, search retries every one of them at every position in the message
+            parsed_trigger = r'\A' + ''.join(words)
+        elif full_match:
+            parsed_trigger = rf"^{re.escape(trigger)}$"
+        else:
+            parsed_trigger = re.escape(trigger)
+
+        # replace escaped spaces with whitespace character class for multiline matching
+        parsed_trigger = re.sub(r'\\ ', r'\\s+', parsed_trigger)
+        # ignorecase is set by flag. dotall is not optional
+        return re.compile(parsed_trigger, flags=(re.I if not match_case else 0) | re.S)
 
     async def list_auto_responders(self, ctx):
         """
@@ -389,11 +554,77 @@ class AutoResponders(BaseCog):
             fixed = p2.sub(r'"\1', fixed)
             try:
                 trigger_obj = json.loads(fixed)
-                return fixed
             except json.decoder.JSONDecodeError as e:
-                return trigger
+                fixed = trigger
+                trigger_obj = None
+
+            match_list = trigger_obj if isinstance(trigger_obj, list) else None
+            if match_list is not None and not self.is_valid_match_list(match_list):
+                msg = Lang.get_locale_string('autoresponder/trigger_malformed', ctx,
+                                             max_items=self.trigger_list_max, max_options=self.trigger_options_max)
+                await ctx.send(f"{Emoji.get_chat_emoji('WHAT')} {msg}")
+            else:
+                probed = await self.probe_trigger(fixed, match_list)
+                if probed is None:
+                    msg = Lang.get_locale_string('autoresponder/trigger_not_checked', ctx)
+                    await ctx.send(f"{Emoji.get_chat_emoji('WHAT')} {msg}")
+                elif not probed:
+                    msg = Lang.get_locale_string('autoresponder/trigger_too_complex', ctx)
+                    await ctx.send(f"{Emoji.get_chat_emoji('WHAT')} {msg}")
+                else:
+                    return fixed
         return False
 
+    def is_valid_match_list(self, match_list) -> bool:
+        """
+        List triggers are a list of strings and lists of strings, nothing deeper.
+
+        :param match_list: parsed list trigger
+        :return: True if the structure and size are acceptable
+        """
+        if len(match_list) == 0 or len(match_list) > self.trigger_list_max:
+            return False
+        for item in match_list:
+            options = item if isinstance(item, list) else [item]
+            if len(options) == 0 or len(options) > self.trigger_options_max:
+                return False
+            for option in options:
+                if not isinstance(option, str) or option.strip() == '':
+                    return False
+        return True
+
+    async def probe_trigger(self, trigger, match_list) -> bool:
+        """
+        Run a new trigger against some worst-case messages so a pattern that backtracks badly is refused before it
+        is saved instead of being quarantined later.
+
+        :param trigger: validated trigger string
+        :param match_list: parsed list trigger, or None
+        :return: True if every probe finished within trigger_probe_timeout, False if one didn't, None when the probes
+            couldn't run
+        """
+        words = []
+        for item in match_list or [trigger]:
+            words.extend(item if isinstance(item, list) else [item])
+        near_misses = ' '.join(word[:-1] for word in words) or ' '
+        subjects = [
+            ' ' * 4000,
+            (near_misses + ' ') * (4000 // (len(near_misses) + 1) + 1),
+            ''.join(words) * (4000 // len(''.join(words)) + 1)
+        ]
+        for full_match in (False, True):
+            pattern = self.compile_trigger(trigger, match_list, full_match, False)
+            for subject in subjects:
+                try:
+                    await RegexService.search(pattern, subject[:4000], self.trigger_probe_timeout)
+                except asyncio.TimeoutError:
+                    return False
+                except (EOFError, OSError) as e:
+                    # the worker died or the service is shut down. without a probe the trigger can't be trusted
+                    Logging.info(f"regex worker failed while probing trigger: {e!r}")
+                    return None
+        return True
+
     async def validate_reply(self, ctx, reply):
         if reply is None or reply == "":
             await ctx.send(f"{Emoji.get_chat_emoji('WHAT')} {Lang.get_locale_string('autoresponder/empty_reply', ctx)}")
@@ -507,8 +738,7 @@ class AutoResponders(BaseCog):
             return
         try:
             # save to configuration and local var last in case saving config raises error
-            Configuration.MASTER_CONFIG[f'auto_action_expiry_seconds_{ctx.guild.id}'] = expiry_seconds
-            Configuration.save()
+            Configuration.set_var(f'auto_action_expiry_seconds_{ctx.guild.id}', expiry_seconds)
             self.mod_action_expiry[ctx.guild.id] = expiry_seconds
             await ctx.send(f"Configuration saved. Autoresponder mod action messages are now valid for {exp}")
         except Exception as e:
@@ -548,7 +778,7 @@ class AutoResponders(BaseCog):
             db_trigger = await self.get_db_trigger(ctx.guild.id, trigger)
             if db_trigger is None:
                 row = await AutoResponder.create(serverid=ctx.guild.id, trigger=trigger, response=reply)
-                await self.reload_triggers(ctx)
+                await self.cache_trigger(ctx.guild.id, row)
                 added_message = Lang.get_locale_string('autoresponder/added', ctx,
                                                        trigger=trigger, trigid=row.id)
                 await ctx.send(
@@ -575,10 +805,7 @@ class AutoResponders(BaseCog):
                     await self.nope(ctx)
 
     def find_trigger_by_id(self, guild_id, trigger_id):
-        for trigger, data in self.triggers[guild_id].items():
-            if data['id'] == trigger_id:
-                return trigger
-        return None
+        return self.trigger_ids[guild_id].get(trigger_id)
 
     @autor.command(aliases=["del", "delete"])
     @commands.guild_only()
@@ -597,10 +824,9 @@ class AutoResponders(BaseCog):
             # trigger = await Utils.clean(trigger, links=False)
             ar_row = await AutoResponder.get(serverid=ctx.guild.id, trigger=trigger)
             await ar_row.delete()
-            del self.triggers[ctx.guild.id][trigger]
+            self.uncache_trigger(ctx.guild.id, trigger)
             msg = Lang.get_locale_string('autoresponder/removed', ctx, trigger=self.get_trigger_description(trigger))
             await ctx.send(f"{Emoji.get_chat_emoji('YES')} {msg}")
-            await self.reload_triggers(ctx)
         except tortoise.exceptions.MultipleObjectsReturned:
             await ctx.send(f"Something wrong in the database... too many matches to trigger ```{trigger}```")
         except tortoise.exceptions.DoesNotExist:
@@ -689,7 +915,7 @@ class AutoResponders(BaseCog):
             else:
                 trigger.response = reply
                 await trigger.save()
-                await self.reload_triggers(ctx)
+                await self.cache_trigger(ctx.guild.id, trigger)
 
                 msg = Lang.get_locale_string('autoresponder/updated',
                                              ctx,
@@ -733,7 +959,7 @@ class AutoResponders(BaseCog):
             else:
                 trigger.trigger = new_trigger
                 await trigger.save()
-                await self.reload_triggers(ctx)
+                await self.cache_trigger(ctx.guild.id, trigger)
 
                 await ctx.send(
                     f"{Emoji.get_chat_emoji('YES')} {Lang.get_locale_string('autoresponder/updated', ctx, trigger=new_trigger)}"
@@ -789,13 +1015,13 @@ class AutoResponders(BaseCog):
             chance = int(chance * 100)
             db_trigger.chance = chance
             await db_trigger.save()
+            await self.cache_trigger(ctx.guild.id, db_trigger)
         except Exception as e:
             await Utils.handle_exception("autoresponder setchance exception", self.bot, e)
         await ctx.send(
             Lang.get_locale_string('autoresponder/chanceset', ctx,
                                    chance=chance/100,
                                    trigger=self.get_trigger_description(trigger)))
-        await self.reload_triggers(ctx)
 
     @autor.command(aliases=["channel", "sc", "listen_in", "respond_in", "li", "ri"])
     @commands.guild_only()
@@ -874,11 +1100,11 @@ class AutoResponders(BaseCog):
             await ctx.send(Lang.get_locale_string("autoresponder/no_channel", ctx, mode=mode))
             return
         if mode == respond:
-            db_trigger.responsechannelid = channel_id
+            db_trigger.responsechannelid = int(channel_id)
         elif mode == listen:
-            db_trigger.listenchannelid = channel_id
+            db_trigger.listenchannelid = int(channel_id)
         await db_trigger.save()
-        await self.reload_triggers(ctx)
+        await self.cache_trigger(ctx.guild.id, db_trigger)
 
     @autor.command(aliases=["sf"])
     @commands.guild_only()
@@ -956,7 +1182,7 @@ class AutoResponders(BaseCog):
                 db_trigger.flags = db_trigger.flags & ~(1 << flag)
                 await ctx.send(f"`{self.get_flag_name(flag)}` flag deactivated")
             await db_trigger.save()
-            await self.reload_triggers(ctx)
+            await self.cache_trigger(ctx.guild.id, db_trigger)
         except asyncio.TimeoutError:
             pass
         except ValueError:
@@ -971,29 +1197,40 @@ class AutoResponders(BaseCog):
         if message.author.bot or not_in_guild:
             return
 
-        prefix = Configuration.get_var("bot_prefix")
-        ctx = await self.bot.get_context(message)
-        can_command = await self.cog_check(ctx)
-        command_context = message.content.startswith(prefix, 0) and can_command
+        info = MessageCache.get(self.bot, message)
+        # context is only built when the message could be a command
+        command_context = info.has_prefix and await self.cog_check(await info.context())
         in_ignored_channel = False  # TODO: commands for global ignore channels, populate with channels
 
         if command_context or in_ignored_channel:
             return
 
-        is_mod = message.author.guild_permissions.mute_members or await self.bot.permission_manage_bot(ctx)
+        is_mod = bool(await info.capabilities() & (Capability.MUTE_MEMBERS | Capability.BOT_ADMIN))
         # search guild auto-responders
 
         if message.channel.guild.id not in self.triggers:
             # Guild not initialized or AR items empty? Ignore.
             return
 
-        for trigger, data in self.triggers[message.channel.guild.id].items():
+        guild_id = message.channel.guild.id
+        guild_matchers = self.matchers.get(guild_id, dict())
+        guild_trigger_ids = self.trigger_ids.get(guild_id, dict())
+
+        # one pass over the message finds the only triggers that can possibly match
+        candidates = LiteralMatcher.get_guild_matcher(guild_id).search(message.content)
+        candidate_ids = sorted(key[1] for key in candidates if key[0] == 'ar')
+
+        for trigger_id in candidate_ids:
+            trigger = guild_trigger_ids.get(trigger_id)
+            data = self.triggers[guild_id].get(trigger)
+            if data is None:
+                # removed while this message was being handled
+                continue
+
             # flags
             active = data['flags'][self.flags['active']]
             delete_trigger = data['flags'][self.flags['delete']]
             ignore_mod = data['flags'][self.flags['ignore_mod']]
-            match_case = data['flags'][self.flags['match_case']]
-            full_match = data['flags'][self.flags['full_match']]
             mod_action = data['flags'][self.flags['mod_action']] and data['responsechannelid']
             chance = data['chance']
 
@@ -1003,50 +1240,25 @@ class AutoResponders(BaseCog):
             if data['listenchannelid'] and data['listenchannelid'] != message.channel.id:
                 continue
 
-            def add_bounds(my_word):
-                if re.match(r'\w', my_word[0]):
-                    my_word = rf"\b{my_word}"
-                if re.match(r'\w', my_word[-1]):
-                    my_word = rf"{my_word}\b"
-                return my_word
-
-            if data['match_list'] is not None and isinstance(data['match_list'], list):
-                # full match done as whole word match per item in list when using list-match
-                words = []
-                for word in data['match_list']:
-                    if isinstance(word, list):
-                        sub_list = []
-                        for token in word:
-                            token = re.escape(token)
-                            if full_match:
-                                token = add_bounds(token)
-                            sub_list.append(token)
-                        # a list of words at this level indicates one word from a list must match
-                        word = f"({'|'.join(sub_list)})"
-                    else:
-                        word = re.escape(word)
-                        if full_match:
-                            word = add_bounds(word)
-                    # escape the words and join together as a series of look-ahead searches
-                    words.append(f'(?=.*{word})')
-                trigger = ''.join(words)
-                parsed_trigger = trigger
-            elif full_match:
-                parsed_trigger = rf"^{re.escape(trigger)}$"
-            else:
-                parsed_trigger = re.escape(trigger)
-
-            # replace escaped spaces with whitespace character class for multiline matching
-            parsed_trigger = re.sub(r'\\ ', r'\\s+', parsed_trigger)
-            # ignorecase is set by flag. dotall is not optional
-            re_tag = re.compile(parsed_trigger, flags=(re.I if not match_case else 0) | re.S)
+            re_tag = guild_matchers.get(data['id'])
+            if re_tag is None or data['id'] in self.quarantine[guild_id]:
+                continue
 
             try:
-                match = await asyncio.wait_for(Utils.do_re_search(re_tag, message.content), 2)
+                match = await RegexService.search(re_tag, message.content)
             except asyncio.TimeoutError as e:
-                # search did not complete within the timeout
-                Logging.info(f"failing ar tag: {parsed_trigger}")
-                await Utils.handle_exception(f"failing ar tag: {parsed_trigger}", self.bot, e)
+                # search did not complete within the timeout. stop using this trigger until it's edited or reloaded
+                self.quarantine[guild_id].add(data['id'])
+                Logging.info(f"failing ar tag: {re_tag.pattern}")
+                await Utils.handle_exception(
+                    f"ar tag {data['id']} timed out and is quarantined: {re_tag.pattern}", self.bot, e)
+                continue
+            except re.error as e:
+                await Utils.handle_exception(f"failing ar tag: {re_tag.pattern}", self.bot, e)
+                continue
+            except (EOFError, OSError) as e:
+                # the worker died. search already replaced it, carry on with the other triggers
+                Logging.info(f"regex worker failed on ar tag {data['id']}: {e!r}")
                 continue
 
             if match is not None:
@@ -1063,7 +1275,8 @@ class AutoResponders(BaseCog):
                 else:
                     response_channel = message.channel
 
-                matched = ', '.join(match.groups()) or trigger
+                whole_match, groups = match
+                matched = ', '.join(group for group in groups if group) or trigger
 
                 formatted_response = response.replace("@", "@\u200b").format(
                     author=message.author.mention,
@@ -1104,7 +1317,7 @@ class AutoResponders(BaseCog):
             member = my_guild.get_member(event.user_id)
             user_is_bot = event.user_id == self.bot.user.id
             # TODO: change to role-based?
-            has_permission = member.guild_permissions.mute_members or await self.bot.member_is_admin(event.user_id)
+            has_permission = await Permissions.member_has(member, Capability.MUTE_MEMBERS | Capability.BOT_ADMIN)
             if user_is_bot or not has_permission:
                 return
 
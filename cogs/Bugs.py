@@ -6,7 +6,6 @@ from dataclasses import dataclass
 import discord
 
 from utils.Utils import get_member_log_name
-from sky import queue_worker
 from asyncio import CancelledError
 from datetime import datetime
 
@@ -15,25 +14,39 @@ from discord.ext import commands, tasks
 from discord.ext.commands import Context
 from discord.utils import utcnow
 from tortoise.exceptions import DoesNotExist, OperationalError, IntegrityError
+from tortoise.transactions import in_transaction
 
 import sky
 from cogs.BaseCog import BaseCog
-from utils import Questions, Emoji, Utils, Configuration, Lang, Logging
+from utils import Questions, Emoji, Utils, Configuration, Lang, Logging, Permissions, AdmissionQueue, Similarity
 from utils.Database import BugReport, Attachments, BugReportingPlatform, BugReportingChannel
-from utils.Database import Guild, BugReportFieldLength
+from utils.Database import Guild, BugReportFieldLength, search_bug_reports, count_bug_reports
 from utils.Logging import TCol
+from utils.Permissions import Capability
+
+# report channels a new bug report is sent to at the same time
+REPORT_SEND_CONCURRENCY = 5
+# `bug search` filters, written as key:value anywhere in the query
+SEARCH_FILTER_PATTERN = re.compile(r'\b(platform|branch|version):(\S+)', re.IGNORECASE)
+SEARCH_RESULT_LIMIT = 10
+# share of words a report needs in common with a new one to be shown as similar during review
+SIMILAR_REPORT_THRESHOLD = 0.5
+SIMILAR_REPORT_LIMIT = 5
+# most recent reports the clusters command looks at. each band bucket is compared pairwise, so this bounds the work
+CLUSTER_REPORT_LIMIT = 2000
+# reports younger than this may still be in an open transaction, they are left for the next stats rollup
+STATS_SETTLE_SECONDS = 30
 
 
 @dataclass()
 class BugReportingAction:
     author: discord.User
     channel: discord.TextChannel
+    resume: bool = False
 
 
 class Bugs(BaseCog):
 
-    bug_report_queue = asyncio.Queue()
-
     def __init__(self, bot):
         super().__init__(bot)
         self.bug_messages = set()
@@ -42,30 +55,38 @@ class Bugs(BaseCog):
         self.blocking = set()
         self.maintenance_message = None
         self.maint_check_count = 0
-        self.bug_tasks = []
-        self.bug_runner_tasks = [
-            asyncio.create_task(
-                queue_worker(f"Bug Queue {i}", self.bug_report_queue, self.run_bug_report))
-            for i in range(200)
-        ]
+        # user id (as str) -> answers of a report in progress, kept across restarts
+        self.sessions = dict()
+        self.sessions_offered = False
+        self.unloading = False
+        # platform -> branch -> channel id -> guild id, the channels reports for each platform/branch go to
+        self.routes = dict()
+        # channel id -> pending bug info refresh task, and when the bug info was last reposted there
+        self.info_refreshes = dict()
+        self.info_refreshed_at = dict()
+        # title, actual and steps of every report, to spot duplicates
+        self.similar_reports = Similarity.MinHashIndex()
+        self.similarity_loader = None
+        # (platform, branch, app version, day) -> number of reports, rolled up to stats_last_id
+        self.report_stats = dict()
+        self.stats_last_id = 0
+        self.report_queue = AdmissionQueue.AdmissionQueue(
+            "Bug reports", self.run_bug_report, Configuration.CONFIG.bug_report_concurrency)
+        # user id -> (DM telling them their place in line, the place it shows)
+        self.queue_messages = dict()
 
     async def cog_unload(self):
-        if self.bug_report_queue.qsize() > 0:
-            Logging.info(f"\tthere are {self.bug_report_queue.qsize()} bug reports not yet started...")
-            # TODO: warn queued users their reports won't start
-            # TODO: cancel report
-            # TODO: save bug progress
-            # TODO: resume report when restarting? inform user report was interrupted by restart, re-ask last question
-        Logging.info(f"\t{TCol.cWarning}Cancel active bug runners{TCol.cEnd}")
-        for task in [*self.bug_runner_tasks, *self.bug_tasks]:
-            task.cancel()
+        # running reports keep their sessions, and are offered to continue when the bot is back
+        self.unloading = True
+        if self.report_queue.waiting:
+            Logging.info(f"\tthere are {len(self.report_queue.waiting)} bug reports not yet started...")
+            # queued users get the same offer, from the first question
+            for work_item in self.report_queue.waiting.values():
+                if str(work_item.author.id) not in self.sessions:
+                    self.save_session(work_item.author.id, dict(step=0, channel=work_item.channel.id))
+        Logging.info(f"\t{TCol.cWarning}Cancel active bug reports{TCol.cEnd}")
         try:
-            Logging.info(f"\t{TCol.cWarning}Wait for bug tasks to end{TCol.cEnd}")
-            await asyncio.gather(*self.bug_tasks)
-            Logging.info(f"\t{TCol.cWarning}Wait for bug runners to end{TCol.cEnd}")
-            await asyncio.gather(*self.bug_runner_tasks)
-        except CancelledError:
-            pass
+            await self.report_queue.cancel_all()
         except Exception as e:
             Logging.info(e)
         Logging.info(f"\t{TCol.cWarning}Verify empty bug queue{TCol.cEnd}")
@@ -74,23 +95,111 @@ class Bugs(BaseCog):
         for task in self.sweeps:
             task.cancel()
         await asyncio.gather(*self.sweeps)
+        for task in self.info_refreshes.values():
+            task.cancel()
+        if self.similarity_loader is not None:
+            self.similarity_loader.cancel()
+        self.refresh_report_stats.cancel()
+        self.refresh_queue_positions.cancel()
+        self.queue_messages.clear()
         Logging.info(f"\t{TCol.cOkGreen}Bugs unloaded{TCol.cEnd}")
 
     async def cog_load(self):
         Logging.info("starting bugs")
         m = self.bot.metrics
         m.reports_in_progress.set_function(lambda: len(self.in_progress))
-        # this count is only good for reports waiting to start
-        # TODO: how to count number of workers that are working?
-        # m.reports_in_progress.set_function(self.bug_report_queue.qsize)
+        m.reports_waiting.set_function(lambda: len(self.report_queue.waiting))
+        m.reports_active.set_function(lambda: len(self.report_queue.active))
+        self.sessions = Configuration.get_persistent_var("bug_sessions", dict())
+        await self.load_routes()
+        self.similarity_loader = asyncio.create_task(self.index_similar_reports())
+        if not self.refresh_report_stats.is_running():
+            self.refresh_report_stats.start()
+        if not self.refresh_queue_positions.is_running():
+            self.refresh_queue_positions.start()
+
+    async def index_similar_reports(self):
+        """Add all reports to the similarity index, a page at a time. hashing runs in a thread to keep the bot responsive"""
+        last_id = 0
+        try:
+            while True:
+                page = await BugReport.filter(id__gt=last_id).order_by('id').limit(1000) \
+                    .values_list('id', 'title', 'actual', 'steps')
+                if not page:
+                    break
+                texts = [Similarity.report_text(title, actual, steps) for report_id, title, actual, steps in page]
+                signatures = await asyncio.to_thread(Similarity.signatures, texts)
+                self.similar_reports.insert([row[0] for row in page], signatures)
+                last_id = page[-1][0]
+            Logging.info(f"{len(self.similar_reports)} bug reports indexed for similarity")
+        except CancelledError:
+            raise
+        except Exception as e:
+            await Utils.handle_exception("failed to index bug reports for similarity", self.bot, e)
+
+    async def load_routes(self):
+        """Load the platforms and report channels from the database into the routing table"""
+        routes = dict()
+        for row in await BugReportingPlatform.all():
+            if row.branch in routes.get(row.platform, dict()):
+                Logging.info(f"duplicate platform in db: {row.platform}/{row.branch}")
+            routes.setdefault(row.platform, dict())[row.branch] = dict()
+        for row in await BugReportingChannel.all().order_by('id').prefetch_related('guild', 'platform'):
+            routes[row.platform.platform][row.platform.branch][row.channelid] = row.guild.serverid
+        self.routes = routes
+        self.routes_changed()
+
+    def get_route(self, platform, branch) -> dict:
+        """:return: channel id -> guild id for the channels that get reports for platform/branch"""
+        return self.routes.get(platform, dict()).get(branch, dict())
+
+    def list_routes(self) -> list:
+        """:return: (platform, branch, channel id, guild id) for every report channel"""
+        return [(platform, branch, channel_id, guild_id)
+                for platform, branches in self.routes.items()
+                for branch, channels in branches.items()
+                for channel_id, guild_id in channels.items()]
+
+    def get_report_url(self, platform, branch, message_id):
+        """:return: link to a report in the official server, None when it wasn't posted there"""
+        channel_id = next((cid for cid, guild_id in self.get_route(platform, branch).items()
+                           if guild_id == Configuration.CONFIG.guild_id), None)
+        if not message_id or channel_id is None:
+            return None
+        return f"https://discord.com/channels/{Configuration.CONFIG.guild_id}/{channel_id}/{message_id}"
+
+    def format_report_line(self, row) -> str:
+        """
+        :param row: report values with id, title, platform, branch, app_version and message_id
+        :return: one line about the report, the title linking to it when possible
+        """
+        title = Utils.escape_markdown(Utils.trim_message(row['title'], 100))
+        url = self.get_report_url(row['platform'], row['branch'], row['message_id'])
+        if url is not None:
+            title = f"[{title}]({url})"
+        return f"**#{row['id']}** {title} - {row['platform']}/{row['branch']} {row['app_version']}"
+
+    def remove_routes(self, channel_ids):
+        for branches in self.routes.values():
+            for channels in branches.values():
+                for channel_id in channel_ids:
+                    channels.pop(channel_id, None)
+        self.routes_changed()
+
+    def routes_changed(self):
+        """Let other cogs that care about report channels, like ReactMonitor, know the current set"""
+        self.bot.dispatch("bug_channels_changed",
+                          {channel_id for platform, branch, channel_id, guild_id in self.list_routes()})
+
+    @commands.Cog.listener()
+    async def on_config_reloaded(self):
+        self.report_queue.set_limit(Configuration.CONFIG.bug_report_concurrency)
 
     async def on_ready(self):
         Logging.info("readying bugs")
         reporting_channel_ids = []
-        for row in await BugReportingChannel.all().prefetch_related('guild', 'platform'):
-            cid = row.channelid
-            name = f"{row.platform.platform}_{row.platform.branch}"
-            guild_id = row.guild.serverid
+        for platform, branch, cid, guild_id in self.list_routes():
+            name = f"{platform}_{branch}"
             channel = self.bot.get_channel(cid)
             shutdown_key = f"{guild_id}_{name}_shutdown"
             shutdown_id = Configuration.get_persistent_var(shutdown_key)
@@ -107,21 +216,73 @@ class Bugs(BaseCog):
             await self.send_bug_info(*reporting_channel_ids)
         except Exception as e:
             await Utils.handle_exception("bug startup failure", self.bot, e)
+        if not self.sessions_offered:
+            # only once per load. on_ready also runs on reconnects and from the cleanup command
+            self.sessions_offered = True
+            await self.resume_sessions()
+
+    def save_session(self, uid, session):
+        session['updated'] = int(time.time())
+        self.sessions[str(uid)] = session
+        Configuration.set_persistent_var("bug_sessions", self.sessions)
+
+    def drop_session(self, uid):
+        if self.sessions.pop(str(uid), None) is not None:
+            Configuration.set_persistent_var("bug_sessions", self.sessions)
+
+    async def resume_sessions(self):
+        """Offer every user whose report was cut off by a restart to carry on where they left off"""
+        max_age = Configuration.CONFIG.bug_trash_sweep_minutes * 60
+        for uid, session in list(self.sessions.items()):
+            user = self.bot.get_user(int(uid))
+            channel = self.bot.get_channel(session.get('channel', 0))
+            if user is None or channel is None or time.time() - session.get('updated', 0) > max_age:
+                # would have been swept anyway
+                self.drop_session(uid)
+                continue
+            Logging.info(f"offering to resume bug report for {get_member_log_name(user)} at question {session['step']}")
+            await self.enqueue_bug_report(user, channel, resume=True)
 
     async def can_mod(ctx):
-        guild = Utils.get_home_guild()
-        member = guild.get_member(ctx.author.id)
-        return member.guild_permissions.mute_members or await Utils.BOT.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.OFFICIAL_MUTE)
 
-    def enqueue_bug_report(self, user, channel):
-        self.bug_report_queue.put_nowait(BugReportingAction(user, channel))
+    async def enqueue_bug_report(self, user, channel, resume=False):
+        position = self.report_queue.submit(user.id, BugReportingAction(user, channel, resume))
+        if position and user.id not in self.queue_messages:
+            try:
+                message = await user.send(Lang.get_locale_string('bugs/report_queued',
+                                                                 Configuration.CONFIG.broadcast_locale,
+                                                                 position=position))
+            except (Forbidden, HTTPException):
+                # the report itself will find out it can't DM
+                return
+            if self.report_queue.position(user.id):
+                self.queue_messages[user.id] = (message, position)
+
+    @tasks.loop(seconds=15.0)
+    async def refresh_queue_positions(self):
+        """Move the place in line shown to waiting users up as the queue drains. One edit per user that moved"""
+        for uid, (message, shown) in list(self.queue_messages.items()):
+            position = self.report_queue.position(uid)
+            if not position:
+                # started, or dropped from the queue
+                self.queue_messages.pop(uid, None)
+                continue
+            if position == shown:
+                continue
+            try:
+                await message.edit(content=Lang.get_locale_string('bugs/report_queued',
+                                                                  Configuration.CONFIG.broadcast_locale,
+                                                                  position=position))
+                self.queue_messages[uid] = (message, position)
+            except (Forbidden, HTTPException):
+                self.queue_messages.pop(uid, None)
 
     async def run_bug_report(self, work_item: BugReportingAction):
+        self.queue_messages.pop(work_item.author.id, None)
         try:
             Logging.info(f"Beginning bug report for {TCol.cOkCyan}{get_member_log_name(work_item.author)}{TCol.cEnd}")
-            this_task = self.bot.loop.create_task(self.report_bug(work_item.author, work_item.channel))
-            self.bug_tasks.append(this_task)
-            await this_task
+            await self.report_bug(work_item.author, work_item.channel, work_item.resume)
         except CancelledError as e:
             # TODO: why is CancelledError not caught here during shutdown?
             Logging.info(f"channel {work_item.channel.id}, user {get_member_log_name(work_item.author)}")
@@ -149,15 +310,9 @@ class Bugs(BaseCog):
             self.sweeps[uid].cancel()
 
     async def shutdown(self):
-        for row in await BugReportingChannel.all().prefetch_related('guild', 'platform'):
-            cid = 0
-            guild_id = 0
-            name = "none"
+        for platform, branch, cid, guild_id in self.list_routes():
+            name = f"{platform}_{branch}"
             try:
-                cid = row.channelid
-                platform = row.platform
-                name = f"{platform.platform}_{platform.branch}"
-                guild_id = row.guild.serverid
                 channel = self.bot.get_channel(cid)
 
                 if channel is not None:
@@ -180,6 +335,32 @@ class Bugs(BaseCog):
             send_tasks.append(self.send_bug_info_impl(channel))
         await asyncio.gather(*send_tasks)
 
+    def refresh_bug_info(self, *channel_ids):
+        """
+        Move the bug info message back to the bottom of the channels, reposting at most once per
+        bug_info_refresh_seconds in each. Refreshes requested while one is pending are covered by that one
+        """
+        for channel_id in channel_ids:
+            if channel_id in self.info_refreshes:
+                self.bot.metrics.bug_info_reposts_saved.inc()
+                continue
+            self.info_refreshes[channel_id] = asyncio.create_task(self.refresh_bug_info_impl(channel_id))
+
+    async def refresh_bug_info_impl(self, channel_id):
+        try:
+            interval = Configuration.CONFIG.bug_info_refresh_seconds
+            delay = self.info_refreshed_at.get(channel_id, 0) + interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            # anything posted from here on needs a new refresh, so new requests must not be folded into this one
+            self.info_refreshes.pop(channel_id, None)
+        self.info_refreshed_at[channel_id] = time.monotonic()
+        try:
+            await self.send_bug_info(channel_id)
+        except Exception as e:
+            await Utils.handle_exception(f"bug info refresh failed in channel {channel_id}", self.bot, e)
+
     async def send_bug_info_impl(self, channel):
         bug_info_id = Configuration.get_persistent_var(f"{channel.guild.id}_{channel.id}_bug_message")
 
@@ -214,16 +395,46 @@ class Bugs(BaseCog):
                     f"Bug report message failed to send in channel #{channel.name} ({channel.id})", self.bot, e)
                 await asyncio.sleep(0.5)
 
+    @tasks.loop(seconds=60.0)
+    async def refresh_report_stats(self):
+        """Add reports submitted since the last rollup to the stats, grouped by the database"""
+        try:
+            rows = await count_bug_reports(self.stats_last_id, int(time.time()) - STATS_SETTLE_SECONDS)
+        except Exception as e:
+            await Utils.handle_exception("bug stats rollup failed", self.bot, e)
+            return
+        for row in rows:
+            key = (row['platform'], row['branch'], row['app_version'], int(row['day']))
+            self.report_stats[key] = self.report_stats.get(key, 0) + int(row['reports'])
+            self.stats_last_id = max(self.stats_last_id, int(row['last_id']))
+        # runs without new reports too, so the daily gauge goes back to 0 at midnight
+        self.update_stats_gauges()
+
+    def update_stats_gauges(self):
+        m = self.bot.metrics
+        today = int(time.time() // 86400)
+        totals = dict()
+        today_counts = dict()
+        for (platform, branch, app_version, day), count in self.report_stats.items():
+            totals[(platform, branch, app_version)] = totals.get((platform, branch, app_version), 0) + count
+            today_counts[(platform, branch)] = today_counts.get((platform, branch), 0) + (count if day == today else 0)
+        for labels, count in totals.items():
+            m.bug_reports_total.labels(*labels).set(count)
+        for labels, count in today_counts.items():
+            m.bug_reports_today.labels(*labels).set(count)
+
     @tasks.loop(seconds=30.0)
     async def verify_empty_bug_queue(self, ctx):
-        if len(self.in_progress) > 0:
+        # new reports are held in the queue during maintenance, so this only waits for the ones already started
+        if len(self.in_progress) > 0 or self.report_queue.active:
 
             if self.maint_check_count == 20:
                 await ctx.send(Lang.get_locale_string('bugs/maint_check_fail', ctx, author=ctx.author.mention))
                 self.verify_empty_bug_queue.cancel()
                 return
 
-            msg = f"There are {len(self.in_progress)} report(s) still in progress."
+            msg = f"There are {len(self.in_progress)} report(s) still in progress, " \
+                  f"{len(self.report_queue.waiting)} waiting to start after maintenance."
             if self.maintenance_message is None:
                 self.maintenance_message = await ctx.send(msg)
             else:
@@ -244,6 +455,7 @@ class Bugs(BaseCog):
     async def on_guild_remove(self, guild):
         guild_row = await self.bot.get_guild_db_config(guild.id)
         await guild_row.bug_channels.filter().delete()
+        self.remove_routes([cid for platform, branch, cid, guild_id in self.list_routes() if guild_id == guild.id])
 
     @commands.command(aliases=["bugmaint", "maintenance", "maintenance_mode", "maint"])
     @commands.guild_only()
@@ -282,9 +494,9 @@ class Bugs(BaseCog):
                     await self.bot.guild_log(guild.id, message)
                     await ctx.send(message)
 
-                for row in await guild_config.bug_channels.filter():
-                    cid = row.channelid
-                    branch = (await row.platform.filter()).branch
+                for platform, branch, cid, guild_id in self.list_routes():
+                    if guild_id != guild.id:
+                        continue
 
                     # show/hide reporting channels
                     channel = guild.get_channel(cid)
@@ -311,12 +523,14 @@ class Bugs(BaseCog):
                 await Utils.handle_exception("failed to set bug report channel permissions", self.bot, e)
             else:
                 if active:
+                    self.report_queue.pause()
                     self.maint_check_count = 0
                     if not self.verify_empty_bug_queue.is_running():
                         self.maintenance_message = None
                         self.verify_empty_bug_queue.start(ctx)
                     await ctx.send(Lang.get_locale_string('bugs/maint_on', ctx))
                 else:
+                    self.report_queue.resume()
                     await ctx.send(Lang.get_locale_string('bugs/maint_off', ctx))
 
     @commands.group(name='bug', invoke_without_command=True)
@@ -325,7 +539,7 @@ class Bugs(BaseCog):
         # remove command to not flood chat (unless we are in a DM already)
         if ctx.guild is not None:
             await ctx.message.delete()
-        self.enqueue_bug_report(ctx.author, ctx.channel)
+        await self.enqueue_bug_report(ctx.author, ctx.channel)
 
     @bug.command()
     @commands.check(can_mod)
@@ -334,18 +548,133 @@ class Bugs(BaseCog):
         await self.on_ready()
         await ctx.send("Done! ||I think?||")
 
+    @bug.command()
+    @commands.check(can_mod)
+    async def search(self, ctx, *, query: str):
+        """
+        Find earlier bug reports
+        bug search crash when opening map
+        bug search platform:android branch:beta version:0.21.5 crash when opening map
+        """
+        filters = dict()
+        for key, value in SEARCH_FILTER_PATTERN.findall(query):
+            filters[key.lower()] = value
+        text = SEARCH_FILTER_PATTERN.sub('', query).strip()
+        if not text:
+            await ctx.send("What should I search for?")
+            return
+
+        try:
+            results = await search_bug_reports(text, platform=filters.get('platform'), branch=filters.get('branch'),
+                                               app_version=filters.get('version'), limit=SEARCH_RESULT_LIMIT)
+        except OperationalError as e:
+            await Utils.handle_exception("bug search failed", self.bot, e)
+            await ctx.send("I couldn't search bug reports right now")
+            return
+
+        if not results:
+            await ctx.send(f"No bug reports match `{Utils.escape_markdown(text)}`")
+            return
+
+        embed = Embed(
+            timestamp=ctx.message.created_at,
+            color=0x50f3d7,
+            title=f'Bug reports matching "{Utils.trim_message(text, 200)}"',
+            description="\n".join(self.format_report_line(row) for row in results))
+        await ctx.send(embed=embed)
+
+    @bug.command()
+    @commands.check(can_mod)
+    async def stats(self, ctx, days: int = 7):
+        """
+        Report counts by platform, app version and day
+        :param days: how many days to include, today counts as one
+        """
+        days = max(1, days)
+        first_day = int(time.time() // 86400) - days + 1
+        by_platform = dict()
+        by_version = dict()
+        by_day = dict()
+        all_time = 0
+        for (platform, branch, app_version, day), count in self.report_stats.items():
+            all_time += count
+            if day < first_day:
+                continue
+            by_platform[f"{platform}/{branch}"] = by_platform.get(f"{platform}/{branch}", 0) + count
+            by_version[app_version] = by_version.get(app_version, 0) + count
+            by_day[day] = by_day.get(day, 0) + count
+
+        def top(counts, limit=SEARCH_RESULT_LIMIT):
+            ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return "\n".join(f"{name}: {count}" for name, count in ranked) or "-"
+
+        embed = Embed(
+            timestamp=ctx.message.created_at,
+            color=0x50f3d7,
+            title=f'Bug reports, last {days} day{"" if days == 1 else "s"}',
+            description=f"{sum(by_day.values())} reports in this period, {all_time} in total")
+        embed.add_field(name="By platform", value=top(by_platform), inline=True)
+        embed.add_field(name="By app version", value=top(by_version), inline=True)
+        daily = "\n".join(f"{datetime.utcfromtimestamp(day * 86400):%Y-%m-%d}: {by_day[day]}"
+                           for day in sorted(by_day, reverse=True)[:14])
+        embed.add_field(name="By day (UTC)", value=daily or "-", inline=False)
+        await ctx.send(embed=embed)
+
+    @bug.command()
+    @commands.check(can_mod)
+    async def clusters(self, ctx, count: int = 500, threshold: float = 0.6):
+        """
+        Show groups of similar reports among the most recent ones
+        :param count: how many of the latest reports to look at, at most CLUSTER_REPORT_LIMIT
+        :param threshold: share of words two reports need in common to be grouped, more than 0 and up to 1
+        """
+        if not 0 < threshold <= 1:
+            await ctx.send("The threshold has to be more than 0 and at most 1")
+            return
+        count = max(1, min(count, CLUSTER_REPORT_LIMIT))
+        # comparing the buckets is numpy work that would hold up the event loop
+        groups = await asyncio.to_thread(
+            self.similar_reports.clusters, self.similar_reports.latest(count), threshold)
+        groups = groups[:SEARCH_RESULT_LIMIT]
+        if not groups:
+            await ctx.send(f"No similar reports among the last {count}")
+            return
+        rows = await BugReport.filter(id__in=[group[0] for group in groups]) \
+            .values('id', 'title', 'platform', 'branch', 'app_version', 'message_id')
+        first_reports = {row['id']: row for row in rows}
+        lines = []
+        for group in groups:
+            ids = ', '.join(f"#{report_id}" for report_id in group)
+            line = f"**{len(group)} reports**: {Utils.trim_message(ids, 200)}"
+            if group[0] in first_reports:
+                line = f"{line}\n{self.format_report_line(first_reports[group[0]])}"
+            lines.append(line)
+        embed = Embed(
+            timestamp=ctx.message.created_at,
+            color=0x50f3d7,
+            title=f'Similar reports among the last {count}',
+            description="\n".join(lines))
+        await ctx.send(embed=embed)
+
+    async def get_similar_report_lines(self, title, actual, steps) -> list:
+        """:return: a line for each earlier report that looks like this one, most similar first"""
+        similar = self.similar_reports.similar(Similarity.report_text(title, actual, steps),
+                                               limit=SIMILAR_REPORT_LIMIT, threshold=SIMILAR_REPORT_THRESHOLD)
+        if not similar:
+            return []
+        rows = await BugReport.filter(id__in=[report_id for report_id, score in similar]) \
+            .values('id', 'title', 'platform', 'branch', 'app_version', 'message_id')
+        by_id = {row['id']: row for row in rows}
+        return [self.format_report_line(by_id[report_id]) for report_id, score in similar if report_id in by_id]
+
     @bug.group(name='platforms', aliases=['platform'], invoke_without_command=True)
     @commands.check(sky.can_admin)
     async def platforms(self, ctx):
         platforms = dict()
 
-        for row in await BugReportingPlatform.all():
-            if row.branch in platforms:
-                if row.platform in platforms[row.branch]:
-                    await self.bot.guild_log(ctx.guild.id, f"duplicate platform in db: {row.platform}/{row.branch}")
-            if row.branch not in platforms:
-                platforms[row.branch] = list()
-            platforms[row.branch].append(row.platform)
+        for platform, branches in self.routes.items():
+            for branch in branches:
+                platforms.setdefault(branch, list()).append(platform)
 
         embed = Embed(
             timestamp=ctx.message.created_at,
@@ -365,6 +694,7 @@ class Bugs(BaseCog):
     async def add_platform(self, ctx, platform, branch):
         row, create = await BugReportingPlatform.get_or_create(platform=platform, branch=branch)
         if create:
+            self.routes.setdefault(platform, dict())[branch] = dict()
             await ctx.send(f"Ok, I added `{platform}/{branch}` to my database")
         else:
             await ctx.send(f"That platform/branch combination is already in my database")
@@ -378,6 +708,12 @@ class Bugs(BaseCog):
         else:
             try:
                 await row.delete()
+                # report channels of the platform are deleted with it
+                branches = self.routes.get(platform, dict())
+                branches.pop(branch, None)
+                if not branches:
+                    self.routes.pop(platform, None)
+                self.routes_changed()
                 await ctx.send(f"Ok, I removed `{platform}/{branch}` from my database")
             except OperationalError:
                 await ctx.send(f"I couldn't delete `{platform}/{branch}` from my database. I really tried, I promise!")
@@ -391,25 +727,22 @@ class Bugs(BaseCog):
             timestamp=ctx.message.created_at,
             color=0x50f3d7,
             title='Bug Reporting Channels')
-        guild_row = await Guild.get_or_none(serverid=ctx.guild.id)
         guild_channels = []
         non_guild_channels = dict()
-        for row in await BugReportingPlatform.all().prefetch_related("bug_channels"):
-            for channel_row in row.bug_channels:
-                channel = self.bot.get_channel(channel_row.channelid)
-                if not channel:
-                    await channel_row.delete()
-                    continue
-                description = f"{row.platform}/{row.branch}: {channel.mention}"
-                await channel_row.fetch_related('guild')
-                channel_serverid = channel_row.guild.serverid
-                if channel_row.guild == guild_row:
-                    guild_channels.append(description)
-                else:
-                    # TODO: get guild names and add to description
-                    if channel_serverid not in non_guild_channels:
-                        non_guild_channels[channel_serverid] = []
-                    non_guild_channels[channel_serverid].append(description)
+        for platform, branch, channel_id, channel_serverid in self.list_routes():
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                await BugReportingChannel.filter(channelid=channel_id).delete()
+                self.remove_routes([channel_id])
+                continue
+            description = f"{platform}/{branch}: {channel.mention}"
+            if channel_serverid == ctx.guild.id:
+                guild_channels.append(description)
+            else:
+                # TODO: get guild names and add to description
+                if channel_serverid not in non_guild_channels:
+                    non_guild_channels[channel_serverid] = []
+                non_guild_channels[channel_serverid].append(description)
         if guild_channels:
             embed.add_field(name=f'`{ctx.guild.name}` server', value="\n".join(guild_channels))
         for guild_id, channel_list in non_guild_channels.items():
@@ -430,6 +763,7 @@ class Bugs(BaseCog):
             platform = row.platform.platform
             branch = row.platform.branch
             await row.delete()
+            self.remove_routes([channel.id])
             await ctx.send(f"Removed `{platform}`/`{branch}`/{channel.mention} from my database")
         except OperationalError:
             await ctx.send(f"Could not find {channel.mention} in my database")
@@ -464,6 +798,8 @@ class Bugs(BaseCog):
             return
 
         if created:
+            self.routes.setdefault(platform, dict()).setdefault(branch, dict())[channel.id] = ctx.guild.id
+            self.routes_changed()
             await ctx.send(f"{channel.mention} will now be used to record `{platform}/{branch}` bug reports")
         else:
             await ctx.send(f"{channel.mention} was already configured for `{platform}/{branch}` bug reports")
@@ -473,8 +809,6 @@ class Bugs(BaseCog):
     @commands.check(sky.can_admin)
     async def reset_active(self, ctx):
         """Reset active bug reports. Bot will attempt to DM users whose reports are canceled."""
-        to_kill = self.bug_report_queue.qsize()
-        # to_kill = len(self.in_progress)
         active_keys = [key for key in self.in_progress.keys()]
         for uid in active_keys:
             try:
@@ -491,7 +825,7 @@ class Bugs(BaseCog):
                                               active_keys=len(active_keys),
                                               in_progress=len(self.in_progress)))
 
-    async def report_bug(self, user, trigger_channel):
+    async def report_bug(self, user, trigger_channel, resume=False):
         # fully ignore muted users
         m = self.bot.metrics
         last_message = [message async for message in trigger_channel.history(limit=1)]
@@ -505,12 +839,14 @@ class Bugs(BaseCog):
 
         # only members of official guild allowed, and must be verified
         if not member or len(member.roles) < 2:
+            self.drop_session(user.id)
             return
 
         guild_config = await self.bot.get_guild_db_config(guild.id)
         guild_mute_role = guild.get_role(guild_config.mutedrole)
         if member and guild_mute_role and (guild_mute_role in member.roles):
             # member is muted in at least one server. hard pass on letting them report
+            self.drop_session(user.id)
             return
 
         if user.id in self.in_progress:
@@ -553,7 +889,7 @@ class Bugs(BaseCog):
                 return
 
         # Start a bug report
-        task = self.bot.loop.create_task(self.actual_bug_reporter(user, trigger_channel))
+        task = self.bot.loop.create_task(self.actual_bug_reporter(user, trigger_channel, resume))
         sweep = self.bot.loop.create_task(self.sweep_trash(user, ctx))
         self.in_progress[user.id] = task
         self.sweeps[user.id] = sweep
@@ -566,7 +902,7 @@ class Bugs(BaseCog):
             Logging.info(f"Cancelling in-progress report for {get_member_log_name(user)}")
             raise e
 
-    async def actual_bug_reporter(self, user, trigger_channel):
+    async def actual_bug_reporter(self, user, trigger_channel, resume=False):
         # wrap everything so users can't get stuck in limbo
         m = self.bot.metrics
         active_question = None
@@ -577,24 +913,40 @@ class Bugs(BaseCog):
             last_message = last_message[0]
             ctx = await self.bot.get_context(last_message)
 
+            # answers so far. `step` is the next question to ask
+            session = self.sessions.get(str(user.id)) if resume else None
+            if session is None:
+                resume = False
+                session = dict(step=0)
+            session['channel'] = trigger_channel.id
+
             # vars to store everything
             asking = True
-            platform = ""
-            branch = ""
-            app_build = None
-            platform_version = ''
-            app_version = ''
-            deviceinfo = ''
-            title = ''
-            actual = ''
-            steps = ''
-            expected = ''
-            additional = False
-            additional_text = ""
-            attachments = False
-            attachment_links = []
+            platform = session.get('platform', "")
+            branch = session.get('branch', "")
+            app_build = session.get('app_build')
+            platform_version = session.get('platform_version', '')
+            app_version = session.get('app_version', '')
+            deviceinfo = session.get('deviceinfo', '')
+            title = session.get('title', '')
+            actual = session.get('actual', '')
+            steps = session.get('steps', '')
+            expected = session.get('expected', '')
+            additional = session.get('additional', False)
+            additional_text = session.get('additional_text', "")
+            attachments = session.get('attachments', False)
+            attachment_links = session.get('attachment_links', [])
             report = None
 
+            def checkpoint(step, **answers):
+                # saved so a report cut off by a restart can pick up at `step`
+                session.update(answers)
+                session['step'] = step
+                self.save_session(user.id, session)
+
+            def answered(step):
+                return session['step'] > step
+
             # define all the parts we need as inner functions for easier sinfulness
 
             async def abort():
@@ -640,53 +992,76 @@ class Bugs(BaseCog):
                 return real_check
 
             async def send_report():
-                # save report in the database
-                br = await BugReport.create(reporter=user.id, platform=platform, deviceinfo=deviceinfo,
-                                            platform_version=platform_version, branch=branch, app_version=app_version,
-                                            app_build=app_build, title=title, steps=steps, expected=expected,
-                                            actual=actual, additional=additional_text,
-                                            reported_at=int(utcnow().timestamp()))
-                for url in attachment_links:
-                    await Attachments.create(report=br, url=url)
+                # save report and attachments in one go
+                async with in_transaction() as connection:
+                    br = await BugReport.create(reporter=user.id, platform=platform, deviceinfo=deviceinfo,
+                                                platform_version=platform_version, branch=branch,
+                                                app_version=app_version, app_build=app_build, title=title,
+                                                steps=steps, expected=expected, actual=actual,
+                                                additional=additional_text, reported_at=int(utcnow().timestamp()),
+                                                using_db=connection)
+                    if attachment_links:
+                        await Attachments.bulk_create([Attachments(report=br, url=url) for url in attachment_links],
+                                                      using_db=connection)
+                self.similar_reports.add(br.id, Similarity.report_text(title, actual, steps))
 
                 # send report
-                channel_name = f"{platform}_{branch}".lower()
+                report_channels = list()
+                for channel_id in self.get_route(platform, branch):
+                    report_channel = self.bot.get_channel(channel_id)
+                    if report_channel is None:
+                        await Logging.bot_log(f"can't send bug report #{br.id} to nonexistent channel {channel_id}")
+                        continue
+                    report_channels.append(report_channel)
+                header = Lang.get_locale_string("bugs/report_header", ctx, id=br.id, user=user.mention)
+                attachment_info = None
+                if len(attachment_links) != 0:
+                    key = "attachment_info" if len(attachment_links) == 1 else "attachment_info_plural"
+                    attachment_info = Lang.get_locale_string(f"bugs/{key}", ctx, id=br.id,
+                                                             links="\n".join(attachment_links))
+
+                send_limit = asyncio.Semaphore(REPORT_SEND_CONCURRENCY)
+
+                async def send_to(report_channel):
+                    async with send_limit:
+                        message = await report_channel.send(content=header, embed=report)
+                        attachment = None
+                        if attachment_info is not None:
+                            attachment = await report_channel.send(attachment_info)
+                        return message, attachment
+
+                results = await asyncio.gather(*(send_to(report_channel) for report_channel in report_channels),
+                                               return_exceptions=True)
 
                 report_id_saved = False
-                attachment_id_saved = False
                 user_reported_channels = list()
                 all_reported_channels = list()
-                selected_platform = await BugReportingPlatform.get(platform=platform, branch=branch)
-
-                for row in await BugReportingChannel.filter(platform=selected_platform):
-                    report_channel = self.bot.get_channel(row.channelid)
-                    message = await report_channel.send(
-                        content=Lang.get_locale_string("bugs/report_header", ctx, id=br.id, user=user.mention),
-                        embed=report)
-                    attachment = None
-                    if len(attachment_links) != 0:
-                        key = "attachment_info" if len(attachment_links) == 1 else "attachment_info_plural"
-                        attachment = await report_channel.send(
-                            Lang.get_locale_string(f"bugs/{key}", ctx, id=br.id, links="\n".join(attachment_links)))
-
-                    if report_channel.guild.id == Configuration.get_var('guild_id'):
+                # results come back in channel order, so the official message ids don't depend on which send won
+                for report_channel, result in zip(report_channels, results):
+                    if isinstance(result, BaseException):
+                        await Utils.handle_exception(f"failed to send bug report #{br.id} to {report_channel}",
+                                                     self.bot, result)
+                        continue
+                    message, attachment = result
+
+                    if report_channel.guild.id == Configuration.CONFIG.guild_id:
                         # Only save report and attachment IDs for posts in the official server
-                        if not report_id_saved and not attachment_id_saved:
+                        if not report_id_saved:
                             if attachment is not None:
                                 br.attachment_message_id = attachment.id
-                                attachment_id_saved = True
                             br.message_id = message.id
                             report_id_saved = True
-                            await br.save()
                             user_reported_channels.append(report_channel.mention)
                     else:
                         # guild is not the official server. if author is member, include user_reported_channels
-                        this_guild = self.bot.get_guild(report_channel.guild.id)
-                        if this_guild.get_member(user.id) is not None:
+                        if report_channel.guild.get_member(user.id) is not None:
                             user_reported_channels.append(report_channel.mention)
 
                     all_reported_channels.append(report_channel)
 
+                if report_id_saved:
+                    await br.save(update_fields=['message_id', 'attachment_message_id'])
+
                 channels_mentions = []
                 channels_ids = set()
                 if not all_reported_channels:
@@ -697,14 +1072,14 @@ class Bugs(BaseCog):
                     channels_ids.add(report_channel.id)
                 await channel.send(
                     Lang.get_locale_string("bugs/report_confirmation", ctx, channel_info=', '.join(channels_mentions)))
-                await self.send_bug_info(*channels_ids)
+                self.refresh_bug_info(*channels_ids)
 
             async def restart():
                 nonlocal restarting
                 restarting = True
                 m.reports_restarted.inc()
                 await self.delete_progress(user.id)
-                self.enqueue_bug_report(user, trigger_channel)
+                await self.enqueue_bug_report(user, trigger_channel)
 
             # start global report timer and question timer
             report_start_time = question_start_time = time.time()
@@ -725,213 +1100,241 @@ class Bugs(BaseCog):
                 active_question = active_question + 1
 
             active_question = 0
-            await Questions.ask(self.bot, channel, user, Lang.get_locale_string("bugs/question_ready", ctx),
+            ready_question = "bugs/question_resume" if resume else "bugs/question_ready"
+            await Questions.ask(self.bot, channel, user, Lang.get_locale_string(ready_question, ctx),
                                 [
                                     Questions.Option("YES", "Press this reaction to answer YES and begin a report"),
                                     Questions.Option("NO", "Press this reaction to answer NO", handler=abort),
                                 ], show_embed=True, locale=ctx)
             update_metrics()
-
             if asking:
-                # question 1: android or ios?
-                platforms = set()
-                for platform_row in await BugReportingPlatform.all():
-                    platforms.add(platform_row.platform)
-
-                if len(platforms) == 0:
-                    platform = "NONE"
-                elif len(platforms) == 1:
-                    platform = platforms.pop()
-                else:
-                    options = []
-                    for platform_name in platforms:
-                        options.append(
-                            Questions.Option(
-                                platform_name.upper(),
-                                platform_name,
-                                set_platform,
-                                [platform_name]))
-                    await Questions.ask(self.bot, channel, user, Lang.get_locale_string("bugs/question_platform", ctx),
-                                        options, show_embed=True, locale=ctx)
-                update_metrics()
+                # resumed reports skip ahead, keep the question metrics lined up with the question being asked
+                active_question = max(active_question, session['step'])
+                checkpoint(max(1, session['step']))
 
-                try:
-                    # question 2: android/ios version
-                    platform_version = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_platform_version",
-                                               ctx,
-                                               platform=platform),
-                        validator=verify_version, locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
-
-                try:
-                    # question 3: hardware info
-                    device_info_platform = Lang.get_locale_string(f"bugs/device_info_{platform.lower()}", ctx)
-                    deviceinfo = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_device_info",
-                                               ctx, platform=platform,
-                                               device_info_help=device_info_platform,
-                                               max=BugReportFieldLength.deviceinfo),
-                        validator=max_length(BugReportFieldLength.deviceinfo), locale=ctx)
+            if asking:
+                if not answered(1):
+                    # question 1: android or ios?
+                    platforms = set(self.routes)
+
+                    if len(platforms) == 0:
+                        platform = "NONE"
+                    elif len(platforms) == 1:
+                        platform = platforms.pop()
+                    else:
+                        options = []
+                        for platform_name in platforms:
+                            options.append(
+                                Questions.Option(
+                                    platform_name.upper(),
+                                    platform_name,
+                                    set_platform,
+                                    [platform_name]))
+                        await Questions.ask(self.bot, channel, user, Lang.get_locale_string("bugs/question_platform", ctx),
+                                            options, show_embed=True, locale=ctx)
                     update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                    checkpoint(2, platform=platform)
 
-                # question 4: stable or beta?
-                branches = set()
-                for platform_row in await BugReportingPlatform.all():
-                    # select branches that are available for the chosen platform
-                    if platform_row.platform == platform:
-                        branches.add(platform_row.branch)
-                if len(branches) == 0:
-                    branch = "NONE"
-                elif len(branches) == 1:
-                    branch = branches.pop()
-                else:
-                    options = []
-                    for branch_name in branches:
-                        branch_display_name = "Live" if branch_name.lower() == 'stable' else branch_name
-                        options.append(
-                            Questions.Option(
-                                branch_name.upper(),
-                                branch_display_name,
-                                set_branch,
-                                [branch_name]))
-                    await Questions.ask(self.bot, channel, user, Lang.get_locale_string("bugs/question_app_branch", ctx),
-                                        options, show_embed=True, locale=ctx)
-                update_metrics()
+                if not answered(2):
+                    try:
+                        # question 2: android/ios version
+                        platform_version = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_platform_version",
+                                                   ctx,
+                                                   platform=platform),
+                            validator=verify_version, locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(3, platform_version=platform_version)
 
-                try:
-                    # question 5: app version
-                    app_version = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string(
-                            "bugs/question_app_version", ctx,
-                            version_help=Lang.get_locale_string(f"bugs/version_{platform.lower()}", ctx)),
-                        validator=verify_version, locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                if not answered(3):
+                    try:
+                        # question 3: hardware info
+                        device_info_platform = Lang.get_locale_string(f"bugs/device_info_{platform.lower()}", ctx)
+                        deviceinfo = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_device_info",
+                                                   ctx, platform=platform,
+                                                   device_info_help=device_info_platform,
+                                                   max=BugReportFieldLength.deviceinfo),
+                            validator=max_length(BugReportFieldLength.deviceinfo), locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(4, deviceinfo=deviceinfo)
 
-                try:
-                    # question 6: sky app build number
-                    app_build = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_app_build", ctx),
-                        validator=verify_version, locale=ctx)
+                if not answered(4):
+                    # question 4: stable or beta?
+                    # select branches that are available for the chosen platform
+                    branches = set(self.routes.get(platform, dict()))
+                    if len(branches) == 0:
+                        branch = "NONE"
+                    elif len(branches) == 1:
+                        branch = branches.pop()
+                    else:
+                        options = []
+                        for branch_name in branches:
+                            branch_display_name = "Live" if branch_name.lower() == 'stable' else branch_name
+                            options.append(
+                                Questions.Option(
+                                    branch_name.upper(),
+                                    branch_display_name,
+                                    set_branch,
+                                    [branch_name]))
+                        await Questions.ask(self.bot, channel, user, Lang.get_locale_string("bugs/question_app_branch", ctx),
+                                            options, show_embed=True, locale=ctx)
                     update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                    checkpoint(5, branch=branch)
 
-                try:
-                    # question 7: Title
-                    title = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_title", ctx, max=BugReportFieldLength.title),
-                        validator=max_length(BugReportFieldLength.title), locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                if not answered(5):
+                    try:
+                        # question 5: app version
+                        app_version = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string(
+                                "bugs/question_app_version", ctx,
+                                version_help=Lang.get_locale_string(f"bugs/version_{platform.lower()}", ctx)),
+                            validator=verify_version, locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(6, app_version=app_version)
 
-                try:
-                    # question 8: "actual" - defect behavior
-                    actual = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_actual", ctx, max=BugReportFieldLength.actual),
-                        validator=max_length(BugReportFieldLength.actual), locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                if not answered(6):
+                    try:
+                        # question 6: sky app build number
+                        app_build = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_app_build", ctx),
+                            validator=verify_version, locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(7, app_build=app_build)
 
-                try:
-                    # question 9: steps to reproduce
-                    steps = await Questions.ask_text(
-                        self.bot,
-                        channel,
-                        user,
-                        Lang.get_locale_string("bugs/question_steps",
-                                               ctx, max=BugReportFieldLength.steps),
-                        validator=max_length(BugReportFieldLength.steps),
-                        locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                if not answered(7):
+                    try:
+                        # question 7: Title
+                        title = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_title", ctx, max=BugReportFieldLength.title),
+                            validator=max_length(BugReportFieldLength.title), locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(8, title=title)
 
-                try:
-                    # question 10: expected behavior
-                    expected = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_expected", ctx, max=BugReportFieldLength.expected),
-                        validator=max_length(BugReportFieldLength.expected), locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                if not answered(8):
+                    try:
+                        # question 8: "actual" - defect behavior
+                        actual = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_actual", ctx, max=BugReportFieldLength.actual),
+                            validator=max_length(BugReportFieldLength.actual), locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(9, actual=actual)
 
-                try:
-                    # question 11: attachments y/n
-                    attachment_prompt = Lang.get_locale_string("bugs/question_attachments", ctx)
+                if not answered(9):
                     try:
-                        platform_attachment_prompt = Lang.get_locale_string(
-                            f"bugs/question_attachments_{platform.lower()}", ctx)
-                        attachment_prompt += f"\n{platform_attachment_prompt}"
+                        # question 9: steps to reproduce
+                        steps = await Questions.ask_text(
+                            self.bot,
+                            channel,
+                            user,
+                            Lang.get_locale_string("bugs/question_steps",
+                                                   ctx, max=BugReportFieldLength.steps),
+                            validator=max_length(BugReportFieldLength.steps),
+                            locale=ctx)
+                        update_metrics()
                     except KeyError:
+                        # Expected when a question is not defined
                         pass
-                    await Questions.ask(
-                        self.bot, channel, user, attachment_prompt,
-                        [
-                            Questions.Option("YES",
-                                             Lang.get_locale_string("bugs/attachments_yes", ctx),
-                                             handler=add_attachments),
-                            Questions.Option("NO", Lang.get_locale_string("bugs/skip_step", ctx))
-                        ], show_embed=True, timeout=300, locale=ctx)
-                    update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                    checkpoint(10, steps=steps)
 
-                if attachments:
-                    # question 12: attachments
-                    attachment_links = await Questions.ask_attachements(
-                        self.bot, channel, user, timeout=300, locale=ctx)
-                    attachment_links = set(attachment_links)
-                # update metrics outside condition to keep count up-to-date and reflect skipped question as zero time
-                update_metrics()
+                if not answered(10):
+                    try:
+                        # question 10: expected behavior
+                        expected = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_expected", ctx, max=BugReportFieldLength.expected),
+                            validator=max_length(BugReportFieldLength.expected), locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(11, expected=expected)
 
-                try:
-                    # question 13: additional info y/n
-                    await Questions.ask(
-                        self.bot, channel, user, Lang.get_locale_string("bugs/question_additional", ctx),
-                        [
-                            Questions.Option("YES",
-                                             Lang.get_locale_string("bugs/additional_info_yes", ctx),
-                                             handler=add_additional),
-                            Questions.Option("NO", Lang.get_locale_string("bugs/skip_step", ctx))
-                        ], show_embed=True, locale=ctx)
+                if not answered(11):
+                    try:
+                        # question 11: attachments y/n
+                        attachment_prompt = Lang.get_locale_string("bugs/question_attachments", ctx)
+                        try:
+                            platform_attachment_prompt = Lang.get_locale_string(
+                                f"bugs/question_attachments_{platform.lower()}", ctx)
+                            attachment_prompt += f"\n{platform_attachment_prompt}"
+                        except KeyError:
+                            pass
+                        await Questions.ask(
+                            self.bot, channel, user, attachment_prompt,
+                            [
+                                Questions.Option("YES",
+                                                 Lang.get_locale_string("bugs/attachments_yes", ctx),
+                                                 handler=add_attachments),
+                                Questions.Option("NO", Lang.get_locale_string("bugs/skip_step", ctx))
+                            ], show_embed=True, timeout=300, locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(12, attachments=attachments)
+
+                if not answered(12):
+                    if attachments:
+                        # question 12: attachments
+                        attachment_links = await Questions.ask_attachements(
+                            self.bot, channel, user, timeout=300, locale=ctx)
+                        attachment_links = set(attachment_links)
+                    # update metrics outside condition to keep count up-to-date and reflect skipped question as zero time
                     update_metrics()
-                except KeyError:
-                    # Expected when a question is not defined
-                    pass
+                    checkpoint(13, attachment_links=list(attachment_links))
 
-                if additional:
-                    # question 14: additional info
-                    additional_text = await Questions.ask_text(
-                        self.bot, channel, user,
-                        Lang.get_locale_string("bugs/question_additional_info", ctx),
-                        validator=max_length(BugReportFieldLength.additional), locale=ctx)
-                # update metrics outside condition to keep count up-to-date and reflect skipped question as zero time
-                update_metrics()
+                if not answered(13):
+                    try:
+                        # question 13: additional info y/n
+                        await Questions.ask(
+                            self.bot, channel, user, Lang.get_locale_string("bugs/question_additional", ctx),
+                            [
+                                Questions.Option("YES",
+                                                 Lang.get_locale_string("bugs/additional_info_yes", ctx),
+                                                 handler=add_additional),
+                                Questions.Option("NO", Lang.get_locale_string("bugs/skip_step", ctx))
+                            ], show_embed=True, locale=ctx)
+                        update_metrics()
+                    except KeyError:
+                        # Expected when a question is not defined
+                        pass
+                    checkpoint(14, additional=additional)
+
+                if not answered(14):
+                    if additional:
+                        # question 14: additional info
+                        additional_text = await Questions.ask_text(
+                            self.bot, channel, user,
+                            Lang.get_locale_string("bugs/question_additional_info", ctx),
+                            validator=max_length(BugReportFieldLength.additional), locale=ctx)
+                    # update metrics outside condition to keep count up-to-date and reflect skipped question as zero time
+                    update_metrics()
+                    checkpoint(15, additional_text=additional_text)
 
                 # assemble the report and show to user for review
                 report = Embed(timestamp=datetime.utcfromtimestamp(time.time()))
@@ -970,6 +1373,12 @@ class Bugs(BaseCog):
                         attachment_message += f"{a}\n"
                     await channel.send(attachment_message)
 
+                similar_lines = await self.get_similar_report_lines(title, actual, steps)
+                if similar_lines:
+                    await channel.send(Lang.get_locale_string("bugs/similar_reports", ctx,
+                                                              reports="\n".join(similar_lines)),
+                                       allowed_mentions=AllowedMentions.none())
+
                 review_time = 300
                 await asyncio.sleep(1)
 
@@ -999,6 +1408,10 @@ class Bugs(BaseCog):
                 m.reports_exit_question.observe(active_question)
         except CancelledError as ex:
             Logging.info(f"Cancel actual bug reporter. user {get_member_log_name(user)}")
+            if self.unloading:
+                # session is kept. the user gets to pick it up again when the bot is back
+                await channel.send(Lang.get_locale_string("bugs/report_interrupted", ctx))
+                raise ex
             await channel.send(f"The bot ran into unexpected trouble and your report got broken. Please try again.")
             m.report_incomplete_count.inc()
             if active_question is not None:
@@ -1009,6 +1422,8 @@ class Bugs(BaseCog):
             await Utils.handle_exception("bug reporting", self.bot, ex)
             raise ex
         finally:
+            if not self.unloading:
+                self.drop_session(user.id)
             await self.delete_progress(user.id)
 
     @commands.Cog.listener()
@@ -1032,7 +1447,7 @@ class Bugs(BaseCog):
                     )
                 except Exception as e:
                     await Utils.handle_exception("bug invocation failure", self.bot, e)
-            self.enqueue_bug_report(user, channel)
+            await self.enqueue_bug_report(user, channel)
 
 
 async def setup(bot):
@@ -2,10 +2,11 @@ import discord
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Configuration, Logging, Emoji, Lang
+from utils import Configuration, Logging, Emoji, Lang, Permissions
 from utils.Database import ConfigChannel
 from utils.Utils import validate_channel_name
 from utils import Utils
+from utils.Permissions import Capability
 
 
 class ChannelConfig(BaseCog):
@@ -47,8 +48,7 @@ class ChannelConfig(BaseCog):
         await ConfigChannel.filter(serverid=guild.id).delete()
 
     async def cog_check(self, ctx):
-        return (ctx.guild is not None
-                and (ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx)))
+        return ctx.guild is not None and await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @commands.group(name="channel_config", aliases=["chanconf", "channelconfig"], invoke_without_command=True)
     @commands.guild_only()
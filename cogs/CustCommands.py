@@ -2,8 +2,9 @@ import discord
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Configuration, Emoji, Lang, Utils, Questions
+from utils import Configuration, Emoji, Lang, Utils, Questions, Permissions
 from utils.Database import CustomCommand
+from utils.Permissions import Capability
 
 
 class CustCommands(BaseCog):
@@ -13,7 +14,7 @@ class CustCommands(BaseCog):
         self.commands = dict()
 
     async def cog_check(self, ctx):
-        return ((ctx.guild and ctx.author.guild_permissions.ban_members) or await self.bot.permission_manage_bot(ctx))
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     async def on_ready(self):
         for guild in self.bot.guilds:
@@ -211,7 +212,7 @@ class CustCommands(BaseCog):
             return
         if message.guild.id not in self.commands:
             return
-        prefix = Configuration.get_var("bot_prefix")
+        prefix = Configuration.CONFIG.bot_prefix
         if message.content.startswith(prefix, 0):
             for trigger in self.commands[message.guild.id]:
                 cleaned_message = await Utils.clean(message.content.lower())
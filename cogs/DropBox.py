@@ -13,8 +13,9 @@ from tortoise.exceptions import DoesNotExist
 import utils.Logging
 from utils.Logging import TCol
 from cogs.BaseCog import BaseCog
-from utils import Lang, Questions, Utils, Logging
+from utils import Lang, Questions, Utils, Logging, Permissions
 from utils.Database import DropboxChannel
+from utils.Permissions import Capability
 
 
 class DropBox(BaseCog):
@@ -55,8 +56,7 @@ class DropBox(BaseCog):
         self.clean_channels.cancel()
 
     async def cog_check(self, ctx):
-        return ctx.guild is not None \
-            and (ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx))
+        return ctx.guild is not None and await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -267,7 +267,7 @@ class DropBox(BaseCog):
                         my_member = guild.get_member(message.author.id)
                         if my_member is None:
                             continue
-                        is_mod = my_member.guild_permissions.ban_members or await self.bot.member_is_admin(my_member.id)
+                        is_mod = await Permissions.member_has(my_member, Capability.BAN_MEMBERS | Capability.BOT_ADMIN)
                         age = (now-message.created_at).seconds
                         expired = age > drop.deletedelayms / 1000
 
@@ -532,7 +532,7 @@ class DropBox(BaseCog):
             message_not_in_guild = not hasattr(message.channel, "guild") or message.channel.guild is None
             author_not_in_guild = not hasattr(message.author, "guild")
             channel_not_in_dropboxes = message.channel.id not in self.dropboxes[guild_id]
-            is_mod = message.author.guild_permissions.ban_members or await self.bot.member_is_admin(message.author.id)
+            is_mod = await Permissions.member_has(message.author, Capability.BAN_MEMBERS | Capability.BOT_ADMIN)
         except Exception as e:
             return
 
@@ -6,8 +6,9 @@ from discord import Role, TextChannel, Message, AllowedMentions, Forbidden, HTTP
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Utils, Lang, Questions, Logging
+from utils import Utils, Lang, Questions, Logging, Permissions
 from utils.Database import Guild
+from utils.Permissions import Capability
 
 
 class GuildConfig(BaseCog):
@@ -35,7 +36,7 @@ class GuildConfig(BaseCog):
     async def cog_check(self, ctx):
         if ctx.guild is None:
             return False
-        return ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     async def get_guild_config(self, guild_id):
         if guild_id in Utils.GUILD_CONFIGS:
@@ -6,14 +6,24 @@ from random import randint, random, choice
 
 import discord
 import tortoise.exceptions
-from discord import utils, NotFound
+from discord import NotFound
 from discord.ext import commands
 from discord.ext.commands import command, UserConverter, BucketType
 
 from cogs.BaseCog import BaseCog
-from utils import Configuration, Utils, Lang, Emoji, Logging, Questions
+from utils import Configuration, Utils, Lang, Emoji, Logging, Questions, Permissions, Confusables, Animation
 from utils.Database import KrillChannel, KrillConfig, OreoMap, OreoLetters, Guild, KrillByLines
 from utils.Utils import CHANNEL_ID_MATCHER
+from utils.Permissions import Capability
+
+# matched against the oreo skeleton (see Confusables), where spacing, accents and look-alikes are already folded away.
+# the last alternative is what used to be the strip-what's-between-o-and-r recheck: starts with o, and the last r
+# is followed by e then o
+OREO_PATTERN = re.compile(r"o+(?:r+e+|e+r+)o+|お+れ+お+|\Ao.*re+o[^r]*\Z", re.DOTALL)
+DOG_PATTERN = re.compile(r"\bdog\b|\bdoggo\b|\bcookie\b|\bbiscuit\b|\bcanine\b|\bperro\b", re.IGNORECASE)
+ATTACK_TYPE_PATTERN = re.compile(r'shadow_roll\s*|return_home\s*|krill_rider\s*|crab_attack\s*')
+# remove pattern interference
+REG_CLEAN = re.compile(r'[.\[\](){}\\|~*_`\'\"\-+]')
 
 
 class Krill(BaseCog):
@@ -28,10 +38,15 @@ class Krill(BaseCog):
         self.configs = dict()
         self.krilled = dict()
         self.channels = dict()
+        # guild id -> byline id -> KrillByLines row
+        self.bylines = dict()
+        # guild id -> (type, locale) -> rows. locale '' is for every locale
+        self.byline_buckets = dict()
         self.monsters = dict()
         self.ignored = set()
         self.loaded = False
         self.oreo_filter = dict()
+        self.oreo_skeleton = None
         self.oreo_map = None
         self.oreo_defaults = Configuration.get_persistent_var('oreo_filter', dict(
             o=["o", "0", "Ø", "Ǒ", "ǒ", "Ǫ", "ǫ", "Ǭ", "ǭ", "Ǿ", "ǿ", "Ō", "ō", "Ŏ",
@@ -85,6 +100,9 @@ class Krill(BaseCog):
                 Logging.info(row)
                 continue
             self.oreo_filter[row.token_class].add(re.escape(row.token))
+        # the shared fold table takes a moment to build, keep that off the event loop
+        await asyncio.to_thread(Confusables.get_base_table)
+        self.oreo_skeleton = self.build_oreo_skeleton(self.oreo_filter)
 
         self.krilled = Configuration.get_persistent_var("krilled", dict())
         """
@@ -109,6 +127,8 @@ class Krill(BaseCog):
         for row in await KrillChannel.filter(serverid=guild.id):
             my_channels.add(row.channelid)
         self.channels[guild.id] = my_channels
+        self.bylines[guild.id] = {row.id: row for row in await self.configs[guild.id].bylines}
+        self.index_bylines(guild.id)
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -123,6 +143,8 @@ class Krill(BaseCog):
         # delete configs from memory
         del self.channels[guild.id]
         del self.configs[guild.id]
+        self.bylines.pop(guild.id, None)
+        self.byline_buckets.pop(guild.id, None)
 
     async def trigger_krill(self, user_id):
         # TODO: read configured duration
@@ -149,13 +171,13 @@ class Krill(BaseCog):
         return await Utils.can_mod_official(ctx)
 
     async def can_admin_krill(ctx):
-        return ctx.author.guild_permissions.manage_channels or await Utils.BOT.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.MANAGE_CHANNELS)
 
     async def can_krill(ctx):
         # mod, empty channel list, or matching channel required
         no_channels = ctx.cog.channels[ctx.guild.id] == set()
         channel_match = ctx.channel.id in ctx.cog.channels[ctx.guild.id]
-        bypass = ctx.author.guild_permissions.mute_members or await Utils.BOT.permission_manage_bot(ctx)
+        bypass = await Permissions.check(ctx, Capability.MUTE_MEMBERS)
         return bypass or no_channels or channel_match
 
     @commands.group(name="oreo", invoke_without_command=True)
@@ -184,7 +206,7 @@ class Krill(BaseCog):
         """Search a string for unfiltered characters."""
         checked = ""
         found = False
-        pattern = self.get_oreo_patterns()['chars']
+        skeleton = self.oreo_skeleton
 
         # TODO: recognize emojis?
         for letter in value:
@@ -192,7 +214,7 @@ class Krill(BaseCog):
                 checked = checked + letter
             else:
                 continue
-            if not pattern.search(letter):
+            if not skeleton.covers(letter):
                 found = True
                 await ctx.send(Lang.get_locale_string("krill/letter_not_found", ctx, letter=letter))
         if not found:
@@ -235,9 +257,14 @@ class Krill(BaseCog):
             await ctx.send(Lang.get_locale_string( "krill/letter_already_filtered", ctx, letter=x))
             return
 
+        if not Confusables.token_chars(value):
+            await ctx.send(f"`{value}` doesn't match any character, so it was not added")
+            return
+
         try:
-            self.oreo_filter[letter].add(value)
             await OreoLetters.create(token_class=letter, token=value)
+            new_filter = self.get_changed_filter(letter, add=value)
+            self.oreo_filter, self.oreo_skeleton = new_filter, self.build_oreo_skeleton(new_filter)
             await ctx.send(Lang.get_locale_string("krill/letter_filter_added", ctx, letter=value, category=x))
         except Exception as e:
             await Utils.handle_exception('Failed to add oreo filter letter', self.bot, e)
@@ -269,7 +296,8 @@ class Krill(BaseCog):
         try:
             letter_row = await OreoLetters.get(token_class=letter, token=value)
             await letter_row.delete()
-            self.oreo_filter[letter].remove(value)
+            new_filter = self.get_changed_filter(letter, remove=value)
+            self.oreo_filter, self.oreo_skeleton = new_filter, self.build_oreo_skeleton(new_filter)
             await ctx.send(Lang.get_locale_string("krill/letter_filter_removed", ctx, letter=value, category=x))
         except tortoise.exceptions.DoesNotExist:
             await ctx.send(f"Can't delete `{value}` from the letter `{letter}` register because it's not in that list")
@@ -345,36 +373,39 @@ class Krill(BaseCog):
         else:
             await ctx.send(Lang.get_locale_string("krill/member_not_found", ctx, name=member.mention))
 
-    def get_oreo_patterns(self):
-        # o-ø º.o r...r e é 0 º oおれ
-        # ((o|0|ø|º)[ .-]*)+((r|®)[ .-]*)+((e|é)[ .-]*)+((o|0|º)[ .-]*)+
-        o = f"({'|'.join(self.oreo_filter[self.oreo_map.letter_o])})"
-        r = f"({'|'.join(self.oreo_filter[self.oreo_map.letter_r])})"
-        e = f"({'|'.join(self.oreo_filter[self.oreo_map.letter_e])})"
-        oo = f"({'|'.join(self.oreo_filter[self.oreo_map.letter_oh])})"
-        rr = f"({'|'.join(self.oreo_filter[self.oreo_map.letter_re])})"
-        sp = f"({'|'.join(self.oreo_filter[self.oreo_map.space_char])})"
-        n = self.oreo_map.char_count
-        oreo_pattern = re.compile(f"({o}{sp}{n})+"
-                                  f"("
-                                  f"({r}{sp}{n})+"
-                                  f"({e}{sp}{n})+"
-                                  f"|"
-                                  f"({e}{sp}{n})+"
-                                  f"({r}{sp}{n})+"
-                                  f")"
-                                  f"({o}{sp}{n})+",
-                                  re.IGNORECASE)
-
-        # ((お|oh)[ .-]*)+((れ|re)[ .-]*)+((お|oh)[ .-]*)+
-        oreo_jp_pattern = re.compile(f"({oo}{sp}{n})+({rr}{sp}{n})+({oo}{sp}{n})+", re.IGNORECASE)
-
-        # (o|0|º)|(r|®)|(e|é)|(o|0|º|ø)|[ .-]|(お)|(れ)
-        oreo_chars = re.compile(f"{o}|{r}|{e}|{sp}|{oo}|{rr}", re.IGNORECASE)
-
-        or_pattern = re.compile(f"{o}(.*){r}", re.IGNORECASE)
-
-        return dict(en=oreo_pattern, jp=oreo_jp_pattern, chars=oreo_chars, or_pattern=or_pattern)
+    def get_changed_filter(self, letter, add=None, remove=None):
+        """
+        Copy of the oreo filter with one token added or removed, so the current one is never modified in place
+        :param letter: token class
+        :param add: escaped token to add
+        :param remove: escaped token to remove
+        :return: new filter dict
+        """
+        new_filter = {token_class: set(tokens) for token_class, tokens in self.oreo_filter.items()}
+        tokens = new_filter.setdefault(letter, set())
+        if add is not None:
+            tokens.add(add)
+        if remove is not None:
+            tokens.discard(remove)
+        return new_filter
+
+    def build_oreo_skeleton(self, oreo_filter) -> Confusables.Skeleton:
+        """
+        Build the folding table for the oreo filter. Only needed when the letters change, everything else uses
+        self.oreo_skeleton
+        :param oreo_filter: token class -> set of escaped tokens
+        :return: skeleton that folds every filtered letter to o, r, e, お or れ and drops space tokens
+        """
+        def tokens(token_class):
+            return oreo_filter.get(token_class, ())
+
+        return Confusables.Skeleton({
+            'o': tokens(self.oreo_map.letter_o),
+            'r': tokens(self.oreo_map.letter_r),
+            'e': tokens(self.oreo_map.letter_e),
+            'お': tokens(self.oreo_map.letter_oh),
+            'れ': tokens(self.oreo_map.letter_re),
+        }, tokens(self.oreo_map.space_char))
 
     @commands.group(name="krill_config", aliases=['kcfg', 'kfg'], invoke_without_command=True)
     @commands.check(can_mod_krill)
@@ -421,17 +452,38 @@ class Krill(BaseCog):
                 return {'id': i, 'type': v}
         return None
 
+    def index_bylines(self, guild_id):
+        """Bucket the cached bylines of a guild by type and locale. Call after every byline change"""
+        buckets = dict()
+        for row in self.bylines[guild_id].values():
+            buckets.setdefault((int(row.type), row.locale or ''), []).append(row)
+        self.byline_buckets[guild_id] = buckets
+
+    def get_bylines(self, guild_id, byline_types, locale='', channel_id=0):
+        """
+        :param guild_id: guild the attack is in
+        :param byline_types: type ids to include
+        :param locale: locale of the channel. bylines without a locale match every locale
+        :param channel_id: channel of the attack. bylines without a channel match every channel
+        :return: matching byline strings
+        """
+        buckets = self.byline_buckets.get(guild_id, dict())
+        lines = []
+        for byline_type in byline_types:
+            for bucket_locale in {locale, ''}:
+                lines.extend(row.byline for row in buckets.get((byline_type, bucket_locale), ())
+                             if row.channelid in (0, channel_id))
+        return lines
+
     async def list_bylines(self, ctx):
         embed = discord.Embed(
             timestamp=ctx.message.created_at,
             color=0x00CCFF,
             title=Lang.get_locale_string("krill/config_bylines_title", ctx, server_name=ctx.guild.name))
 
-        guild_krill_config = self.configs[ctx.guild.id]
-        await guild_krill_config.fetch_related('bylines')
-        if len(guild_krill_config.bylines) > 0:
-            bylines = list(guild_krill_config.bylines)
-            bylines.sort(key=lambda x: x.type)
+        if len(self.bylines[ctx.guild.id]) > 0:
+            bylines = list(self.bylines[ctx.guild.id].values())
+            bylines.sort(key=lambda x: int(x.type))
 
             for byline in bylines:
                 byline_description = ""
@@ -470,7 +522,7 @@ class Krill(BaseCog):
         await ctx.send(f"{Emoji.get_chat_emoji('WARNING')} {msg}")
 
     async def choose_byline(self, ctx, line_id):
-        guild_bylines = await self.configs[ctx.guild.id].bylines.order_by('id')
+        guild_bylines = sorted(self.bylines[ctx.guild.id].values(), key=lambda x: x.id)
         if line_id != 0:
             try:
                 # check for trigger by db id
@@ -611,18 +663,15 @@ class Krill(BaseCog):
         guild_krill_config = self.configs[ctx.guild.id]
 
         async def yes():
-            try:
-                await KrillByLines.get(krill_config=guild_krill_config, byline=arg)
-            except tortoise.exceptions.DoesNotExist:
-                # not found. may continue creating now
-                pass
-            else:
+            if any(row.byline == arg for row in self.bylines[ctx.guild.id].values()):
                 # already exists. don't create.
                 await ctx.send(Lang.get_locale_string('krill/duplicate_byline', ctx, byline=arg))
                 return
 
             disabled = self.blyine_type_disable(1)
-            await KrillByLines.create(krill_config=guild_krill_config, type=disabled, byline=arg)
+            row = await KrillByLines.create(krill_config=guild_krill_config, type=disabled, byline=arg)
+            self.bylines[ctx.guild.id][row.id] = row
+            self.index_bylines(ctx.guild.id)
             await ctx.send(Lang.get_locale_string('krill/add_byline', ctx, byline=arg))
 
         async def no():
@@ -669,8 +718,9 @@ class Krill(BaseCog):
         except ValueError:
             return
 
-        my_byline.type = str(my_type)
+        my_byline.type = my_type
         await my_byline.save()
+        self.index_bylines(ctx.guild.id)
         await ctx.send(
             f"{Emoji.get_chat_emoji('YES')} byline [{my_byline.id}] type set to `{self.byline_types[my_type]}`"
         )
@@ -693,6 +743,8 @@ class Krill(BaseCog):
             return
 
         await my_byline.delete()
+        self.bylines[ctx.guild.id].pop(byline_id, None)
+        self.index_bylines(ctx.guild.id)
         await ctx.send(Lang.get_locale_string('krill/remove_byline', ctx, number=byline_id))
 
     @krill_config.command()
@@ -808,7 +860,7 @@ class Krill(BaseCog):
     @command()
     @commands.check(can_krill)
     @commands.cooldown(1, 300, BucketType.member)
-    @commands.max_concurrency(3, wait=True)
+    @commands.max_concurrency(2, per=BucketType.channel, wait=True)
     @commands.guild_only()
     async def krill(self, ctx, *, arg=''):
         """Krill attack!!!"""
@@ -837,15 +889,13 @@ class Krill(BaseCog):
         #  remove all uppercase and re-check
         #  only allow letters and emojis?
 
-        patterns = self.get_oreo_patterns()
-        oreo_pattern = patterns['en']
-        oreo_jp_pattern = patterns['jp']
-        dog_pattern = re.compile(r"\bdog\b|\bdoggo\b|\bcookie\b|\bbiscuit\b|\bcanine\b|\bperro\b", re.IGNORECASE)
-        or_pattern = patterns['or_pattern']
+        # one snapshot for the whole check, even if letters are edited while this runs
+        skeleton = self.oreo_skeleton
+        dog_pattern = DOG_PATTERN
 
-        name_is_oreo = oreo_pattern.search(ctx.author.display_name) or oreo_jp_pattern.search(ctx.author.display_name)
+        name_is_oreo = OREO_PATTERN.search(skeleton.fold(ctx.author.display_name))
 
-        victim = re.sub(r'shadow_roll\s*|return_home\s*|krill_rider\s*|crab_attack\s*', '', arg)
+        victim = ATTACK_TYPE_PATTERN.sub('', arg)
         try:
             victim_user = await UserConverter().convert(ctx, victim)
             victim_user = ctx.message.guild.get_member(victim_user.id)
@@ -858,11 +908,9 @@ class Krill(BaseCog):
                 return
 
         # remove pattern interference
-        reg_clean = re.compile(r'[.\[\](){}\\|~*_`\'\"\-+]')
-        victim_name = reg_clean.sub('', victim_name).rstrip().lstrip()
+        victim_name = REG_CLEAN.sub('', victim_name).rstrip().lstrip()
 
-        if oreo_pattern.search(victim_name) or \
-                oreo_jp_pattern.search(victim_name) or \
+        if OREO_PATTERN.search(skeleton.fold(victim_name)) or \
                 name_is_oreo or \
                 dog_pattern.search(victim_name):
             self.bot.get_command("krill").reset_cooldown(ctx)
@@ -883,31 +931,15 @@ class Krill(BaseCog):
 
         bad_emoji = set()
         for emoji in emoji_used:
-            if utils.get(self.bot.emojis, id=int(emoji[2])) is None:
+            if Emoji.get_by_id(int(emoji[2])) is None:
                 bad_emoji.add(emoji[2])
         for bad_id in bad_emoji:
             # remove bad emoji
             this_match = re.compile(f'<(a?):([^: \n]+):{bad_id}>')
             victim_name = this_match.sub('', victim_name)
 
-        #  check for /o(.*)r/ then use captured sequence to remove and re-check
-        name_has_or = or_pattern.search(ctx.author.display_name)
-        victim_has_or = or_pattern.search(victim_name)
-        captured_pattern = []
-        if victim_has_or:
-            captured_pattern.append(victim_has_or.group(2))
-        if name_has_or:
-            captured_pattern.append(name_has_or.group(2))
-        for pattern in captured_pattern:
-            name_cleaned = re.sub(re.escape(pattern), '', victim_name)
-            if oreo_pattern.match(name_cleaned):
-                self.monsters[ctx.author.id] = datetime.now().timestamp()
-                await ctx.send(f"you smell funny, {ctx.author.mention}")
-                return
-
-        # one more backup check
-        victim_is_oreo = oreo_pattern.search(victim_name) or \
-            oreo_jp_pattern.search(victim_name) or \
+        # one more backup check. removing emoji can put the letters back together
+        victim_is_oreo = OREO_PATTERN.search(skeleton.fold(victim_name)) or \
             dog_pattern.search(victim_name)
         if victim_is_oreo:
             self.monsters[ctx.author.id] = datetime.now().timestamp()
@@ -923,26 +955,26 @@ class Krill(BaseCog):
             return
 
         # EMOJI hard coded because... it must be exactly these
-        head = utils.get(self.bot.emojis, id=640741616080125981)
-        body = utils.get(self.bot.emojis, id=640741616281452545)
-        tail = utils.get(self.bot.emojis, id=640741616319070229)
-        red = utils.get(self.bot.emojis, id=641445732670373916)
-        party_kid = utils.get(self.bot.emojis, id=817568025573326868)
-        star = utils.get(self.bot.emojis, id=816861755582054451)
-        blank = utils.get(self.bot.emojis, id=647913138758483977)
-        return_home = utils.get(self.bot.emojis, id=816855701786984528)
-        shadow_roll = utils.get(self.bot.emojis, id=816876601534709760)
+        head = Emoji.get_by_id(640741616080125981)
+        body = Emoji.get_by_id(640741616281452545)
+        tail = Emoji.get_by_id(640741616319070229)
+        red = Emoji.get_by_id(641445732670373916)
+        party_kid = Emoji.get_by_id(817568025573326868)
+        star = Emoji.get_by_id(816861755582054451)
+        blank = Emoji.get_by_id(647913138758483977)
+        return_home = Emoji.get_by_id(816855701786984528)
+        shadow_roll = Emoji.get_by_id(816876601534709760)
         my_name = ctx.guild.get_member(self.bot.user.id).display_name
-        ded_emoji = utils.get(self.bot.emojis, id=641445732246880282)
+        ded_emoji = Emoji.get_by_id(641445732246880282)
 
         # CRABS
-        crab_dance = utils.get(self.bot.emojis, id=825802012615639060)
-        crab_mad_1 = utils.get(self.bot.emojis, id=825922697094758440)
-        crab_mad_2 = utils.get(self.bot.emojis, id=825922696881373185)
-        crab_mad_3 = utils.get(self.bot.emojis, id=825922697031581717)
-        crab_mods = utils.get(self.bot.emojis, id=825929190108168213)
-        crab_walker_1 = utils.get(self.bot.emojis, id=826275692340707378)
-        crab_walker_2 = utils.get(self.bot.emojis, id=826279059523895306)
+        crab_dance = Emoji.get_by_id(825802012615639060)
+        crab_mad_1 = Emoji.get_by_id(825922697094758440)
+        crab_mad_2 = Emoji.get_by_id(825922696881373185)
+        crab_mad_3 = Emoji.get_by_id(825922697031581717)
+        crab_mods = Emoji.get_by_id(825929190108168213)
+        crab_walker_1 = Emoji.get_by_id(826275692340707378)
+        crab_walker_2 = Emoji.get_by_id(826279059523895306)
 
         bot_emoji = u"\U0001F916"
         victim_is_skybot = re.search(rf"thatskybot|{my_name}|skybot|sky bot", victim_name)
@@ -976,9 +1008,9 @@ class Krill(BaseCog):
                 664230982378979347,
                 664251608212832256
             ])
-            head = utils.get(self.bot.emojis, id=664191325104504880)
-            tail = utils.get(self.bot.emojis, id=664191324869754881)
-            body = utils.get(self.bot.emojis, id=body_id)
+            head = Emoji.get_by_id(664191325104504880)
+            tail = Emoji.get_by_id(664191324869754881)
+            body = Emoji.get_by_id(body_id)
 
         # shadow roll freq is normal percentage, but only applies to regular and crab attack
         if shadow_rolling:
@@ -1032,6 +1064,11 @@ class Krill(BaseCog):
             body = my_crab[1]
             tail = my_crab[2]
 
+        # bylines for the channel's locale, or for any locale
+        locale = Lang.get_defaulted_locale(ctx)[0]
+
+        # work out every frame up front, Animation paces the edits to what the channel can take
+        frames = []
         count = 0
         time_step = 1
         step = randint(1, 2)
@@ -1039,21 +1076,13 @@ class Krill(BaseCog):
         sky_kid = ""
         spaces = str(blank) * distance
         space_step = str(blank) * step
-        message = await ctx.send(f"{space_step}{victim_name} {red}{spaces}{head}{body}{tail}")
-
-        # TODO: channel and locale detection
-        bylines = await guild_krill_config.bylines
-        byline = [byline.byline for byline in bylines if byline.type in (byline_type['id'], 0)]
-        if not byline:
-            byline = [Lang.get_locale_string("krill/summoned_by", ctx, name=ctx.author.mention)]
-        summoned_by = await ctx.send(choice(byline).format(mention=ctx.author.mention, victim=victim_name))
+        first_frame = f"{space_step}{victim_name} {red}{spaces}{head}{body}{tail}"
 
         while distance > 0:
             sky_kid = return_home if count > 0 and going_home else red
             distance = distance - step
             spaces = str(blank) * distance
-            message = await message.edit(content=f"{space_step}{victim_name} {sky_kid}{spaces}{head}{body}{tail}")
-            await asyncio.sleep(time_step)
+            frames.append(Animation.Frame(f"{space_step}{victim_name} {sky_kid}{spaces}{head}{body}{tail}", time_step))
             count = count + 1
 
         step = randint(0, 2)
@@ -1061,25 +1090,30 @@ class Krill(BaseCog):
         count = 0
         secaps = ""
         if going_home:
-            message = await message.edit(content=f"{space_step}{victim_name} {sky_kid}")
-            await asyncio.sleep(time_step*2)
+            frames.append(Animation.Frame(f"{space_step}{victim_name} {sky_kid}", time_step*2, keep=True))
             return_type = self.get_byline_type_id('return_home')
-            evaded_by = [byline for byline in bylines if byline.type == return_type['id']]
-            # TODO: detect channel/locale
-            summoned_by = await summoned_by.edit(content=choice(evaded_by).byline.format(mention=ctx.author.mention))
-            message = await message.edit(content=f"{space_step}{victim_name} {party_kid}")
+            evaded_by = self.get_bylines(ctx.guild.id, (return_type['id'],), locale, ctx.channel.id)
+            frames.append(Animation.Frame(choice(evaded_by).format(mention=ctx.author.mention), 0,
+                                          target='byline', keep=True))
+            frames.append(Animation.Frame(f"{space_step}{victim_name} {party_kid}", time_step))
         else:
             if distance == 0:
                 # no star animation. send final result
-                message = await message.edit(content=f"{secaps}{star}{spaces}{bonked_kid} {victim_name}{spaces}{star}{spaces}{star}")
+                frames.append(Animation.Frame(f"{secaps}{star}{spaces}{bonked_kid} {victim_name}{spaces}{star}{spaces}{star}", time_step))
             else:
                 # star animation
                 while count < distance:
                     spaces = str(blank) * count
                     count = count + step
                     secaps = str(blank) * (distance - count)
-                    message = await message.edit(content=f"{secaps}{star}{spaces}{bonked_kid} {victim_name}{spaces}{star}{spaces}{star}")
-                    await asyncio.sleep(time_step)
+                    frames.append(Animation.Frame(f"{secaps}{star}{spaces}{bonked_kid} {victim_name}{spaces}{star}{spaces}{star}", time_step))
+
+        message = await ctx.send(first_frame)
+        byline = self.get_bylines(ctx.guild.id, {byline_type['id'], 0}, locale, ctx.channel.id)
+        if not byline:
+            byline = [Lang.get_locale_string("krill/summoned_by", ctx, name=ctx.author.mention)]
+        summoned_by = await ctx.send(choice(byline).format(mention=ctx.author.mention, victim=victim_name))
+        await Animation.play(dict(main=message, byline=summoned_by), frames)
 
         # await message.add_reaction(star)
         # TODO: add message id to persistent vars, listen for reactions.
@@ -1089,8 +1123,7 @@ class Krill(BaseCog):
     @krill.error
     async def krill_error(self, ctx, error):
         if isinstance(error, commands.CommandOnCooldown):
-            if ctx.message.author.guild_permissions.mute_members \
-                    or await self.bot.permission_manage_bot(ctx) \
+            if await Permissions.member_has(ctx.author, Capability.MUTE_MEMBERS | Capability.BOT_ADMIN) \
                     or ctx.channel.id not in self.channels[ctx.guild.id]:
                 # Bypass cooldown for mute permission and for invocations outside allowed channels
                 await ctx.reinvoke()
@@ -4,8 +4,9 @@ import discord
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Lang
+from utils import Lang, Permissions
 from utils.Database import Guild, Localization
+from utils.Permissions import Capability
 
 
 class LangConfig(BaseCog):
@@ -18,7 +19,7 @@ class LangConfig(BaseCog):
         Lang.load_locales()
 
     async def cog_check(self, ctx):
-        return await self.bot.permission_manage_bot(ctx) or (ctx.guild and ctx.author.guild_permissions.ban_members)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @commands.guild_only()
     @commands.group(name="lang", invoke_without_command=True)
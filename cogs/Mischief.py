@@ -11,8 +11,9 @@ from discord.ext.commands import BucketType
 
 import utils.Utils
 from cogs.BaseCog import BaseCog
-from utils import Utils, Configuration, Logging
+from utils import Utils, Configuration, Logging, MessageCache
 from utils.Database import MischiefRole
+from utils.Permissions import Capability
 
 
 class Mischief(BaseCog):
@@ -376,8 +377,9 @@ name cooldown is {self.name_cooldown_time} seconds
         cooldown_elapsed = now - member_last_access_time
         remaining = self.cooldown_time - cooldown_elapsed
 
-        ctx = await self.bot.get_context(message)
-        if not await Utils.can_mod_official(ctx) and (cooldown_elapsed < self.cooldown_time):
+        capabilities = await MessageCache.get(self.bot, message).capabilities()
+        can_mod = capabilities & (Capability.OFFICIAL_BAN | Capability.BOT_ADMIN)
+        if not can_mod and (cooldown_elapsed < self.cooldown_time):
             try:
                 remaining_time = Utils.to_pretty_time(remaining)
                 await channel.send(f"wait {remaining_time} longer before you make another wish...")
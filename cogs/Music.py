@@ -12,8 +12,9 @@ from discord.ext import commands
 from discord.ext.commands import Context
 
 from cogs.BaseCog import BaseCog
-from utils import Lang, Questions, Utils, Logging
+from utils import Lang, Questions, Utils, Logging, Permissions
 from utils.Utils import MENTION_MATCHER, ID_MATCHER, NUMBER_MATCHER
+from utils.Permissions import Capability
 
 try:
     pwd = os.path.dirname(os.path.realpath(__file__))
@@ -218,8 +219,7 @@ class Music(BaseCog):
         return out_name
 
     async def can_admin(ctx):
-        return await Utils.BOT.permission_manage_bot(ctx) or \
-            (ctx.guild and ctx.author.guild_permissions.manage_channels)
+        return await Permissions.check(ctx, Capability.MANAGE_CHANNELS)
 
     @commands.command(aliases=['songs'])
     @commands.guild_only()
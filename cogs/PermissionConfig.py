@@ -2,15 +2,17 @@ import discord
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Lang
+from utils import Lang, Permissions
 from utils.Database import Guild, BotAdmin
 from utils import Utils
+from utils.Permissions import Capability
 
 
 class PermissionConfig(BaseCog):
-    admin_roles = dict()
-    mod_roles = dict()
-    trusted_roles = dict()
+    # shared with the permission resolver
+    admin_roles = Permissions.ADMIN_ROLES
+    mod_roles = Permissions.MOD_ROLES
+    trusted_roles = Permissions.TRUSTED_ROLES
     command_permissions = dict()
 
     def __init__(self, bot):
@@ -26,6 +28,7 @@ class PermissionConfig(BaseCog):
         self.mod_roles[guild.id] = set()
         self.trusted_roles[guild.id] = set()
         self.command_permissions[guild.id] = dict()
+        Permissions.invalidate_guild(guild.id)
 
     async def load_guild(self, guild):
         guild_row, created = await Guild.get_or_create(serverid=guild.id)
@@ -53,6 +56,7 @@ class PermissionConfig(BaseCog):
                 self.command_permissions[guild.id][member.id] = row
             else:
                 await row.delete()
+        Permissions.invalidate_guild(guild.id)
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -64,6 +68,7 @@ class PermissionConfig(BaseCog):
         del self.mod_roles[guild.id]
         del self.trusted_roles[guild.id]
         del self.command_permissions[guild.id]
+        Permissions.invalidate_guild(guild.id)
 
         # remove all configured guild permissions
         guild_row = await self.bot.get_guild_db_config(guild.id)
@@ -74,15 +79,7 @@ class PermissionConfig(BaseCog):
 
     async def cog_check(self, ctx):
         # Minimum permission for all permissions commands: manage_server
-        if ctx.guild:
-            if ctx.author.guild_permissions.manage_guild or await self.bot.permission_manage_bot(ctx):
-                return True
-            for role in ctx.author.roles:
-                if role.id in self.admin_roles[ctx.guild.id]:
-                    return True
-        if await self.bot.permission_manage_bot(ctx):
-            return True
-        return False
+        return await Permissions.check(ctx, Capability.MANAGE_GUILD | Capability.ADMIN)
 
     @commands.group(name="permission_config", aliases=["permission", "permissions"], invoke_without_command=True)
     @commands.guild_only()
@@ -144,6 +141,7 @@ class PermissionConfig(BaseCog):
     @commands.guild_only()
     async def reload(self, ctx: commands.Context):
         await self.on_ready()
+        await self.bot.load_bot_admins()
         await ctx.send("reloaded permissions from db...")
         await ctx.invoke(self.permission_config)
 
@@ -12,7 +12,8 @@ from discord import NotFound, HTTPException, Forbidden, TextChannel
 from discord.ext import commands, tasks
 
 from cogs.BaseCog import BaseCog
-from utils import Utils, Configuration, Lang, Logging
+from utils import Utils, Configuration, Lang, Logging, Permissions
+from utils.Permissions import Capability
 
 
 class ReactMonitor(BaseCog):
@@ -32,6 +33,18 @@ class ReactMonitor(BaseCog):
         self.emoji = dict()
         self.mutes = dict()
         self.started = False
+        # bug report channels, whose reactions are never watched
+        self.bug_channels = set()
+        # channels the clean command skips
+        self.excluded_channel_ids = set()
+
+    async def cog_load(self):
+        self.bug_channels = {row.channelid for row in await BugReportingChannel.all()}
+        self.excluded_channel_ids = set(Configuration.get_persistent_var(self.excluded_channels_key, []))
+
+    @commands.Cog.listener()
+    async def on_bug_channels_changed(self, channel_ids):
+        self.bug_channels = set(channel_ids)
 
     async def on_ready(self):
         for guild in self.bot.guilds:
@@ -130,33 +143,24 @@ class ReactMonitor(BaseCog):
         self.react_watch_servers.remove(guild_id)
 
     async def is_user_event_ignored(self, event):
-        ignored_channels = [row.channelid for row in await BugReportingChannel.all()]
-        is_ignored_channel = event.channel_id in ignored_channels
+        if event.channel_id in self.bug_channels:
+            return True
         guild = self.bot.get_guild(event.guild_id)
         if not guild:
             # Don't listen to DMs
             return True
-        is_bot = event.user_id == self.bot.user.id
+        if event.user_id == self.bot.user.id:
+            return True
         member = guild.get_member(event.user_id)
 
         if member is None:
             return True  # ignore reaction events from departing members
 
-        is_mod = member and member.guild_permissions.ban_members
-        is_admin = await self.bot.member_is_admin(event.user_id)
-        has_admin = False
-
-        for role in member.roles:
-            if role in Configuration.get_var("admin_roles", []):
-                has_admin = True
-
-        # ignore bot, ignore mod, ignore admin users and admin roles
-        if is_bot or is_mod or is_admin or has_admin or is_ignored_channel:
-            return True
-        return False
+        # ignore mods and bot admins. capabilities are cached, so this doesn't hit the db
+        return await Permissions.member_has(member, Capability.BOT_ADMIN | Capability.BAN_MEMBERS)
 
     async def cog_check(self, ctx):
-        return ctx.guild and (ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx))
+        return ctx.guild is not None and await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @tasks.loop(seconds=1.0)
     async def check_reacts(self):
@@ -295,10 +299,9 @@ class ReactMonitor(BaseCog):
             list_of_channels = "\n".join([c.mention for c in channels])
             await ctx.send(f"Looking for reacts on the {count} most recent messages "
                            f"in the following channels:\n{list_of_channels}")
-        excluded_channels = Configuration.get_persistent_var(self.excluded_channels_key, [])
         for channel in channels:
             if isinstance(channel, TextChannel):
-                if channel.id in excluded_channels:
+                if channel.id in self.excluded_channel_ids:
                     await ctx.send(f"<#{channel.id}> skipped")
                     continue
                 try:
@@ -332,8 +335,7 @@ class ReactMonitor(BaseCog):
     @clean.command(aliases=["excludedchannels", "list_excluded", "listexcluded"])
     @commands.guild_only()
     async def excluded_channels(self, ctx):
-        excluded_channels = Configuration.get_persistent_var(self.excluded_channels_key, [])
-        excluded_channels = [self.bot.get_channel(c).mention for c in excluded_channels]
+        excluded_channels = [f"<#{c}>" for c in self.excluded_channel_ids]
         if not excluded_channels:
             await ctx.send(f"No channels are excluded from react remove_by_user")
         else:
@@ -349,14 +351,12 @@ class ReactMonitor(BaseCog):
         :param channels:
         :return:
         """
-        excluded_channels = Configuration.get_persistent_var(self.excluded_channels_key, [])
-        excluded_channels = set(excluded_channels)
         added = []
         for channel in channels:
-            if channel.id not in excluded_channels:
-                excluded_channels.add(channel.id)
+            if channel.id not in self.excluded_channel_ids:
+                self.excluded_channel_ids.add(channel.id)
                 added.append(channel.mention)
-        Configuration.set_persistent_var(self.excluded_channels_key, list(excluded_channels))
+        Configuration.set_persistent_var(self.excluded_channels_key, list(self.excluded_channel_ids))
         if not added:
             await ctx.send(f"No channels added to exclusion list")
         else:
@@ -371,14 +371,12 @@ class ReactMonitor(BaseCog):
         :param channels:
         :return:
         """
-        excluded_channels = Configuration.get_persistent_var(self.excluded_channels_key, [])
-        excluded_channels = set(excluded_channels)
         removed = []
         for channel in channels:
-            if channel.id in excluded_channels:
-                excluded_channels.remove(channel.id)
+            if channel.id in self.excluded_channel_ids:
+                self.excluded_channel_ids.remove(channel.id)
                 removed.append(channel.mention)
-        Configuration.set_persistent_var(self.excluded_channels_key, list(excluded_channels))
+        Configuration.set_persistent_var(self.excluded_channels_key, list(self.excluded_channel_ids))
         if not removed:
             await ctx.send(f"No channels removed from exclusion list")
         else:
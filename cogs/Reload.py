@@ -4,7 +4,8 @@ import os
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Logging, Emoji, Reloader, Utils, Configuration, Lang
+from utils import Logging, Emoji, Reloader, Utils, Configuration, Lang, Permissions
+from utils.Permissions import Capability
 
 
 class Reload(BaseCog):
@@ -13,7 +14,7 @@ class Reload(BaseCog):
         super().__init__(bot)
 
     async def cog_check(self, ctx):
-        return await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.BOT_ADMIN)
 
     async def on_ready(self):
         restart_mid = Configuration.get_persistent_var("bot_restart_message_id")
@@ -59,6 +60,7 @@ class Reload(BaseCog):
         Reload localization files
         """
         Lang.load()
+        Lang.load_locales()
         await ctx.send("Language file reloaded")
 
     @commands.command()
@@ -67,6 +69,8 @@ class Reload(BaseCog):
         Reload configuration from disk
         """
         Configuration.load()
+        Permissions.invalidate_all()
+        self.bot.dispatch("config_reloaded")
         await ctx.send("Config file reloaded")
 
     @commands.command()
@@ -78,9 +82,8 @@ class Reload(BaseCog):
         """
         if os.path.isfile(f"cogs/{cog}.py"):
             await self.bot.load_extension(f"cogs.{cog}")
-            if cog not in Configuration.MASTER_CONFIG["cogs"]:
-                Configuration.MASTER_CONFIG["cogs"].append(cog)
-                Configuration.save()
+            if cog not in Configuration.CONFIG.cogs:
+                Configuration.set_var("cogs", [*Configuration.CONFIG.cogs, cog])
             await ctx.send(f"**{cog}** has been loaded!")
             await Logging.bot_log(f"**{cog}** has been loaded by {ctx.author.name}.")
             Logging.info(f"{cog} has been loaded")
@@ -96,9 +99,8 @@ class Reload(BaseCog):
         """
         if cog in ctx.bot.cogs:
             await self.bot.unload_extension(f"cogs.{cog}")
-            if cog in Configuration.MASTER_CONFIG["cogs"]:
-                Configuration.get_var("cogs").remove(cog)
-                Configuration.save()
+            if cog in Configuration.CONFIG.cogs:
+                Configuration.set_var("cogs", [c for c in Configuration.CONFIG.cogs if c != cog])
             await ctx.send(f'**{cog}** has been unloaded.')
             await Logging.bot_log(f'**{cog}** has been unloaded by {ctx.author.name}')
             Logging.info(f"{cog} has been unloaded")
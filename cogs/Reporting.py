@@ -1,4 +1,6 @@
-import os
+import csv
+import gzip
+import io
 import re
 import sys
 from datetime import datetime
@@ -12,12 +14,13 @@ from tortoise.expressions import Q
 from cogs.BaseCog import BaseCog
 from utils import Utils
 from utils.Database import BugReport, BugReportingPlatform
-from utils.Utils import save_to_disk
 
 
 class Reporting(BaseCog):
 
-    fetch_limit = 1000
+    fetch_limit = 100000
+    page_size = 500
+    dm_filesize_limit = 25 * 1024 * 1024
 
     async def cog_check(self, ctx):
         return await Utils.can_mod_official(ctx)
@@ -29,32 +32,34 @@ class Reporting(BaseCog):
             start: typing.Optional[int] = -100,
             end: typing.Optional[int] = None,
             branch: typing.Optional[str] = "",
-            platform: typing.Optional[str] = ""):
+            platform: typing.Optional[str] = "",
+            compress: typing.Optional[typing.Literal['gzip', 'gz']] = None):
         """Export bug reports starting from {start} to CSV file
         csv                      exports 100 most recent reports
         csv 15 20                exports reports with ids in the range 15-20
-        csv -200                 exports the last 200 reports matching other criteria (max 1000)
+        csv -200                 exports the last 200 reports matching other criteria (max 100000)
         csv [beta|stable]        exports reports for given branch (all platforms)
         csv {beta|stable} [android|ios|etc]
-                                 exports reports for given branch and platform"""
+                                 exports reports for given branch and platform
+        csv -5000 beta ios gzip  any of the above, gzipped"""
         # TODO: start from date?
-        # TODO: migrate to async ORM like tortoise
+        platform_rows = await BugReportingPlatform.all()
 
-        async def get_branch(a_branch):
-            branches = {p.branch for p in await BugReportingPlatform.all()}
+        def get_branch(a_branch):
+            branches = {p.branch for p in platform_rows}
 
             for this_branch in branches:
                 if a_branch.lower() == this_branch.lower():
-                    return this_branch
+                    return [this_branch]
 
             return branches
 
-        async def get_platform(a_platform):
-            platforms = [p.platform for p in await BugReportingPlatform.all()]
+        def get_platform(a_platform):
+            platforms = {p.platform for p in platform_rows}
 
             for this_platform in platforms:
                 if a_platform.lower() == this_platform.lower():
-                    return this_platform
+                    return [this_platform]
 
             return platforms
 
@@ -62,8 +67,14 @@ class Reporting(BaseCog):
         def filter_hyphens(text):
             return re.sub(r'^\s*[-=+]\s*', '* ', text, flags=re.MULTILINE)
 
-        pl = await get_platform(platform)
-        br = await get_branch(branch)
+        # "csv gzip", "csv beta gzip": the flag lands in whichever argument is free
+        if compress is None and platform.lower() in ('gzip', 'gz'):
+            compress, platform = platform.lower(), ""
+        if compress is None and branch.lower() in ('gzip', 'gz'):
+            compress, branch = branch.lower(), ""
+
+        pl = get_platform(platform)
+        br = get_branch(branch)
 
         if start < -self.fetch_limit:
             await ctx.send(f"you requested more than {self.fetch_limit} records, "
@@ -91,11 +102,11 @@ class Reporting(BaseCog):
         if start < 0:
             # count backward from end of data. no more than global limit
             limit = min(abs(start), self.fetch_limit)
-            query = await BugReport.filter(conditions).order_by("-id").limit(limit)
+            descending = True
         else:
-            query = await BugReport.filter(conditions).limit(self.fetch_limit)
+            limit = self.fetch_limit
+            descending = False
 
-        data_list = ()
         fields = ["id",
                   "reported_at",
                   "reporter",
@@ -112,39 +123,82 @@ class Reporting(BaseCog):
                   "attachments",
                   "additional"]
 
-        for report in query:
-            reporter_formatted = report.reporter
-            reporter = self.bot.get_user(report.reporter)
-            if reporter is not None:
-                reporter_formatted = f"@{reporter.name}#{reporter.discriminator}({report.reporter})"
-            attachments = []
-            for attachment in await report.attachments:
-                attachments.append(attachment.url)
-
-            attachments = "\n".join(attachments)
-
-            data_list += ({"id": report.id,
-                           "reported_at": report.reported_at,
-                           "reporter": reporter_formatted,
-                           "platform": report.platform,
-                           "platform_version": report.platform_version,
-                           "branch": report.branch,
-                           "app_version": report.app_version,
-                           "app_build": report.app_build,
-                           "title": report.title,
-                           "deviceinfo": report.deviceinfo,
-                           "steps": filter_hyphens(report.steps),
-                           "expected": filter_hyphens(report.expected),
-                           "actual": filter_hyphens(report.actual),
-                           "attachments": attachments,
-                           "additional": filter_hyphens(report.additional)},)
-
-        await ctx.send(f"Fetched {len(data_list)} reports...")
+        # rows are written a page at a time, optionally gzipped on the way. nothing but the output is held in memory
+        size_limit = ctx.guild.filesize_limit if ctx.guild is not None else self.dm_filesize_limit
+        output = io.BytesIO()
+        sink = gzip.GzipFile(fileobj=output, mode='wb') if compress else output
+        page_buffer = io.StringIO()
+        csvwriter = csv.DictWriter(page_buffer, fieldnames=fields)
+        csvwriter.writeheader()
+
+        count = 0
+        async for page in self.report_pages(conditions, limit, descending):
+            for report in page:
+                reporter_formatted = report.reporter
+                reporter = self.bot.get_user(report.reporter)
+                if reporter is not None:
+                    reporter_formatted = f"@{reporter.name}#{reporter.discriminator}({report.reporter})"
+                attachments = "\n".join(attachment.url for attachment in report.attachments)
+
+                csvwriter.writerow({"id": report.id,
+                                    "reported_at": report.reported_at,
+                                    "reporter": reporter_formatted,
+                                    "platform": report.platform,
+                                    "platform_version": report.platform_version,
+                                    "branch": report.branch,
+                                    "app_version": report.app_version,
+                                    "app_build": report.app_build,
+                                    "title": report.title,
+                                    "deviceinfo": report.deviceinfo,
+                                    "steps": filter_hyphens(report.steps),
+                                    "expected": filter_hyphens(report.expected),
+                                    "actual": filter_hyphens(report.actual),
+                                    "attachments": attachments,
+                                    "additional": filter_hyphens(report.additional)})
+            count += len(page)
+            sink.write(page_buffer.getvalue().encode('UTF-8'))
+            page_buffer.seek(0)
+            page_buffer.truncate()
+            if output.tell() > size_limit:
+                hint = "" if compress else ", add `gzip` to compress it"
+                await ctx.send(f"that export got over {size_limit // 1024 // 1024} MiB after {count} reports, "
+                               f"too big for me to upload here{hint}. You can also ask for fewer reports")
+                return
+
+        sink.write(page_buffer.getvalue().encode('UTF-8'))
+        if compress:
+            # writes the gzip trailer, output stays open
+            sink.close()
+        output.seek(0)
+
+        await ctx.send(f"Fetched {count} reports...")
         now = datetime.today().timestamp()
-        save_to_disk(f"report_{now}", data_list, 'csv', fields)
-        send_file = File(f"report_{now}.csv")
-        await ctx.send(file=send_file)
-        os.remove(f"report_{now}.csv")
+        filename = f"report_{now}.csv.gz" if compress else f"report_{now}.csv"
+        await ctx.send(file=File(output, filename=filename))
+
+    async def report_pages(self, conditions, limit, descending=False):
+        """
+        Page through bug reports by id, so each page is a cheap index range no matter how deep into the table it is
+        :param conditions: filter for the reports
+        :param limit: max number of reports in total
+        :param descending: newest first
+        :return: async iterator over lists of reports, attachments prefetched
+        """
+        last_id = None
+        remaining = limit
+        while remaining > 0:
+            query = BugReport.filter(conditions)
+            if last_id is not None:
+                query = query.filter(id__lt=last_id) if descending else query.filter(id__gt=last_id)
+            page = await query.order_by("-id" if descending else "id") \
+                .limit(min(self.page_size, remaining)).prefetch_related('attachments')
+            if not page:
+                return
+            yield page
+            if len(page) < self.page_size:
+                return
+            remaining -= len(page)
+            last_id = page[-1].id
 
 
 async def setup(bot):
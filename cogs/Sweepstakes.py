@@ -7,9 +7,10 @@ from discord.ext import commands
 from discord.ext.commands import Context
 
 from cogs.BaseCog import BaseCog
-from utils import Utils, Lang, Questions
+from utils import Utils, Lang, Questions, Permissions
 from datetime import datetime
 from utils.Utils import save_to_disk
+from utils.Permissions import Capability
 
 
 class Sweepstakes(BaseCog):
@@ -22,7 +23,7 @@ class Sweepstakes(BaseCog):
             return False
         # TODO: change to admin role
         #  and/or separate roles for view and manage sweeps
-        return ctx.author.guild_permissions.manage_channels or await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.MANAGE_CHANNELS)
 
     async def get_reaction_message(self, ctx, jump_url):
         parts = jump_url.split('/')
@@ -10,7 +10,8 @@ from discord.ext.commands import MemberConverter
 
 import sky
 from cogs.BaseCog import BaseCog
-from utils import Configuration, Logging, Utils, Lang
+from utils import Configuration, Logging, Utils, Lang, Permissions
+from utils.Permissions import Capability
 
 
 class Welcomer(BaseCog):
@@ -37,7 +38,7 @@ class Welcomer(BaseCog):
         pass
 
     async def cog_check(self, ctx):
-        return await self.bot.permission_manage_bot(ctx) or (ctx.guild and ctx.author.guild_permissions.ban_members)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @commands.group(name="welcome", invoke_without_command=True)
     @commands.guild_only()
@@ -292,7 +293,7 @@ class Welcomer(BaseCog):
                     ''')
                 return
 
-        if message.author.guild_permissions.mute_members or await self.bot.member_is_admin(message.author.id) or \
+        if await Permissions.member_has(message.author, Capability.MUTE_MEMBERS | Capability.BOT_ADMIN) or \
                 (member_role is not None and member_role in message.author.roles):
             # is a mod or
             # message from regular member. no action to take.
@@ -4,8 +4,9 @@ import discord
 from discord.ext import commands
 
 from cogs.BaseCog import BaseCog
-from utils import Lang, Utils, Emoji, Configuration
+from utils import Lang, Utils, Emoji, Configuration, LiteralMatcher, Permissions, MessageCache
 from utils.Database import CountWord
+from utils.Permissions import Capability
 
 
 class WordCounter(BaseCog):
@@ -21,15 +22,22 @@ class WordCounter(BaseCog):
 
     async def init_guild(self, guild):
         my_words = set()
+        # cleared first: clearing drops a matcher that ends up empty, so one fetched before could be orphaned
+        LiteralMatcher.clear_guild_matcher(guild.id, 'word')
+        literal_matcher = LiteralMatcher.get_guild_matcher(guild.id)
         # fetch words and build matching pattern
         for row in await CountWord.filter(serverid=guild.id):
+            if not row.word:
+                continue
             my_words.add(re.escape(row.word))
-        self.words[guild.id] = "|".join(my_words)
+            literal_matcher.add(row.word, ('word', row.word))
+        # an empty alternation would match everywhere, so no words means no pattern
+        self.words[guild.id] = re.compile("|".join(my_words), re.IGNORECASE) if my_words else None
 
     async def cog_check(self, ctx):
         if ctx.guild is None:
             return False
-        return ctx.author.guild_permissions.ban_members or await self.bot.permission_manage_bot(ctx)
+        return await Permissions.check(ctx, Capability.BAN_MEMBERS)
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -38,6 +46,7 @@ class WordCounter(BaseCog):
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         del self.words[guild.id]
+        LiteralMatcher.clear_guild_matcher(guild.id, 'word')
         await CountWord.filter(serverid=guild.id).delete()
 
     @commands.group(name="wordcounter", aliases=['wordcount', 'word_count', 'countword', 'count_word'], invoke_without_command=True)
@@ -76,7 +85,7 @@ class WordCounter(BaseCog):
         row = await CountWord.get_or_none(serverid=ctx.guild.id, word=word)
         if row is None:
             await CountWord.create(serverid = ctx.guild.id, word=word)
-            await self.on_ready()
+            await self.init_guild(ctx.guild)
             emoji = Emoji.get_chat_emoji('YES')
             msg = Lang.get_locale_string('word_counter/word_added', ctx, word=word)
             await ctx.send(f"{emoji} {msg}")
@@ -90,7 +99,7 @@ class WordCounter(BaseCog):
         row = await CountWord.get_or_none(serverid=ctx.guild.id, word=word)
         if row is not None:
             await row.delete()
-            await self.on_ready()
+            await self.init_guild(ctx.guild)
             emoji = Emoji.get_chat_emoji('YES')
             msg = Lang.get_locale_string('word_counter/word_removed', ctx, word=word)
         else:
@@ -103,27 +112,33 @@ class WordCounter(BaseCog):
         if message.author.bot:
             return
 
-        prefix = Configuration.get_var("bot_prefix")
-        ctx = await self.bot.get_context(message)
-        is_boss = await self.cog_check(ctx)
-        command_context = message.content.startswith(prefix, 0) and is_boss
         not_in_guild = not hasattr(message.channel, "guild") or message.channel.guild is None
+        if not_in_guild or self.words.get(message.guild.id) is None:
+            # Guild not present, not initialized, or no words to count. Ignore.
+            return
 
-        if command_context or not_in_guild:
+        # cheap literal scan first. most messages contain none of the counted words
+        candidates = LiteralMatcher.get_guild_matcher(message.guild.id).search(message.content)
+        if not any(key[0] == 'word' for key in candidates):
+            return
+
+        info = MessageCache.get(self.bot, message)
+        command_context = info.has_prefix and await self.cog_check(await info.context())
+
+        if command_context:
             return
 
         m = self.bot.metrics
-        try:
-            pattern = re.compile(self.words[message.guild.id], re.IGNORECASE)
-            # find all matches and reduce to unique set
-            words = set(pattern.findall(message.content))
-            for word in words:
-                # increment counters
-                word = str(word).lower()
-                m.word_counter.labels(word=word, guild_name=message.guild.name, guild_id=message.guild.id).inc()
-        except KeyError:
-            # Guild not present or not initialized. Ignore.
-            pass
+        pattern = self.words.get(message.guild.id)
+        if pattern is None:
+            # words were removed while building context
+            return
+        # find all matches and reduce to unique set
+        words = set(pattern.findall(message.content))
+        for word in words:
+            # increment counters
+            word = str(word).lower()
+            m.word_counter.labels(word=word, guild_name=message.guild.name, guild_id=message.guild.id).inc()
 
 
 async def setup(bot):
@@ -0,0 +1,11 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `bugreport` ADD FULLTEXT INDEX `ftx_bugreport_text` (`title`, `steps`, `expected`, `actual`, `additional`);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `bugreport` DROP INDEX `ftx_bugreport_text`;"""
@@ -9,15 +9,16 @@ import sentry_sdk
 from discord.ext import commands
 from discord.ext.commands import Bot
 from aiohttp import ClientOSError, ServerDisconnectedError
-from discord import ConnectionClosed, Intents, AllowedMentions
+from discord import ConnectionClosed, Intents, AllowedMentions, Object
 from prometheus_client import CollectorRegistry
 from sentry_sdk.integrations.aiohttp import AioHttpIntegration
 from tortoise import Tortoise
+from tortoise.signals import post_save, post_delete
 from aerich import Command
 from hanging_threads import start_monitoring
 
 import utils.tortoise_settings
-from utils import Logging, Configuration, Utils, Emoji, Database, Lang
+from utils import Logging, Configuration, Utils, Emoji, Database, Lang, Permissions
 from utils.Logging import TCol
 from utils.Database import BotAdmin, Guild
 from utils.PrometheusMon import PrometheusMon
@@ -25,6 +26,20 @@ from utils.PrometheusMon import PrometheusMon
 running = None
 
 
+@post_save(BotAdmin)
+async def bot_admin_saved(sender, instance, created, using_db, update_fields):
+    if Utils.BOT is not None:
+        # a save can change the userid of an existing row, so reload rather than add
+        await Utils.BOT.load_bot_admins()
+
+
+@post_delete(BotAdmin)
+async def bot_admin_deleted(sender, instance, using_db):
+    if Utils.BOT is not None:
+        Utils.BOT.bot_admin_ids.discard(instance.userid)
+        Permissions.invalidate_member(instance.userid)
+
+
 class Skybot(Bot):
     loaded = False
     metrics_reg = CollectorRegistry()
@@ -36,6 +51,7 @@ class Skybot(Bot):
         self.metrics = PrometheusMon(self)
         self.config_channels = dict()
         self.db_keepalive = None
+        self.bot_admin_ids = set()
         self.my_name = type(self).__name__
         self.loaded = False
         sys.path.append(
@@ -49,6 +65,9 @@ class Skybot(Bot):
         await Database.init()
         Logging.info('db init is done')
 
+        await self.load_bot_admins()
+        Logging.info(f"{len(self.bot_admin_ids)} bot admins loaded")
+
         await Lang.load_local_overrides()
         Logging.info(f"Locales loaded\nguild: {Lang.GUILD_LOCALES}\nchannel: {Lang.CHANNEL_LOCALES}")
 
@@ -82,6 +101,35 @@ class Skybot(Bot):
         Logging.info(f"{TCol.cUnderline}{TCol.cWarning}{self.my_name} startup complete{TCol.cEnd}{TCol.cEnd}")
         await Logging.bot_log(f"{Configuration.get_var('bot_name', 'this bot')} startup complete")
 
+    async def on_guild_join(self, guild):
+        Emoji.index_guild(guild)
+
+    async def on_guild_remove(self, guild):
+        Emoji.remove_guild(guild.id)
+        Permissions.invalidate_guild(guild.id)
+
+    # cached capabilities, see Permissions. kept here rather than in a cog so they can't go stale with a cog unloaded
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            Permissions.invalidate_member(after.id)
+
+    async def on_member_remove(self, member):
+        Permissions.invalidate_member(member.id)
+
+    async def on_guild_update(self, before, after):
+        if before.owner_id != after.owner_id:
+            Permissions.invalidate_guild(after.id)
+
+    async def on_guild_role_update(self, before, after):
+        if before.permissions != after.permissions:
+            Permissions.invalidate_guild(after.guild.id)
+
+    async def on_guild_role_delete(self, role):
+        Permissions.invalidate_guild(role.guild.id)
+
+    async def on_guild_emojis_update(self, guild, before, after):
+        Emoji.index_guild(guild, after)
+
     async def get_guild_log_channel(self, guild_id):
         # TODO: cog override for logging channel
         return await self.get_guild_config_channel(guild_id, 'log')
@@ -127,24 +175,33 @@ class Skybot(Bot):
         return None
 
     async def permission_manage_bot(self, ctx):
-        is_admin = await self.member_is_admin(ctx.author.id)
-        # Logging.info(f"admin: {'yes' if is_admin else 'no'}")
-        has_admin_role = False
-        if ctx.guild:
-            for role in ctx.author.roles:
-                if role in Configuration.get_var("admin_roles", []):
-                    has_admin_role = True
-        # Logging.info(f"has_admin_role: {'yes' if has_admin_role else 'no'}")
-        return is_admin or has_admin_role
+        return await Permissions.member_has(ctx.author, Permissions.Capability.BOT_ADMIN)
+
+    async def load_bot_admins(self):
+        """
+        Load bot admin ids from the db. BotAdmin saves and deletes keep this set current through model signals
+        """
+        self.bot_admin_ids = {row.userid for row in await BotAdmin.all()}
+        Permissions.invalidate_all()
+
+    async def is_owner_id(self, member_id):
+        """
+        Owner check by id. discord.py keeps owner ids after the first lookup, so only the first call hits the api
+        """
+        if self.owner_id is None and not self.owner_ids:
+            return await self.is_owner(Object(id=member_id))
+        return member_id == self.owner_id or member_id in self.owner_ids
 
     async def member_is_admin(self, member_id):
-        is_owner = await self.is_owner(self.get_user(member_id))
-        is_db_admin = await BotAdmin.get_or_none(userid=member_id) is not None
-        in_admins = member_id in Configuration.get_var("ADMINS", [])
+        is_db_admin = member_id in self.bot_admin_ids
+        in_admins = member_id in Configuration.CONFIG.ADMINS
+        if is_db_admin or in_admins:
+            return True
+        is_owner = await self.is_owner_id(member_id)
         # Logging.info(f"owner: {'yes' if is_owner else 'no'}")
         # Logging.info(f"db_admin: {'yes' if is_db_admin else 'no'}")
         # Logging.info(f"in_admins: {'yes' if in_admins else 'no'}")
-        return is_db_admin or is_owner or in_admins
+        return is_owner
 
     async def guild_log(self, guild_id: int, message=None, embed=None):
         channel = await self.get_guild_log_channel(guild_id)
@@ -251,7 +308,7 @@ def before_send(event, hint):
 
 
 async def can_help(ctx):
-    return ctx.author.guild_permissions.mute_members or await Utils.BOT.permission_manage_bot(ctx)
+    return await Permissions.check(ctx, Permissions.Capability.MUTE_MEMBERS)
 
 
 async def can_admin(ctx):
@@ -327,6 +384,7 @@ async def main():
         queue_worker("Persistent Queue",
                      Configuration.PERSISTENT_AIO_QUEUE,
                      persistent_data_job))
+    persistent_flush_task = asyncio.create_task(Configuration.persistent_flush_loop())
 
     # start the client
     prefix = Configuration.get_var("bot_prefix")
@@ -376,6 +434,16 @@ async def main():
             await persistent_data_task
         except asyncio.CancelledError:
             pass
+        # not cancelled: a cancel can't stop a write thread that's already running. the loop finishes its write,
+        # flushes whatever changed since the last interval and returns
+        Configuration.stop_persistent_flush()
+        try:
+            await persistent_flush_task
+        except asyncio.CancelledError:
+            pass
+        # in case the loop was gone before the stop. waits for any write still running
+        await Configuration.flush_persistent()
+        Configuration.close_persistent()
 
         if not skybot.is_closed():
             await skybot.close()
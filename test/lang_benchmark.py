@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+from functools import reduce
+import operator
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Lang
+
+LOOKUPS = 100000
+
+
+def legacy_locale_string(key, locale, **arg_dict):
+    """get_locale_string as it was before the flat index: validate and walk the trees on every call"""
+    output = []
+    for item in locale:
+        locale_lang = Lang.LANG[item]
+        key_list = key.split("/")
+        obj = Lang.LANG['keys']
+        if reduce(operator.getitem, key_list[:-1], obj) is None or key_list[-1] not in reduce(operator.getitem, key_list[:-1], obj):
+            raise KeyError(f"Lang key is not in lang_keys: {key}")
+        if reduce(operator.getitem, key_list, obj) is not None:
+            raise KeyError(f"Lang key is not terminal: {key}")
+        try:
+            obj = reduce(operator.getitem, key_list, locale_lang)
+        except (KeyError, TypeError):
+            obj = None
+        if isinstance(obj, str):
+            try:
+                output.append(obj.format(**arg_dict))
+            except KeyError:
+                output.append(obj)
+        else:
+            output.append(Lang.L_ERR)
+    return '\n'.join(output)
+
+
+def run():
+    start = time.perf_counter()
+    Lang.load_locales()
+    print(f"built index of {len(Lang.LOCALE_INDEX)} keys in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    keys = list(Lang.LOCALE_INDEX.keys())
+    args = dict(user="someone", channel="#general", name="krill", count=3)
+    for key in keys:
+        assert legacy_locale_string(key, ['en_US'], **args) == Lang.get_locale_string(key, 'en_US', **args), key
+
+    for name, job in (("walk trees per call", lambda key: legacy_locale_string(key, ['en_US'], **args)),
+                      ("flat index", lambda key: Lang.get_locale_string(key, 'en_US', **args))):
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            job(keys[i % len(keys)])
+        elapsed = time.perf_counter() - start
+        print(f"{name:25} {elapsed:8.3f}s {elapsed / LOOKUPS * 1000000:8.2f}us per lookup")
+
+
+if __name__ == "__main__":
+    run()
+    print("Done!")
@@ -0,0 +1,173 @@
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Confusables
+
+ROUNDS = 2000
+
+# default letters from cogs/Krill.py
+LETTERS = dict(
+    o=["o", "0", "Ø", "Ǒ", "ǒ", "Ǫ", "ǫ", "Ǭ", "ǭ", "Ǿ", "ǿ", "Ō", "ō", "Ŏ",
+       "ŏ", "Ő", "ő", "ò", "ó", "ô", "õ", "ö", "Ò", "Ó", "Ô", "Õ", "Ö", "ỗ",
+       "ở", "O", "ø", "⌀", "Ơ", "ơ", "ᵒ", "𝕠", "🅞", "⓪", "ⓞ", "Ⓞ", "ớ",
+       "ồ", "🇴", "ợ", "口", "ỡ", "ờ", "ộ", "ố", "ổ", "ọ", "ỏ", "ロ", "ㅇ",
+       "°", "⭕", "о", "О", "Ο", "𝐨", "𝐎", ],
+    r=["r", "Ȑ", "Ʀ", "ȑ", "Ȓ", "ȓ", "ʀ", "ʁ", "Ŕ", "ŕ", "Ŗ", "ŗ", "Ř", "ř",
+       "ℛ", "ℜ", "ℝ", "℞", "℟", "ʳ", "ᖇ", "ɹ", "𝕣", "🅡", "ⓡ", "Ⓡ", "🇷",
+       "厂", "尺", "𝐫", ],
+    e=["e", "ế", "3", "Ē", "ē", "Ĕ", "ĕ", "Ė", "ė", "ë", "Ę", "ę", "Ě", "ě",
+       "Ȩ", "ȩ", "ɘ", "ə", "ɚ", "ɛ", "⋲", "⋳", "⋴", "⋵", "⋶", "⋷", "⋸",
+       "⋹", "⋺", "⋻", "⋼", "⋽", "⋾", "⋿", "ᵉ", "E", "ǝ", "€", "𝕖", "🅔",
+       "ⓔ", "Ⓔ", "ể", "é", "🇪", "ề", "已", "ệ", "ê", "ễ", "ẹ", "ẽ", "è",
+       "ẻ", "巨", "ㅌ", "е", "ε", "𝐞", ],
+    oh=["お"],
+    re=["れ"],
+    sp=[r"\s", r"\x00", r"​", r"‌", r"‍", r"\.", r"\[", r"\]",
+        r"\(", r"\)", r"\{", r"\}", r"\\", r"\-", r"_", r"="],
+)
+CHAR_COUNT = '{0,10}'
+
+# same patterns as cogs/Krill.py
+OREO_PATTERN = re.compile(r"o+(?:r+e+|e+r+)o+|お+れ+お+|\Ao.*re+o[^r]*\Z", re.DOTALL)
+DOG_PATTERN = re.compile(r"\bdog\b|\bdoggo\b|\bcookie\b|\bbiscuit\b|\bcanine\b|\bperro\b", re.IGNORECASE)
+REG_CLEAN = re.compile(r'[.\[\](){}\\|~*_`\'\"\-+]')
+
+# (victim text, should be caught)
+CORPUS = [
+    ("oreo", True),
+    ("OREO", True),
+    ("Oreo cookie", True),
+    ("o r e o", True),
+    ("o.r.e.o", True),
+    ("o_r_e_o", True),
+    ("0r30", True),
+    ("ö r é ö", True),
+    ("ｏｒｅｏ", True),
+    ("ＯＲＥＯ", True),
+    ("𝐨𝐫𝐞𝐨", True),
+    ("𝕠𝕣𝕖𝕠", True),
+    ("ⓞⓡⓔⓞ", True),
+    ("🇴🇷🇪🇴", True),
+    ("🅞🅡🅔🅞", True),
+    ("口尺€0", True),
+    ("оrео", True),
+    ("o​re​o", True),
+    ("o⁠r⁠e⁠o", True),
+    ("o🍪r🍪e🍪o", True),
+    ("o✨r✨e✨o", True),
+    ("o~r~e~o", True),
+    ("o/r/e/o", True),
+    ("o,r,e,o", True),
+    ("o r    e o", True),
+    ("óŕéó", True),
+    ("ǒřěǒ", True),
+    ("ṓṙḗṓ", True),
+    ("ooorrreeeooo", True),
+    ("oeroo", True),
+    ("oxreo", True),
+    ("おれお", True),
+    ("お れ お", True),
+    ("a good dog", True),
+    ("doggo", True),
+    ("sky kid", False),
+    ("Aurora", False),
+    ("Oregon", False),
+    ("the elder", False),
+    ("hero", False),
+    ("ore", False),
+    ("rereo", False),
+    ("krill", False),
+    ("manta", False),
+    ("ロリ", False),
+    ("skykid123", False),
+    ("🦀", False),
+    ("ミニョン", False),
+    ("dogma", False),
+    # start with o and have "reo" later on, but the last r isn't followed by e and o
+    ("Ogre of the forest", False),
+    ("Omar reorders", False),
+    ("Oliver reorder", False),
+    ("Old tree of war", False),
+    ("Onward, reo forever", False),
+]
+
+
+def escaped_letters():
+    """letters as they are stored in OreoLetters: regex-escaped, space tokens as-is"""
+    return {token_class: set(tokens if token_class == 'sp' else map(re.escape, tokens))
+            for token_class, tokens in LETTERS.items()}
+
+
+def build_regex_patterns(letters):
+    """the patterns Krill compiled before the skeleton"""
+    o = f"({'|'.join(letters['o'])})"
+    r = f"({'|'.join(letters['r'])})"
+    e = f"({'|'.join(letters['e'])})"
+    oo = f"({'|'.join(letters['oh'])})"
+    rr = f"({'|'.join(letters['re'])})"
+    sp = f"({'|'.join(letters['sp'])})"
+    n = CHAR_COUNT
+    en = re.compile(f"({o}{sp}{n})+(({r}{sp}{n})+({e}{sp}{n})+|({e}{sp}{n})+({r}{sp}{n})+)({o}{sp}{n})+",
+                    re.IGNORECASE)
+    jp = re.compile(f"({oo}{sp}{n})+({rr}{sp}{n})+({oo}{sp}{n})+", re.IGNORECASE)
+    or_pattern = re.compile(f"{o}(.*){r}", re.IGNORECASE)
+    return en, jp, or_pattern
+
+
+def regex_is_oreo(patterns, text):
+    en, jp, or_pattern = patterns
+    text = REG_CLEAN.sub('', text).strip()
+    if en.search(text) or jp.search(text) or DOG_PATTERN.search(text):
+        return True
+    has_or = or_pattern.search(text)
+    if has_or and en.match(re.sub(re.escape(has_or.group(2)), '', text)):
+        return True
+    return False
+
+
+def skeleton_is_oreo(skeleton, text):
+    text = REG_CLEAN.sub('', text).strip()
+    return bool(OREO_PATTERN.search(skeleton.fold(text)) or DOG_PATTERN.search(text))
+
+
+def run():
+    letters = escaped_letters()
+    start = time.perf_counter()
+    patterns = build_regex_patterns(letters)
+    print(f"regex patterns compiled in {(time.perf_counter() - start) * 1000:.1f}ms")
+    start = time.perf_counter()
+    Confusables.get_base_table()
+    print(f"base fold table built in {(time.perf_counter() - start) * 1000:.1f}ms (once per process)")
+    start = time.perf_counter()
+    skeleton = Confusables.Skeleton({'o': letters['o'], 'r': letters['r'], 'e': letters['e'],
+                                     'お': letters['oh'], 'れ': letters['re']}, letters['sp'])
+    print(f"skeleton built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    scores = dict(regex=0, skeleton=0)
+    for text, expected in CORPUS:
+        by_regex = regex_is_oreo(patterns, text)
+        by_skeleton = skeleton_is_oreo(skeleton, text)
+        scores['regex'] += by_regex == expected
+        scores['skeleton'] += by_skeleton == expected
+        flag = "" if by_skeleton == expected else "  <-- skeleton wrong"
+        print(f"{text!r:40} expected {expected!s:5} regex {by_regex!s:5} skeleton {by_skeleton!s:5}{flag}")
+    print(f"correct: regex {scores['regex']}/{len(CORPUS)}, skeleton {scores['skeleton']}/{len(CORPUS)}")
+
+    for name, job in (("multi regex", lambda text: regex_is_oreo(patterns, text)),
+                      ("skeleton", lambda text: skeleton_is_oreo(skeleton, text))):
+        start = time.perf_counter()
+        for i in range(ROUNDS):
+            for text, expected in CORPUS:
+                job(text)
+        elapsed = time.perf_counter() - start
+        checks = ROUNDS * len(CORPUS)
+        print(f"{name:15} {elapsed:8.3f}s {elapsed / checks * 1000000:8.2f}us per check")
+
+
+if __name__ == "__main__":
+    run()
+    print("Done!")
@@ -0,0 +1,94 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import PersistentStore
+
+# shaped roughly like production: per-guild dicts of user id -> timestamp or message ids
+KEY_COUNT = 200
+ENTRIES_PER_KEY = 100
+EVENTS = 500
+# events per flush when writes are coalesced. ~5 seconds of busy traffic
+EVENTS_PER_FLUSH = 50
+
+
+def make_state():
+    state = dict()
+    for i in range(KEY_COUNT):
+        state[f"key_{i}"] = {str(random.randrange(10 ** 17, 10 ** 18)): time.time() for j in range(ENTRIES_PER_KEY)}
+    return state
+
+
+def make_events(state):
+    keys = list(state.keys())
+    # a few hot keys take most of the traffic, like mischief_cooldown and mischief_usage
+    hot = keys[:5]
+    return [random.choice(hot) if random.random() < 0.9 else random.choice(keys) for i in range(EVENTS)]
+
+
+def full_rewrite_per_event(state, events):
+    backend = PersistentStore.JsonBackend("bench_persistent")
+    written = 0
+    for key in events:
+        state[key][str(random.randrange(10 ** 17, 10 ** 18))] = time.time()
+        text = json.dumps(state, indent=4, skipkeys=True, sort_keys=True)
+        backend.write({}, set(), text)
+        written += len(text)
+    return written
+
+
+def coalesced_json(state, events):
+    backend = PersistentStore.JsonBackend("bench_persistent")
+    written = 0
+    for i, key in enumerate(events):
+        state[key][str(random.randrange(10 ** 17, 10 ** 18))] = time.time()
+        if (i + 1) % EVENTS_PER_FLUSH == 0:
+            text = json.dumps(state, indent=4, skipkeys=True, sort_keys=True)
+            backend.write({}, set(), text)
+            written += len(text)
+    return written
+
+
+def coalesced_sqlite(state, events):
+    backend = PersistentStore.SqliteBackend("bench_persistent.sqlite")
+    backend.write({key: json.dumps(value) for key, value in state.items()}, set())
+    written = 0
+    dirty = set()
+    for i, key in enumerate(events):
+        state[key][str(random.randrange(10 ** 17, 10 ** 18))] = time.time()
+        dirty.add(key)
+        if (i + 1) % EVENTS_PER_FLUSH == 0:
+            changed = {k: json.dumps(state[k]) for k in dirty}
+            dirty.clear()
+            backend.write(changed, set())
+            written += sum(len(value) for value in changed.values())
+    backend.close()
+    return written
+
+
+def run():
+    random.seed(1)
+    base = make_state()
+    events = make_events(base)
+    print(f"{KEY_COUNT} keys x {ENTRIES_PER_KEY} entries, {EVENTS} events, "
+          f"state is {len(json.dumps(base, indent=4)) // 1024} KiB as json")
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        for name, job in (("json rewrite per event", full_rewrite_per_event),
+                          (f"json every {EVENTS_PER_FLUSH} events", coalesced_json),
+                          (f"sqlite changed keys every {EVENTS_PER_FLUSH} events", coalesced_sqlite)):
+            state = json.loads(json.dumps(base))
+            start = time.perf_counter()
+            written = job(state, events)
+            elapsed = time.perf_counter() - start
+            print(f"{name:45} {elapsed:8.3f}s {written // 1024:10} KiB serialized")
+
+
+if __name__ == "__main__":
+    run()
+    print("Done!")
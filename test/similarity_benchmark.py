@@ -0,0 +1,94 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Similarity
+
+REPORTS = 100000
+QUERIES = 1000
+DUPLICATES = 500
+
+PLACES = ["home", "isle", "prairie", "forest", "valley", "wasteland", "vault", "eden", "aviary", "village", "temple",
+          "cave", "cloud", "boat", "shrine", "treehouse", "kingdom", "garden", "library", "theater"]
+THINGS = ["candle", "cape", "spirit", "friend", "emote", "shout", "wing", "manta", "krill", "crab", "jellyfish",
+          "portal", "map", "inventory", "chat", "bench", "instrument", "umbrella", "lantern", "gate", "door", "shop",
+          "quest", "season", "pass", "music", "sheet", "torch", "camera", "hairstyle", "mask", "pants", "prop"]
+PROBLEMS = ["crashes", "freezes", "disappears", "flickers", "stuck", "invisible", "missing", "duplicated", "black",
+            "lagging", "glitching", "muted", "reset", "wrong", "floating", "clipping", "frozen", "broken", "slow"]
+ACTIONS = ["open", "close", "tap", "hold", "fly", "walk", "swim", "sit", "light", "burn", "trade", "gift", "unlock",
+           "equip", "relog", "restart", "load", "enter", "leave", "call", "play", "record", "zoom", "rotate"]
+
+
+def make_report(rng):
+    place, thing, problem = rng.choice(PLACES), rng.choice(THINGS), rng.choice(PROBLEMS)
+    title = f"{thing} {problem} in {place}"
+    actual = f"the {thing} {problem} when I {rng.choice(ACTIONS)} it near the {rng.choice(THINGS)} in {place} " \
+             f"{rng.randint(1, 500)} times"
+    steps = " ".join(f"{i}. {rng.choice(ACTIONS)} the {rng.choice(THINGS)} at {rng.choice(PLACES)}"
+                     for i in range(1, rng.randint(3, 6)))
+    return title, actual, steps
+
+
+def reword(rng, report):
+    """near duplicate: same report with a few words changed or dropped"""
+    words = " ".join(report).split()
+    for i in range(max(1, len(words) // 10)):
+        position = rng.randrange(len(words))
+        if rng.random() < 0.5:
+            words[position] = rng.choice(ACTIONS)
+        else:
+            del words[position]
+    return " ".join(words)
+
+
+def run():
+    rng = random.Random(1)
+    reports = [make_report(rng) for i in range(REPORTS)]
+    texts = [Similarity.report_text(*report) for report in reports]
+
+    start = time.perf_counter()
+    signatures = Similarity.signatures(texts)
+    signed = time.perf_counter() - start
+    index = Similarity.MinHashIndex()
+    start = time.perf_counter()
+    for page in range(0, REPORTS, 500):
+        index.insert(range(page, page + 500), signatures[page:page + 500])
+    inserted = time.perf_counter() - start
+    print(f"{len(index)} reports signed in {signed:.2f}s ({signed / REPORTS * 1000000:.1f}us each), "
+          f"inserted in {inserted:.2f}s")
+
+    # the newest reports get a few reworded copies each, like a bug everyone runs into after a patch
+    start = time.perf_counter()
+    for i in range(1000):
+        index.add(REPORTS + i, reword(rng, reports[REPORTS - 1 - i % 100]))
+    print(f"one at a time: {(time.perf_counter() - start) / 1000 * 1000:.3f}ms per report added")
+
+    durations = []
+    for i in range(QUERIES):
+        text = texts[rng.randrange(REPORTS)]
+        start = time.perf_counter()
+        index.similar(text, limit=5)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    print(f"query: mean {sum(durations) / QUERIES * 1000:.2f}ms, "
+          f"p50 {durations[QUERIES // 2] * 1000:.2f}ms, p99 {durations[int(QUERIES * 0.99)] * 1000:.2f}ms")
+
+    found = 0
+    for i in range(DUPLICATES):
+        original = rng.randrange(REPORTS)
+        results = index.similar(reword(rng, reports[original]), limit=5, threshold=0.5)
+        found += any(report_id == original for report_id, score in results)
+    print(f"reworded duplicates found in the top 5: {found}/{DUPLICATES}")
+
+    start = time.perf_counter()
+    clusters = index.clusters(range(REPORTS - 500, REPORTS + 1000), threshold=0.6)
+    print(f"clusters over the last 1500 reports: {len(clusters)}, biggest {len(clusters[0]) if clusters else 0}, "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    run()
+    print("Done!")
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tortoise import Tortoise
+
+from utils import Database
+from utils.Database import BugReport, count_bug_reports
+
+NOW = 2000000000
+DAY = NOW // 86400
+
+
+class BugStatsTest(IsolatedAsyncioTestCase):
+    """Needs the test_junk database, like tortoise_tests"""
+
+    async def asyncSetUp(self):
+        await Database.init("test_junk")
+        last = await BugReport.all().order_by("-id").first()
+        self.after_id = last.id if last else 0
+        self.created = []
+
+    async def asyncTearDown(self):
+        await BugReport.filter(id__in=[report.id for report in self.created]).delete()
+        await Tortoise.close_connections()
+
+    async def report(self, reported_at, platform="Android", branch="Live", app_version="0.1"):
+        report = await BugReport.create(
+            reporter=1, platform=platform, platform_version="1", branch=branch, app_version=app_version,
+            title="test", deviceinfo="test", steps="test", expected="test", actual="test", additional="test",
+            reported_at=reported_at)
+        self.created.append(report)
+        return report
+
+    async def rollup(self, after_id, before):
+        """the same accumulation as Bugs.refresh_report_stats"""
+        stats = dict()
+        last_id = after_id
+        for row in await count_bug_reports(after_id, before):
+            key = (row['platform'], row['branch'], row['app_version'], int(row['day']))
+            stats[key] = stats.get(key, 0) + int(row['reports'])
+            last_id = max(last_id, int(row['last_id']))
+        return stats, last_id
+
+    async def test_grouped_counts(self):
+        first = await self.report(NOW - 100)
+        await self.report(NOW - 90)
+        last = await self.report(NOW - 80, platform="iOS")
+        stats, last_id = await self.rollup(self.after_id, NOW)
+        self.assertEqual(stats, {("Android", "Live", "0.1", DAY): 2, ("iOS", "Live", "0.1", DAY): 1})
+        self.assertEqual(last_id, last.id)
+        self.assertLess(first.id, last.id)
+
+    async def test_unsettled_report_holds_the_watermark(self):
+        settled = await self.report(NOW - 100)
+        # saved with a lower id, but its reported_at is still inside the settle window
+        unsettled = await self.report(NOW + 100)
+        later = await self.report(NOW - 50)
+
+        stats, last_id = await self.rollup(self.after_id, NOW)
+        self.assertEqual(stats, {("Android", "Live", "0.1", DAY): 1})
+        self.assertEqual(last_id, settled.id)
+
+        # once it settles, the rest is counted and nothing was skipped
+        stats, last_id = await self.rollup(last_id, NOW + 1000)
+        self.assertEqual(sum(stats.values()), 2)
+        self.assertEqual(last_id, later.id)
+        self.assertLess(unsettled.id, later.id)
+
+    async def test_nothing_new(self):
+        stats, last_id = await self.rollup(self.after_id, NOW)
+        self.assertEqual(stats, dict())
+        self.assertEqual(last_id, self.after_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import LiteralMatcher
+
+
+class LiteralMatcherTest(unittest.TestCase):
+
+    def tearDown(self):
+        LiteralMatcher.GUILD_MATCHERS.clear()
+
+    def test_overlapping_literals(self):
+        matcher = LiteralMatcher.LiteralMatcher()
+        for word in ("he", "she", "his", "hers"):
+            matcher.add(word, ('word', word))
+        self.assertEqual(matcher.search("ushers"), {('word', 'he'), ('word', 'she'), ('word', 'hers')})
+        self.assertEqual(matcher.search("nothing here"), {('word', 'he')})
+        self.assertEqual(matcher.search("xyz"), set())
+
+    def test_case_insensitive(self):
+        matcher = LiteralMatcher.LiteralMatcher()
+        matcher.add("Krill", ('ar', 1))
+        self.assertEqual(matcher.search("A KRILL attack"), {('ar', 1)})
+
+    def test_always_keys(self):
+        matcher = LiteralMatcher.LiteralMatcher()
+        matcher.add_always(('ar', 1))
+        matcher.add("", ('ar', 2))
+        self.assertEqual(matcher.search("anything"), {('ar', 1), ('ar', 2)})
+
+    def test_discard_and_clear(self):
+        matcher = LiteralMatcher.LiteralMatcher()
+        matcher.add("candle", ('ar', 1))
+        matcher.add("candle", ('word', 'candle'))
+        matcher.add("cape", ('ar', 2))
+        self.assertEqual(matcher.search("candle"), {('ar', 1), ('word', 'candle')})
+        matcher.discard(('ar', 1))
+        self.assertEqual(matcher.search("candle cape"), {('word', 'candle'), ('ar', 2)})
+        matcher.clear('ar')
+        self.assertEqual(matcher.search("candle cape"), {('word', 'candle')})
+        matcher.clear('word')
+        self.assertTrue(matcher.is_empty())
+
+    def test_same_as_word_pattern(self):
+        """Same answer as the alternation WordCounter runs on the candidates"""
+        rng = random.Random(1)
+        for i in range(200):
+            words = {''.join(rng.choice("abc ") for j in range(rng.randint(1, 4))).strip() or "a"
+                     for k in range(rng.randint(1, 8))}
+            matcher = LiteralMatcher.LiteralMatcher()
+            for word in words:
+                matcher.add(word, ('word', word))
+            for j in range(20):
+                text = ''.join(rng.choice("abcABC ") for k in range(rng.randint(0, 30)))
+                expected = {('word', word) for word in words if re.search(re.escape(word), text, re.IGNORECASE)}
+                self.assertEqual(matcher.search(text), expected, (words, text))
+
+    def test_guild_matchers(self):
+        LiteralMatcher.get_guild_matcher(1).add("hi", ('ar', 1))
+        LiteralMatcher.get_guild_matcher(1).add("yo", ('word', 'yo'))
+        LiteralMatcher.get_guild_matcher(2).add("x", ('ar', 2))
+
+        LiteralMatcher.clear_all_guild_matchers('ar')
+        self.assertEqual(list(LiteralMatcher.GUILD_MATCHERS), [1])
+        self.assertEqual(LiteralMatcher.get_guild_matcher(1).search("hi yo"), {('word', 'yo')})
+
+        LiteralMatcher.remove_guild_matcher(1)
+        self.assertEqual(LiteralMatcher.GUILD_MATCHERS, dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
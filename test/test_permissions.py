@@ -0,0 +1,116 @@
+import os
+import sys
+import unittest
+from dataclasses import replace
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Configuration, Permissions, Utils
+from utils.Permissions import Capability
+
+GUILD_ID = 10
+HOME_GUILD_ID = 20
+
+
+def guild_permissions(**granted):
+    names = ('mute_members', 'ban_members', 'manage_channels', 'manage_guild')
+    return SimpleNamespace(**{name: granted.get(name, False) for name in names})
+
+
+def make_member(member_id, guild_id=GUILD_ID, role_ids=(), **granted):
+    return SimpleNamespace(id=member_id,
+                           guild=SimpleNamespace(id=guild_id),
+                           roles=[SimpleNamespace(id=role_id) for role_id in role_ids],
+                           guild_permissions=guild_permissions(**granted))
+
+
+class CapabilityTest(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.admins = set()
+        self.home_members = dict()
+        bot = SimpleNamespace(member_is_admin=AsyncMock(side_effect=lambda member_id: member_id in self.admins))
+        home_guild = SimpleNamespace(id=HOME_GUILD_ID, get_member=self.home_members.get)
+        self.patches = [patch.object(Utils, 'BOT', bot),
+                        patch.object(Utils, 'get_home_guild', lambda: home_guild),
+                        patch.object(Configuration, 'CONFIG', replace(Configuration.CONFIG, guild_id=HOME_GUILD_ID))]
+        for p in self.patches:
+            p.start()
+        Permissions.invalidate_all()
+        for roles in (Permissions.ADMIN_ROLES, Permissions.MOD_ROLES, Permissions.TRUSTED_ROLES):
+            roles.clear()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        Permissions.invalidate_all()
+
+    async def test_nothing(self):
+        self.assertEqual(await Permissions.resolve(make_member(1)), Capability.NONE)
+
+    async def test_bot_admin(self):
+        self.admins.add(1)
+        self.assertTrue(await Permissions.member_has(make_member(1), Capability.BOT_ADMIN))
+
+    async def test_configured_admin_roles_are_not_bot_admin(self):
+        with patch.object(Configuration, 'CONFIG', replace(Configuration.CONFIG, admin_roles=frozenset({5}))):
+            self.assertFalse(await Permissions.member_has(make_member(1, role_ids=[5]), Capability.BOT_ADMIN))
+
+    async def test_guild_roles(self):
+        Permissions.ADMIN_ROLES[GUILD_ID] = {100}
+        Permissions.MOD_ROLES[GUILD_ID] = {101}
+        Permissions.TRUSTED_ROLES[GUILD_ID] = {102}
+        self.assertEqual(await Permissions.resolve(make_member(1, role_ids=[100, 102])),
+                         Capability.ADMIN | Capability.TRUSTED)
+        self.assertEqual(await Permissions.resolve(make_member(2, role_ids=[101])), Capability.MOD)
+        # roles only count in their own guild
+        self.assertEqual(await Permissions.resolve(make_member(3, guild_id=11, role_ids=[100])), Capability.NONE)
+
+    async def test_guild_permissions(self):
+        member = make_member(1, ban_members=True, manage_guild=True)
+        self.assertEqual(await Permissions.resolve(member), Capability.BAN_MEMBERS | Capability.MANAGE_GUILD)
+
+    async def test_official_permissions_reach_other_guilds(self):
+        self.home_members[1] = make_member(1, guild_id=HOME_GUILD_ID, mute_members=True)
+        self.assertEqual(await Permissions.resolve(make_member(1)), Capability.OFFICIAL_MUTE)
+
+    async def test_cached_until_invalidated(self):
+        member = make_member(1)
+        self.assertFalse(await Permissions.member_has(member, Capability.BOT_ADMIN))
+        self.admins.add(1)
+        self.assertFalse(await Permissions.member_has(member, Capability.BOT_ADMIN))
+        Permissions.invalidate_member(1)
+        self.assertTrue(await Permissions.member_has(member, Capability.BOT_ADMIN))
+
+    async def test_home_guild_invalidates_everything(self):
+        self.assertEqual(await Permissions.get_capabilities(make_member(1)), Capability.NONE)
+        self.home_members[1] = make_member(1, guild_id=HOME_GUILD_ID, ban_members=True)
+        Permissions.invalidate_guild(HOME_GUILD_ID)
+        self.assertEqual(await Permissions.get_capabilities(make_member(1)), Capability.OFFICIAL_BAN)
+
+    async def test_cache_is_bounded(self):
+        with patch.object(Permissions, 'cache_size', 3):
+            for member_id in range(5):
+                await Permissions.get_capabilities(make_member(member_id))
+            self.assertEqual(list(Permissions.CAPABILITIES), [2, 3, 4])
+            # a hit counts as use
+            await Permissions.get_capabilities(make_member(2))
+            await Permissions.get_capabilities(make_member(5))
+            self.assertEqual(list(Permissions.CAPABILITIES), [4, 2, 5])
+
+    async def test_check(self):
+        self.admins.add(1)
+        admin = SimpleNamespace(author=make_member(1))
+        mod = SimpleNamespace(author=make_member(2, ban_members=True))
+        nobody = SimpleNamespace(author=make_member(3))
+        self.assertTrue(await Permissions.check(admin, Capability.BAN_MEMBERS))
+        self.assertTrue(await Permissions.check(mod, Capability.BAN_MEMBERS))
+        self.assertFalse(await Permissions.check(mod, Capability.MANAGE_GUILD))
+        self.assertFalse(await Permissions.check(nobody, Capability.BAN_MEMBERS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Configuration, PersistentStore
+
+
+class InDirectory:
+    """Run in a fresh temp directory, backends write next to the working directory"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+
+class BackendTest(InDirectory, unittest.TestCase):
+
+    def test_sqlite_round_trip(self):
+        backend = PersistentStore.SqliteBackend()
+        backend.write({"a": json.dumps({"1": 2}), "b": json.dumps([1, 2])}, set())
+        backend.write({"a": json.dumps({"1": 3})}, {"b"})
+        backend.close()
+
+        backend = PersistentStore.SqliteBackend()
+        self.assertEqual(backend.load_all(), {"a": {"1": 3}})
+        backend.close()
+
+    def test_json_round_trip(self):
+        backend = PersistentStore.JsonBackend()
+        data = {"a": {"1": 2}, "b": [1, 2]}
+        backend.write(dict(), set(), json.dumps(data))
+        self.assertEqual(PersistentStore.JsonBackend().load_all(), data)
+        self.assertFalse(os.path.exists("persistent.json.tmp"))
+
+    def test_migrate_json(self):
+        data = {"a": {"1": 2}, "b": "text"}
+        with open("persistent.json", "w", encoding="UTF-8") as file:
+            json.dump(data, file)
+
+        backend = PersistentStore.get_backend("sqlite")
+        self.assertEqual(backend.load_all(), data)
+        self.assertFalse(os.path.exists("persistent.json"))
+        self.assertTrue(os.path.exists("persistent.json.migrated"))
+        backend.close()
+
+    def test_migrate_only_into_empty_store(self):
+        backend = PersistentStore.SqliteBackend()
+        backend.write({"kept": json.dumps(1)}, set())
+        with open("persistent.json", "w", encoding="UTF-8") as file:
+            json.dump({"ignored": 2}, file)
+
+        PersistentStore.migrate_json(backend)
+        self.assertEqual(backend.load_all(), {"kept": 1})
+        self.assertTrue(os.path.exists("persistent.json"))
+        backend.close()
+
+
+class MemoryBackend(PersistentStore.PersistentBackend):
+
+    def __init__(self, fail=False):
+        self.stored = dict()
+        self.fail = fail
+
+    def load_all(self) -> dict:
+        return {key: json.loads(value) for key, value in self.stored.items()}
+
+    def write(self, changed: dict, deleted: set, everything: str = None):
+        if self.fail:
+            raise OSError("disk full")
+        self.stored.update(changed)
+        for key in deleted:
+            self.stored.pop(key, None)
+
+
+class FlushTest(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        Configuration.PERSISTENT = dict()
+        Configuration.PERSISTENT_LOADED = True
+        Configuration.PERSISTENT_DIRTY.clear()
+        Configuration.PERSISTENT_FLUSH_LOCK = None
+        Configuration.PERSISTENT_FLUSH_STOP = None
+        Configuration.PERSISTENT_BACKEND = MemoryBackend()
+        self.interval = Configuration.PERSISTENT_FLUSH_INTERVAL
+
+    def tearDown(self):
+        Configuration.PERSISTENT_FLUSH_INTERVAL = self.interval
+
+    def set_var(self, key, value):
+        Configuration.do_persistent_action(Configuration.PersistentAction(key=key, value=value))
+
+    async def test_only_changed_keys_are_written(self):
+        self.set_var("a", 1)
+        self.set_var("b", {"x": [1]})
+        await Configuration.flush_persistent()
+        self.assertEqual(Configuration.PERSISTENT_BACKEND.load_all(), {"a": 1, "b": {"x": [1]}})
+        self.assertFalse(Configuration.PERSISTENT_DIRTY)
+
+        Configuration.do_persistent_action(Configuration.PersistentAction(key="a", delete=True))
+        await Configuration.flush_persistent()
+        self.assertEqual(Configuration.PERSISTENT_BACKEND.load_all(), {"b": {"x": [1]}})
+
+    async def test_unstorable_value_is_skipped(self):
+        self.set_var("good", 1)
+        self.set_var("bad", object())
+        await Configuration.flush_persistent()
+        self.assertEqual(Configuration.PERSISTENT_BACKEND.load_all(), {"good": 1})
+        self.assertFalse(Configuration.PERSISTENT_DIRTY)
+
+    async def test_failed_write_stays_dirty(self):
+        Configuration.PERSISTENT_BACKEND.fail = True
+        self.set_var("a", 1)
+        await Configuration.flush_persistent()
+        self.assertEqual(Configuration.PERSISTENT_DIRTY, {"a"})
+
+        Configuration.PERSISTENT_BACKEND.fail = False
+        await Configuration.flush_persistent()
+        self.assertEqual(Configuration.PERSISTENT_BACKEND.load_all(), {"a": 1})
+
+    async def test_stopped_loop_flushes_once_more(self):
+        Configuration.PERSISTENT_FLUSH_INTERVAL = 60
+        task = asyncio.create_task(Configuration.persistent_flush_loop())
+        self.set_var("a", 1)
+        Configuration.stop_persistent_flush()
+        await asyncio.wait_for(task, 5)
+        self.assertEqual(Configuration.PERSISTENT_BACKEND.load_all(), {"a": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import Similarity
+
+CRASH = "candle crashes in prairie when I fly near the manta and light the spirit gate"
+CRASH_REWORDED = "candle crashes in prairie when I fly near the manta and light the spirit door"
+MUSIC = "music sheet muted in village theater after I record a song on the piano instrument"
+MUSIC_REWORDED = "music sheet muted in village theater after I record a song on the harp instrument"
+UNRELATED = "krill floating frozen above wasteland battlefield while crabs swim backwards"
+
+
+class SimilarityTest(unittest.TestCase):
+
+    def make_index(self, **kwargs):
+        index = Similarity.MinHashIndex(**kwargs)
+        for report_id, text in enumerate((CRASH, MUSIC, UNRELATED, CRASH_REWORDED, MUSIC_REWORDED), start=1):
+            index.add(report_id, text)
+        return index
+
+    def test_signature_is_stable(self):
+        self.assertTrue((Similarity.signature(CRASH) == Similarity.signature(CRASH)).all())
+        self.assertIsNone(Similarity.signature("a an to"))
+
+    def test_similar(self):
+        index = self.make_index()
+        results = index.similar(CRASH, limit=5, threshold=0.5)
+        self.assertEqual(results[0], (1, 1.0))
+        self.assertEqual([report_id for report_id, score in results], [1, 4])
+        self.assertEqual(index.similar_to(1), [(4, index.similar(CRASH, exclude=1)[0][1])])
+
+    def test_clusters(self):
+        index = self.make_index()
+        self.assertEqual(index.clusters(range(1, 6), threshold=0.6), [[1, 4], [2, 5]])
+        # only the reports asked about are grouped
+        self.assertEqual(index.clusters([1, 2, 3, 4], threshold=0.6), [[1, 4]])
+        self.assertEqual(index.clusters([], threshold=0.6), [])
+
+    def test_clusters_across_merged_and_tail(self):
+        index = Similarity.MinHashIndex(capacity=2)
+        for report_id in range(300):
+            index.add(report_id, f"filler report number {report_id} about topic{report_id} and thing{report_id}")
+        index.add(1000, CRASH)
+        index._merge()
+        index.add(1001, CRASH_REWORDED)
+        self.assertEqual(index.clusters(index.latest(5), threshold=0.6), [[1000, 1001]])
+
+    def test_latest(self):
+        index = self.make_index()
+        self.assertEqual(index.latest(2), [4, 5])
+        self.assertEqual(index.latest(100), [1, 2, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+from collections import OrderedDict
+
+from utils import Logging
+
+
+class AdmissionQueue:
+    """
+    Runs at most `limit` jobs at once. Jobs over the limit wait in a FIFO, one place per key, and are started as
+    running jobs finish. There is one task per running job and none while idle; finished tasks are dropped as soon
+    as they are done.
+    """
+
+    def __init__(self, name, runner, limit):
+        """
+        :param name: name for logging
+        :param runner: coroutine function that takes a work item
+        :param limit: max number of jobs running at once
+        """
+        self.name = name
+        self.runner = runner
+        self.limit = limit
+        # key -> work item, oldest first
+        self.waiting = OrderedDict()
+        self.active = set()
+        self.paused = False
+
+    def submit(self, key, work_item) -> int:
+        """
+        Start a job, or queue it when the limit is reached or the queue is paused
+        :param key: identifies who the job is for. a key already waiting keeps its place and isn't queued twice
+        :param work_item: passed to the runner
+        :return: 0 when the job started, otherwise its position in the queue, starting at 1
+        """
+        if not self.waiting and not self.paused and len(self.active) < self.limit:
+            self._start(work_item)
+            return 0
+        self.waiting.setdefault(key, work_item)
+        return self.position(key)
+
+    def position(self, key) -> int:
+        """:return: position of key in the queue, starting at 1. 0 if it isn't waiting"""
+        for position, waiting_key in enumerate(self.waiting, start=1):
+            if waiting_key == key:
+                return position
+        return 0
+
+    def pause(self):
+        """Stop starting jobs. Running jobs carry on and new jobs wait until resume"""
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self._admit()
+
+    def set_limit(self, limit):
+        """Change how many jobs can run at once. Jobs already running past a lower limit are left alone"""
+        self.limit = limit
+        self._admit()
+
+    async def drain(self):
+        """Wait for the running jobs to finish. Call pause first, or waiting jobs will start as others finish"""
+        while self.active:
+            await asyncio.wait(set(self.active))
+
+    async def cancel_all(self) -> int:
+        """
+        Cancel running jobs and forget waiting ones
+        :return: number of waiting jobs that were dropped
+        """
+        dropped = len(self.waiting)
+        self.waiting.clear()
+        tasks = list(self.active)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return dropped
+
+    def _start(self, work_item):
+        task = asyncio.create_task(self.runner(work_item))
+        self.active.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self.active.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            Logging.info(f"{self.name} job failed: {task.exception()}")
+        self._admit()
+
+    def _admit(self):
+        while self.waiting and not self.paused and len(self.active) < self.limit:
+            key, work_item = self.waiting.popitem(last=False)
+            self._start(work_item)
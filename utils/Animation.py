@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import namedtuple
+
+# Discord lets a channel take about 5 message edits per 5 seconds before it starts answering with 429s
+EDITS_PER_WINDOW = 5
+EDIT_WINDOW = 5
+MAX_BUCKETS = 1000
+
+# one step of an animation. `target` names the message to edit, `hold` is how long the frame should stay up.
+# frames marked `keep` are never dropped, the last frame of an animation never is either
+Frame = namedtuple("Frame", "content hold target keep", defaults=(1, 'main', False))
+
+# channel id -> EditBucket
+BUCKETS = dict()
+
+
+class EditBucket:
+    """Token bucket for the message edits in one channel, shared by every animation running there"""
+
+    def __init__(self, rate=EDITS_PER_WINDOW, per=EDIT_WINDOW):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.refill = rate / per
+        self.updated = time.monotonic()
+
+    def _update(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill)
+        self.updated = now
+
+    def delay(self) -> float:
+        """:return: seconds until an edit can be made, 0 if one can be made now"""
+        self._update()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.refill
+
+    def take(self):
+        self._update()
+        self.tokens -= 1
+
+    def is_full(self) -> bool:
+        self._update()
+        return self.tokens >= self.capacity
+
+
+def get_bucket(channel_id) -> EditBucket:
+    bucket = BUCKETS.get(channel_id)
+    if bucket is None:
+        if len(BUCKETS) >= MAX_BUCKETS:
+            # a full bucket is the same as a new one, so idle channels can be forgotten
+            for idle in [cid for cid, b in BUCKETS.items() if b.is_full()]:
+                del BUCKETS[idle]
+        bucket = BUCKETS[channel_id] = EditBucket()
+    return bucket
+
+
+def skip_frames(frames, index, wait) -> int:
+    """
+    :param frames: the animation
+    :param index: frame that is due now
+    :param wait: seconds until the channel can take the next edit
+    :return: index of the frame to show once the wait is over. frames that would already be over are dropped
+    """
+    while index < len(frames) - 1 and not frames[index].keep and frames[index].hold <= wait:
+        wait -= frames[index].hold
+        index += 1
+    return index
+
+
+async def play(messages: dict, frames: list) -> dict:
+    """
+    Play a precomputed animation by editing messages. Edits are paced by each channel's edit bucket, so animations
+    in different channels don't wait on each other, and frames are dropped rather than queued when a channel is busy.
+    :param messages: target name -> message to edit
+    :param frames: list of Frame
+    :return: target name -> message as last edited
+    """
+    index = 0
+    due = time.monotonic()
+    while index < len(frames):
+        delay = due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        bucket = get_bucket(messages[frames[index].target].channel.id)
+        while (wait := bucket.delay()) > 0:
+            index = skip_frames(frames, index, wait)
+            await asyncio.sleep(wait)
+        frame = frames[index]
+        # no await between checking the bucket and taking from it, so animations sharing a channel can't both get in
+        bucket.take()
+        messages[frame.target] = await messages[frame.target].edit(content=frame.content)
+        due = time.monotonic() + frame.hold
+        index += 1
+    return messages
@@ -1,9 +1,10 @@
 import asyncio
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
 import json
+from types import MappingProxyType
 
-from utils import Logging, Utils
+from utils import Logging, Utils, PersistentStore
 
 MASTER_CONFIG = dict()
 MASTER_LOADED = False
@@ -12,6 +13,66 @@ PERSISTENT_LOADED = False
 PERSISTENT_DEQUE = deque()
 PERSISTENT_LOCK = False
 PERSISTENT_AIO_QUEUE: asyncio.Queue
+PERSISTENT_BACKEND: PersistentStore.PersistentBackend = None
+# keys set or deleted since the last flush
+PERSISTENT_DIRTY = set()
+PERSISTENT_FLUSH_INTERVAL = 5
+PERSISTENT_FLUSH_LOCK = None
+# set to make persistent_flush_loop do a last flush and return
+PERSISTENT_FLUSH_STOP = None
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Typed, read-only view of config.json. Fields and their defaults are the schema, config.json only overrides them.
+    Rebuilt by load(), so hold on to CONFIG itself rather than copying values out of it.
+    """
+    bot_prefix: str = "!"
+    bot_name: str = "this bot"
+    token: str = ""
+    DATABASE_NAME: str = ""
+    DATABASE_USER: str = ""
+    DATABASE_PASS: str = ""
+    DATABASE_HOST: str = "localhost"
+    DATABASE_PORT: int = 3306
+    METRICS_PORT: int = 8080
+    SENTRY_DSN: str = ""
+    SENTRY_ENV: str = "Dev"
+    ADMINS: frozenset = frozenset()
+    EMOJI: MappingProxyType = field(default_factory=lambda: MappingProxyType(dict()))
+    cogs: tuple = ()
+    admin_roles: frozenset = frozenset()
+    broadcast_locale: str = "en_US"
+    guild_id: int = 0
+    log_channel: int = 0
+    max_attachments: int = 3
+    question_timeout_seconds: int = 300
+    bug_trash_sweep_minutes: int = 40
+    bug_report_concurrency: int = 200
+    bug_info_refresh_seconds: int = 30
+    persistent_backend: str = "sqlite"
+
+
+CONFIG_FIELDS = {config_field.name: config_field for config_field in fields(Config)}
+CONFIG = Config()
+
+
+def build_config(raw: dict) -> Config:
+    """
+    :param raw: parsed config.json
+    :return: Config with the values from raw converted to the schema types. bad values fall back to defaults
+    """
+    values = dict()
+    for name, config_field in CONFIG_FIELDS.items():
+        if raw.get(name) is None:
+            continue
+        try:
+            values[name] = config_field.type(raw[name]) if config_field.type is not MappingProxyType \
+                else MappingProxyType(dict(raw[name]))
+        except (TypeError, ValueError) as e:
+            Logging.error(f"config value for `{name}` is not a valid {config_field.type.__name__}, using default: {e}")
+    return replace(Config(), **values)
 
 
 @dataclass()
@@ -31,32 +92,58 @@ def save():
 
 # Ugly but this prevents import loop errors
 def load():
-    global MASTER_CONFIG, MASTER_LOADED
+    global MASTER_CONFIG, MASTER_LOADED, CONFIG
     try:
         with open('config.json', 'r') as jsonfile:
             MASTER_CONFIG = json.load(jsonfile)
-            MASTER_LOADED = True
     except FileNotFoundError:
         Logging.error("Unable to load config, running with defaults.")
     except Exception as e:
         Logging.error("Failed to parse configuration.")
         print(e)
         raise e
+    CONFIG = build_config(MASTER_CONFIG)
+    MASTER_LOADED = True
 
 
 def get_var(key, default=None):
-    global MASTER_CONFIG, MASTER_LOADED
+    """
+    Look up a config value. Never writes config.json.
+    Keys in the Config schema come from the snapshot and use the schema default, other keys use `default`.
+    Hot paths should read CONFIG attributes directly.
+    """
     if not MASTER_LOADED:
         load()
-    if key not in MASTER_CONFIG.keys():
-        MASTER_CONFIG[key] = default
+    if key in CONFIG_FIELDS:
+        return getattr(CONFIG, key)
+    return MASTER_CONFIG.get(key, default)
+
+
+def set_var(key, value):
+    """Change a config value, write config.json and rebuild the snapshot"""
+    global CONFIG
+    if not MASTER_LOADED:
+        load()
+    MASTER_CONFIG[key] = value
+    save()
+    CONFIG = build_config(MASTER_CONFIG)
+
+
+def del_var(key):
+    """Remove a config value, write config.json and rebuild the snapshot"""
+    global CONFIG
+    if not MASTER_LOADED:
+        load()
+    if MASTER_CONFIG.pop(key, None) is not None:
         save()
-    return MASTER_CONFIG[key]
+        CONFIG = build_config(MASTER_CONFIG)
 
 
 def load_persistent():
-    global PERSISTENT_LOADED, PERSISTENT
-    PERSISTENT = Utils.fetch_from_disk('persistent')
+    global PERSISTENT_LOADED, PERSISTENT, PERSISTENT_BACKEND
+    if PERSISTENT_BACKEND is None:
+        PERSISTENT_BACKEND = PersistentStore.get_backend(get_var("persistent_backend", "sqlite"))
+    PERSISTENT = PERSISTENT_BACKEND.load_all()
     PERSISTENT_LOADED = True
 
 
@@ -75,12 +162,15 @@ def del_persistent_var(key, tolerate_missing=False):
 
 
 def do_persistent_action(action: PersistentAction):
+    if not PERSISTENT_LOADED:
+        # changes made before the first read would be lost when the stored vars are loaded over them
+        load_persistent()
     if action.delete and action.key:
         # DELETE
         try:
             del PERSISTENT[action.key]
             # Logging.info("save persistent delete")
-            Utils.save_to_disk("persistent", PERSISTENT)
+            mark_persistent_dirty(action.key)
         except KeyError as e:
             if action.tolerate_missing:
                 Logging.info(f'skipping delete for `{action.key}`')
@@ -93,4 +183,104 @@ def do_persistent_action(action: PersistentAction):
         # SAVE/CREATE
         PERSISTENT[action.key] = action.value
         # Logging.info("save persistent")
-        Utils.save_to_disk("persistent", PERSISTENT)
+        mark_persistent_dirty(action.key)
+
+
+def mark_persistent_dirty(key):
+    PERSISTENT_DIRTY.add(key)
+
+
+def is_storable(value) -> bool:
+    try:
+        json.dumps(value, skipkeys=True, sort_keys=True)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+async def flush_persistent():
+    """
+    Write the persistent vars that changed since the last flush to the backend.
+    Serialized on the loop so the snapshot is consistent, written from a thread.
+    """
+    global PERSISTENT_FLUSH_LOCK
+    if PERSISTENT_FLUSH_LOCK is None:
+        PERSISTENT_FLUSH_LOCK = asyncio.Lock()
+    async with PERSISTENT_FLUSH_LOCK:
+        if not PERSISTENT_DIRTY or PERSISTENT_BACKEND is None:
+            return
+        changed = dict()
+        skipped = set()
+        for key in PERSISTENT_DIRTY:
+            if key not in PERSISTENT:
+                continue
+            try:
+                changed[key] = json.dumps(PERSISTENT[key], skipkeys=True)
+            except (TypeError, ValueError) as e:
+                # a bad value only costs its own key, the rest of the batch still goes out
+                skipped.add(key)
+                Utils.get_embed_and_log_exception(f"---persistent var `{key}` can't be stored, skipped---",
+                                                  Utils.BOT, e)
+        deleted = {key for key in PERSISTENT_DIRTY if key not in PERSISTENT}
+        everything = None
+        if PERSISTENT_BACKEND.needs_everything:
+            storable = {key: value for key, value in PERSISTENT.items() if key not in skipped}
+            try:
+                everything = json.dumps(storable, indent=4, skipkeys=True, sort_keys=True)
+            except (TypeError, ValueError) as e:
+                # a bad value that isn't dirty this round. leave it out of the file like the dirty ones
+                Utils.get_embed_and_log_exception("---persistent vars can't all be stored, skipping bad ones---",
+                                                  Utils.BOT, e)
+                storable = {key: value for key, value in storable.items() if is_storable(value)}
+                everything = json.dumps(storable, indent=4, skipkeys=True, sort_keys=True)
+        # only the keys going out now. keys changed while the write runs stay dirty for the next flush
+        PERSISTENT_DIRTY.difference_update(changed.keys() | deleted | skipped)
+        write = asyncio.ensure_future(asyncio.to_thread(PERSISTENT_BACKEND.write, changed, deleted, everything))
+        try:
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # the thread can't be stopped. keep holding the lock until it's done so no other write overlaps it
+                await asyncio.wait({write})
+                raise
+        except Exception as e:
+            Utils.get_embed_and_log_exception("---persistent flush failed---", Utils.BOT, e)
+        finally:
+            if not write.done() or write.cancelled() or write.exception() is not None:
+                # try again next flush
+                PERSISTENT_DIRTY.update(changed.keys() | deleted)
+
+
+def close_persistent():
+    """Close the backend. Only once no flush is running, see stop_persistent_flush"""
+    if PERSISTENT_BACKEND is not None:
+        PERSISTENT_BACKEND.close()
+
+
+def get_persistent_flush_stop() -> asyncio.Event:
+    global PERSISTENT_FLUSH_STOP
+    if PERSISTENT_FLUSH_STOP is None:
+        PERSISTENT_FLUSH_STOP = asyncio.Event()
+    return PERSISTENT_FLUSH_STOP
+
+
+def stop_persistent_flush():
+    """Make persistent_flush_loop flush one last time and return. Await the loop's task to know it's done"""
+    get_persistent_flush_stop().set()
+
+
+async def persistent_flush_loop():
+    """Coalesce persistent var changes into one write per PERSISTENT_FLUSH_INTERVAL"""
+    stop = get_persistent_flush_stop()
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), PERSISTENT_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush_persistent()
+        except Exception as e:
+            # the loop has to outlive a bad flush, or nothing is written until shutdown
+            Utils.get_embed_and_log_exception("---persistent flush loop error---", Utils.BOT, e)
+        if stop.is_set():
+            return
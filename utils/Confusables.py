@@ -0,0 +1,120 @@
+import re
+import unicodedata
+
+# codepoints covered by the base table: the BMP, plus the supplementary plane where mathematical alphanumerics,
+# enclosed letters and emoji live
+FOLD_RANGES = (range(0x0000, 0x10000), range(0x10000, 0x20000))
+REGIONAL_INDICATOR_A = 0x1F1E6
+# marks, punctuation, symbols, separators and invisible characters. they never change how a word reads
+DROP_CATEGORIES = ('M', 'P', 'S', 'Z', 'C')
+_BASE_TABLE = None
+# regex token -> characters it matches, for tokens like \s that stand for more than one character
+_EXPANDED_TOKENS = dict()
+
+
+def fold_char(char: str) -> str:
+    """
+    :param char: a single character
+    :return: case folded character with accents and compatibility forms (fullwidth, math letters, circled letters)
+        removed. empty if the character should be dropped
+    """
+    category = unicodedata.category(char)
+    if category == 'Cn':
+        # unassigned, nothing to fold
+        return char
+    decomposed = unicodedata.normalize('NFKD', char)
+    folded = ''.join(c for c in decomposed if not unicodedata.category(c).startswith('M')).casefold()
+    if folded and all(unicodedata.category(c)[0] in 'LN' for c in folded):
+        return folded
+    if category[0] in DROP_CATEGORIES:
+        return ''
+    return char.casefold()
+
+
+def get_base_table() -> dict:
+    """Translation table that folds every character that has a skeleton different from itself. Built once"""
+    global _BASE_TABLE
+    if _BASE_TABLE is None:
+        table = dict()
+        for codepoints in FOLD_RANGES:
+            for codepoint in codepoints:
+                char = chr(codepoint)
+                folded = fold_char(char)
+                if folded != char:
+                    table[codepoint] = folded or None
+        # flag letters 🇦-🇿 read as a-z
+        for offset in range(26):
+            table[REGIONAL_INDICATOR_A + offset] = chr(ord('a') + offset)
+        _BASE_TABLE = table
+    return _BASE_TABLE
+
+
+def token_chars(token: str) -> list:
+    """
+    :param token: regex-escaped literal, or a regex for a single character like \\s
+    :return: the literal, or every character the regex matches. empty when the token is not a valid regex
+    """
+    literal = re.sub(r'\\(.)', r'\1', token, flags=re.DOTALL)
+    try:
+        if literal and re.fullmatch(token, literal):
+            return [literal]
+        if token not in _EXPANDED_TOKENS:
+            pattern = re.compile(token)
+            _EXPANDED_TOKENS[token] = [chr(c) for c in FOLD_RANGES[0] if pattern.fullmatch(chr(c))]
+        return _EXPANDED_TOKENS[token]
+    except re.error:
+        return []
+
+
+class Skeleton:
+    """
+    Folds text to a canonical skeleton in a single pass so one small pattern can match every way of writing a word.
+
+    Accents, case, fullwidth and other compatibility forms fold to the plain letter, configured tokens fold to the
+    letter of their class, and punctuation, symbols, invisible characters and configured space tokens are dropped.
+    Immutable once built. Build a new one when the tokens change.
+    """
+
+    def __init__(self, token_classes: dict, space_tokens=()):
+        """
+        :param token_classes: skeleton letter -> tokens that fold to it, regex-escaped as stored in OreoLetters
+        :param space_tokens: tokens to drop, literal or single character regexes
+        """
+        self.letters = frozenset(token_classes)
+        table = dict(get_base_table())
+        sequences = dict()
+        classes = [(letter, tokens) for letter, tokens in token_classes.items()] + [(None, space_tokens)]
+        for letter, tokens in classes:
+            for token in tokens:
+                for chars in token_chars(token):
+                    if len(chars) > 1:
+                        sequences[chars.casefold()] = letter or ''
+                        continue
+                    # tokens match regardless of case, same as the old IGNORECASE patterns
+                    for variant in {chars, chars.lower(), chars.upper(), chars.casefold()}:
+                        if len(variant) == 1:
+                            table[ord(variant)] = letter
+        self.table = table
+        self.sequences = sequences
+        # multi character tokens are rare, only pay for the extra pass when there are some
+        self.sequence_pattern = None
+        if sequences:
+            alternatives = sorted(sequences, key=len, reverse=True)
+            self.sequence_pattern = re.compile('|'.join(re.escape(s) for s in alternatives), re.IGNORECASE)
+
+    def fold(self, text: str) -> str:
+        """
+        :param text: any text
+        :return: skeleton of the text
+        """
+        if self.sequence_pattern is not None:
+            text = self.sequence_pattern.sub(lambda m: self.sequences.get(m.group(0).casefold(), m.group(0)), text)
+        return text.translate(self.table)
+
+    def covers(self, char: str) -> bool:
+        """
+        :param char: a single character
+        :return: True when the character folds to one of the configured letters or is dropped
+        """
+        folded = char.translate(self.table)
+        return folded == '' or folded in self.letters
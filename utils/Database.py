@@ -150,6 +150,49 @@ class BugReport(AbstractBaseModel):
         table = 'bugreport'
 
 
+# columns covered by the `ftx_bugreport_text` FULLTEXT index, see migration 4. the MATCH list has to be exactly these
+BUG_REPORT_TEXT_COLUMNS = "`title`, `steps`, `expected`, `actual`, `additional`"
+
+
+async def search_bug_reports(text, platform=None, branch=None, app_version=None, limit=10) -> list:
+    """
+    Full text search over bug reports, answered by the FULLTEXT index
+    :param text: words to look for
+    :param platform: only reports for this platform
+    :param branch: only reports for this branch
+    :param app_version: only reports for this app version
+    :param limit: max number of results
+    :return: dicts with id, message_id, platform, branch, app_version, title and score, best match first
+    """
+    match = f"MATCH({BUG_REPORT_TEXT_COLUMNS}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    conditions = [match]
+    values = [text, text]
+    for column, value in (("platform", platform), ("branch", branch), ("app_version", app_version)):
+        if value:
+            conditions.append(f"`{column}` = %s")
+            values.append(value)
+    values.append(limit)
+    query = f"SELECT `id`, `message_id`, `platform`, `branch`, `app_version`, `title`, {match} AS `score` " \
+            f"FROM `bugreport` WHERE {' AND '.join(conditions)} ORDER BY `score` DESC LIMIT %s"
+    return await Tortoise.get_connection("default").execute_query_dict(query, values)
+
+
+async def count_bug_reports(after_id, before) -> list:
+    """
+    Count reports per platform, branch, app version and day, grouped by the database
+    :param after_id: only reports with a higher id
+    :param before: reports submitted from this timestamp on may still be being saved. counting stops below the
+        first of them, even if higher ids are settled, so every id up to the highest last_id returned is counted
+    :return: dicts with platform, branch, app_version, day (days since epoch), reports and last_id
+    """
+    query = "SELECT `platform`, `branch`, `app_version`, FLOOR(`reported_at` / 86400) AS `day`, " \
+            "COUNT(*) AS `reports`, MAX(`id`) AS `last_id` FROM `bugreport` " \
+            "WHERE `id` > %s AND `id` < COALESCE(" \
+            "(SELECT MIN(`id`) FROM `bugreport` WHERE `id` > %s AND `reported_at` >= %s), ~0) " \
+            "GROUP BY `platform`, `branch`, `app_version`, `day`"
+    return await Tortoise.get_connection("default").execute_query_dict(query, [after_id, after_id, before])
+
+
 class BugReportingChannel(AbstractBaseModel):
     guild = ForeignKeyField(f'{app}.Guild', related_name='bug_channels', index=True)
     channelid = BigIntField()
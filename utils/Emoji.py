@@ -1,8 +1,11 @@
-from discord import utils
-
 from utils import Configuration
 
+# configured name -> emoji, for the EMOJI config entries that resolve
 EMOJI = dict()
+# every custom emoji the bot can see, by id
+BY_ID = dict()
+# guild id -> ids of that guild's emojis, so a guild can be dropped or re-indexed on its own
+GUILD_EMOJIS = dict()
 
 BACKUPS = {
     "ANDROID": "🤖",
@@ -41,8 +44,51 @@ BACKUPS = {
 
 
 def initialize(bot):
-    for name, eid in Configuration.get_var("EMOJI", {}).items():
-        EMOJI[name] = utils.get(bot.emojis, id=eid)
+    BY_ID.clear()
+    GUILD_EMOJIS.clear()
+    for guild in bot.guilds:
+        index_guild(guild, resolve=False)
+    resolve_configured()
+
+
+def resolve_configured():
+    EMOJI.clear()
+    for name, eid in Configuration.CONFIG.EMOJI.items():
+        emoji = BY_ID.get(int(eid))
+        if emoji is not None:
+            EMOJI[name] = emoji
+
+
+def index_guild(guild, emojis=None, resolve=True):
+    """
+    (Re)index the emojis of one guild. Call on join and whenever the guild's emojis change
+    :param guild: the guild
+    :param emojis: the guild's current emojis, defaults to guild.emojis
+    :param resolve: re-resolve the configured EMOJI names afterwards
+    """
+    remove_guild(guild.id, resolve=False)
+    ids = set()
+    for emoji in guild.emojis if emojis is None else emojis:
+        BY_ID[emoji.id] = emoji
+        ids.add(emoji.id)
+    GUILD_EMOJIS[guild.id] = ids
+    if resolve:
+        resolve_configured()
+
+
+def remove_guild(guild_id, resolve=True):
+    for eid in GUILD_EMOJIS.pop(guild_id, ()):
+        BY_ID.pop(eid, None)
+    if resolve:
+        resolve_configured()
+
+
+def get_by_id(eid):
+    """
+    :param eid: emoji id
+    :return: the custom emoji with that id, or None when the bot can't see it
+    """
+    return BY_ID.get(eid)
 
 
 def get_chat_emoji(name):
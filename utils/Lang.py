@@ -1,5 +1,6 @@
 import yaml
 import operator
+from string import Formatter
 from discord.ext.commands import Context
 from functools import reduce  # forward compatibility for Python 3
 from utils import Logging, Configuration, Utils
@@ -13,6 +14,31 @@ ALL_LOCALES = 'ALL_LOCALES'
 L_ERR = "~~LOCALIZATION ERROR~~"
 GUILD_LOCALES = dict()
 CHANNEL_LOCALES = dict()
+# full key path -> locale -> LocaleTemplate. built by load_locales
+LOCALE_INDEX = dict()
+# key paths in lang_keys that have children, so they can't be looked up
+NONTERMINAL_KEYS = set()
+
+
+class LocaleTemplate:
+    """A localized string, parsed once so lookups know whether there is anything to format"""
+    __slots__ = ('text', 'has_fields')
+
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            self.has_fields = any(field_name is not None for _, field_name, _, _ in Formatter().parse(text))
+        except ValueError:
+            # unbalanced braces. str.format would fail too, so the text is used as-is
+            self.has_fields = False
+
+    def render(self, arg_dict):
+        if not self.has_fields:
+            return self.text
+        try:
+            return self.text.format(**arg_dict)
+        except KeyError:
+            return self.text
 
 
 async def load_local_overrides():
@@ -40,12 +66,34 @@ def load():
 
 
 def load_locales():
-    global LANG, locales_loaded
+    global LANG, locales_loaded, LOCALE_INDEX, NONTERMINAL_KEYS
     with open("lang_keys.yaml") as file:
         LANG['keys'] = yaml.safe_load(file)
     for locale in locales:
         with open(f"langs/{locale}.yaml") as file:
             LANG[locale] = yaml.safe_load(file)
+
+    # flatten once so lookups are a dict get instead of walking the trees
+    index = dict()
+    nonterminal = set()
+
+    def add_keys(node, path):
+        for name, child in node.items():
+            key_list = path + [name]
+            key = '/'.join(key_list)
+            if child is not None:
+                nonterminal.add(key)
+                add_keys(child, key_list)
+                continue
+            index[key] = dict()
+            for locale in locales:
+                text = get_by_path(LANG[locale], key_list)
+                if isinstance(text, str):
+                    index[key][locale] = LocaleTemplate(text)
+
+    add_keys(LANG['keys'] or dict(), [])
+    LOCALE_INDEX = index
+    NONTERMINAL_KEYS = nonterminal
     locales_loaded = True
 
 
@@ -73,7 +121,7 @@ def get_defaulted_locale(ctx):
 
         if ctx.guild is None:
             # DM - default the language
-            locale = Configuration.get_var('broadcast_locale', 'en_US')
+            locale = Configuration.CONFIG.broadcast_locale
             if locale == ALL_LOCALES:
                 return locales
             return [locale]
@@ -117,28 +165,19 @@ def get_locale_string(key, ctx='', **arg_dict):
     if not locales_loaded:
         load_locales()
 
-    output = []
-    # locale is a list or tuple. may be a single item or multiple
-    for item in locale:
-        locale_lang = LANG[item]
-        key_list = key.split("/")
-
+    templates = LOCALE_INDEX.get(key)
+    if templates is None:
         # Check that keys point to a valid path in base keys
-        obj = LANG['keys']
-
-        if get_by_path(obj, key_list[:-1]) is None or key_list[-1] not in get_by_path(obj, key_list[:-1]):
-            raise KeyError(f"Lang key is not in lang_keys: {key}")
-        if get_by_path(obj, key_list) is not None:
+        if key in NONTERMINAL_KEYS:
             raise KeyError(f"Lang key is not terminal: {key}")
+        raise KeyError(f"Lang key is not in lang_keys: {key}")
 
-        obj = get_by_path(locale_lang, key_list)
-
-        # keys were found. Now check locale for value:
-        if isinstance(obj, str):
-            try:
-                output.append(obj.format(**arg_dict))
-            except KeyError as e:
-                output.append(obj)
+    output = []
+    # locale is a list or tuple. may be a single item or multiple
+    for item in locale:
+        template = templates.get(item)
+        if template is not None:
+            output.append(template.render(arg_dict))
         else:
             # Maybe string is not defined in lang file.
             Logging.info(f"localized lang string failed for key {key} in locale {item}")
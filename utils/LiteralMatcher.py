@@ -0,0 +1,145 @@
+from collections import OrderedDict, deque
+
+GUILD_MATCHERS = dict()
+
+
+class LiteralMatcher:
+    """
+    Aho-Corasick automaton over case-folded literals.
+
+    Each literal is stored with a key. Searching a text returns every key whose literal occurs somewhere in the text,
+    in a single pass no matter how many literals are loaded. Keys are tuples whose first item names the owner
+    (e.g. ('ar', trigger_id) or ('word', word)) so one automaton can be shared by several cogs.
+
+    This is only a prefilter. Callers still run their full pattern against the keys that come back.
+    """
+
+    recent_size = 16
+
+    def __init__(self):
+        self.literals = dict()
+        self.always = set()
+        self.goto = [dict()]
+        self.fail = [0]
+        self.out = [frozenset()]
+        self.dirty = False
+        self.recent = OrderedDict()
+
+    def add(self, literal: str, key):
+        literal = literal.lower()
+        if not literal:
+            self.always.add(key)
+        else:
+            self.literals.setdefault(literal, set()).add(key)
+        self.dirty = True
+
+    def add_always(self, key):
+        """Register a key that is returned for every search. Used when no literal can be extracted"""
+        self.always.add(key)
+        self.recent.clear()
+
+    def discard(self, key):
+        self.always.discard(key)
+        for literal, keys in list(self.literals.items()):
+            if key in keys:
+                keys.remove(key)
+                if not keys:
+                    del self.literals[literal]
+        self.dirty = True
+
+    def is_empty(self):
+        return not self.literals and not self.always
+
+    def clear(self, namespace):
+        """Remove all keys belonging to one owner"""
+        self.always = {key for key in self.always if key[0] != namespace}
+        for literal, keys in list(self.literals.items()):
+            keys.difference_update([key for key in keys if key[0] == namespace])
+            if not keys:
+                del self.literals[literal]
+        self.dirty = True
+
+    def build(self):
+        goto = [dict()]
+        out = [set()]
+        for literal, keys in self.literals.items():
+            state = 0
+            for char in literal:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append(dict())
+                    out.append(set())
+                state = next_state
+            out[state].update(keys)
+
+        # breadth-first to set failure links, merging outputs along the way
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[next_state] = goto[f].get(char, 0)
+                out[next_state].update(out[fail[next_state]])
+
+        self.goto = goto
+        self.fail = fail
+        self.out = [frozenset(o) for o in out]
+        self.dirty = False
+        self.recent.clear()
+
+    def search(self, text: str) -> set:
+        if self.dirty:
+            self.build()
+
+        if text in self.recent:
+            self.recent.move_to_end(text)
+            return self.recent[text]
+
+        found = set(self.always)
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+
+        self.recent[text] = found
+        if len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+        return found
+
+
+def get_guild_matcher(guild_id) -> LiteralMatcher:
+    if guild_id not in GUILD_MATCHERS:
+        GUILD_MATCHERS[guild_id] = LiteralMatcher()
+    return GUILD_MATCHERS[guild_id]
+
+
+def clear_guild_matcher(guild_id, namespace):
+    """Remove one owner's keys from a guild's matcher, and the matcher itself once no owner has keys left"""
+    matcher = GUILD_MATCHERS.get(guild_id)
+    if matcher is not None:
+        matcher.clear(namespace)
+        if matcher.is_empty():
+            del GUILD_MATCHERS[guild_id]
+
+
+def clear_all_guild_matchers(namespace):
+    """Remove one owner's keys from every guild, for when the owning cog unloads"""
+    for guild_id in list(GUILD_MATCHERS):
+        clear_guild_matcher(guild_id, namespace)
+
+
+def remove_guild_matcher(guild_id):
+    """Drop a guild's matcher for every owner, for when the bot leaves the guild"""
+    GUILD_MATCHERS.pop(guild_id, None)
@@ -0,0 +1,53 @@
+import asyncio
+from collections import OrderedDict
+
+from utils import Configuration, Permissions
+
+# message id -> MessageInfo for the most recent messages
+MESSAGES = OrderedDict()
+cache_size = 256
+
+
+class MessageInfo:
+    """
+    Facts about one message that several on_message listeners want to know.
+
+    Every listener gets the same object for a message. Each fact is worked out the first time a listener asks and
+    shared after that, including with listeners that ask while it's still being worked out.
+    """
+
+    def __init__(self, bot, message):
+        self.bot = bot
+        self.message = message
+        self.in_guild = getattr(message.channel, "guild", None) is not None
+        self.has_prefix = message.content.startswith(Configuration.CONFIG.bot_prefix, 0)
+        self._facts = dict()
+
+    async def _once(self, name, factory):
+        task = self._facts.get(name)
+        if task is None:
+            task = self._facts[name] = asyncio.ensure_future(factory())
+        # shielded so one listener being cancelled doesn't cancel the work for all of them
+        return await asyncio.shield(task)
+
+    async def context(self):
+        """Command context, as from bot.get_context"""
+        return await self._once('context', lambda: self.bot.get_context(self.message))
+
+    async def capabilities(self) -> Permissions.Capability:
+        """Capabilities of the message author, see Permissions"""
+        return await self._once('capabilities', lambda: Permissions.get_capabilities(self.message.author))
+
+
+def get(bot, message) -> MessageInfo:
+    """
+    :param bot: the bot
+    :param message: message being dispatched
+    :return: shared MessageInfo for the message
+    """
+    info = MESSAGES.get(message.id)
+    if info is None:
+        info = MESSAGES[message.id] = MessageInfo(bot, message)
+        if len(MESSAGES) > cache_size:
+            MESSAGES.popitem(last=False)
+    return info
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from enum import IntFlag
+
+from utils import Configuration, Utils
+
+
+class Capability(IntFlag):
+    NONE = 0
+    # BotAdmin table, ADMINS config or bot owner
+    BOT_ADMIN = 1 << 0
+    # roles from PermissionConfig
+    ADMIN = 1 << 1
+    MOD = 1 << 2
+    TRUSTED = 1 << 3
+    # permissions held in the home guild, carried over to every guild
+    OFFICIAL_MUTE = 1 << 4
+    OFFICIAL_BAN = 1 << 5
+    # discord permissions in the guild being checked
+    MUTE_MEMBERS = 1 << 6
+    BAN_MEMBERS = 1 << 7
+    MANAGE_CHANNELS = 1 << 8
+    MANAGE_GUILD = 1 << 9
+
+
+GUILD_PERMISSION_CAPABILITIES = {
+    'mute_members': Capability.MUTE_MEMBERS,
+    'ban_members': Capability.BAN_MEMBERS,
+    'manage_channels': Capability.MANAGE_CHANNELS,
+    'manage_guild': Capability.MANAGE_GUILD,
+}
+
+# guild_id -> set of role ids. filled by PermissionConfig
+ADMIN_ROLES = dict()
+MOD_ROLES = dict()
+TRUSTED_ROLES = dict()
+
+# member_id -> guild_id -> Capability. guild_id is None outside of guilds. least recently used member first
+CAPABILITIES = OrderedDict()
+cache_size = 4096
+# bumped on every invalidation, so a resolve that overlapped one doesn't cache a stale result
+generation = 0
+
+
+async def resolve(member) -> Capability:
+    """
+    Work out everything a member is allowed to do, ignoring the cache
+
+    :param member: guild member, or user when not in a guild
+    :return: capability bitmask
+    """
+    capabilities = Capability.NONE
+    if await Utils.BOT.member_is_admin(member.id):
+        capabilities |= Capability.BOT_ADMIN
+
+    guild = getattr(member, 'guild', None)
+    if guild is not None:
+        role_ids = {role.id for role in member.roles}
+        if not role_ids.isdisjoint(ADMIN_ROLES.get(guild.id, set())):
+            capabilities |= Capability.ADMIN
+        if not role_ids.isdisjoint(MOD_ROLES.get(guild.id, set())):
+            capabilities |= Capability.MOD
+        if not role_ids.isdisjoint(TRUSTED_ROLES.get(guild.id, set())):
+            capabilities |= Capability.TRUSTED
+
+        permissions = member.guild_permissions
+        for name, capability in GUILD_PERMISSION_CAPABILITIES.items():
+            if getattr(permissions, name):
+                capabilities |= capability
+
+    home_guild = Utils.get_home_guild()
+    official_member = home_guild.get_member(member.id) if home_guild else None
+    if official_member is not None:
+        official_permissions = official_member.guild_permissions
+        if official_permissions.mute_members:
+            capabilities |= Capability.OFFICIAL_MUTE
+        if official_permissions.ban_members:
+            capabilities |= Capability.OFFICIAL_BAN
+
+    return capabilities
+
+
+async def get_capabilities(member) -> Capability:
+    """
+    Cached capability bitmask for a member, see resolve
+
+    :param member: guild member, or user when not in a guild
+    :return: capability bitmask
+    """
+    guild = getattr(member, 'guild', None)
+    guild_id = guild.id if guild is not None else None
+    member_capabilities = CAPABILITIES.get(member.id)
+    if member_capabilities is not None and guild_id in member_capabilities:
+        CAPABILITIES.move_to_end(member.id)
+        return member_capabilities[guild_id]
+
+    started = generation
+    capabilities = await resolve(member)
+    if started == generation:
+        CAPABILITIES.setdefault(member.id, dict())[guild_id] = capabilities
+        CAPABILITIES.move_to_end(member.id)
+        if len(CAPABILITIES) > cache_size:
+            CAPABILITIES.popitem(last=False)
+    return capabilities
+
+
+async def member_has(member, capabilities: Capability) -> bool:
+    """
+    :param member: guild member, or user when not in a guild
+    :param capabilities: one or more capabilities
+    :return: True if the member has any of the given capabilities
+    """
+    return bool(await get_capabilities(member) & capabilities)
+
+
+async def check(ctx, capabilities: Capability) -> bool:
+    """
+    Permission check for a command context. Bot admins may always go ahead
+
+    :param ctx: command context
+    :param capabilities: one or more capabilities, any of which is enough
+    :return: True if the author may go ahead
+    """
+    return bool(await get_capabilities(ctx.author) & (capabilities | Capability.BOT_ADMIN))
+
+
+def invalidate_member(member_id):
+    global generation
+    generation += 1
+    CAPABILITIES.pop(member_id, None)
+
+
+def invalidate_guild(guild_id):
+    global generation
+    generation += 1
+    home_guild_id = Configuration.CONFIG.guild_id
+    if guild_id == home_guild_id:
+        # official permissions reach every guild
+        invalidate_all()
+        return
+    for member_capabilities in CAPABILITIES.values():
+        member_capabilities.pop(guild_id, None)
+
+
+def invalidate_all():
+    global generation
+    generation += 1
+    CAPABILITIES.clear()
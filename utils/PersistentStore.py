@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+
+from utils import Logging, Utils
+
+
+class PersistentBackend(ABC):
+    """
+    Storage for persistent vars. Values are kept as JSON text, one entry per key.
+
+    load_all runs once at startup. write gets only the keys that changed since the last write, and is called
+    from a worker thread, never from two threads at once.
+    """
+    # backends that can only store the whole dict at once also get it serialized, as `everything`
+    needs_everything = False
+
+    @abstractmethod
+    def load_all(self) -> dict:
+        pass
+
+    @abstractmethod
+    def write(self, changed: dict, deleted: set, everything: str = None):
+        """
+        :param changed: key -> JSON text for keys that were set
+        :param deleted: keys that were removed
+        :param everything: JSON text of all persistent vars, only when needs_everything is set
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonBackend(PersistentBackend):
+    """The original persistent.json file. Every write rewrites the whole file"""
+    needs_everything = True
+
+    def __init__(self, filename="persistent"):
+        self.filename = filename
+
+    def load_all(self) -> dict:
+        return Utils.fetch_from_disk(self.filename)
+
+    def write(self, changed: dict, deleted: set, everything: str = None):
+        Utils.save_text_to_disk(self.filename, everything)
+
+
+class SqliteBackend(PersistentBackend):
+    """One row per key in a local sqlite file. Writes touch only the keys that changed"""
+
+    def __init__(self, path="persistent.sqlite"):
+        self.path = path
+        # writes come from a worker thread. the flush lock in Configuration keeps them serial
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS persistent (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.connection.commit()
+
+    def load_all(self) -> dict:
+        rows = self.connection.execute("SELECT key, value FROM persistent").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def write(self, changed: dict, deleted: set, everything: str = None):
+        with self.connection:
+            if changed:
+                self.connection.executemany(
+                    "INSERT INTO persistent (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    changed.items())
+            if deleted:
+                self.connection.executemany("DELETE FROM persistent WHERE key = ?", [(key,) for key in deleted])
+
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM persistent LIMIT 1").fetchone() is None
+
+    def close(self):
+        self.connection.close()
+
+
+def migrate_json(backend: SqliteBackend, filename="persistent"):
+    """
+    One time import of persistent.json into an empty sqlite store. The json file is renamed afterwards so it
+    can't be imported twice, and is kept in case the switch has to be undone.
+    """
+    if not os.path.isfile(f"{filename}.json") or not backend.is_empty():
+        return
+    data = Utils.fetch_from_disk(filename)
+    backend.write({key: json.dumps(value) for key, value in data.items()}, set())
+    os.replace(f"{filename}.json", f"{filename}.json.migrated")
+    Logging.info(f"migrated {len(data)} persistent vars from {filename}.json to {backend.path}")
+
+
+def get_backend(kind) -> PersistentBackend:
+    """
+    :param kind: "sqlite" or "json"
+    :return: backend ready for load_all
+    """
+    if kind == "json":
+        return JsonBackend()
+    backend = SqliteBackend()
+    migrate_json(backend)
+    return backend
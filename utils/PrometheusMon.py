@@ -43,8 +43,16 @@ class PrometheusMon:
         # self.reports_completed = prom.Counter("", "")  # already handled by mysql report count
         self.bot_cannot_dm_member = prom.Counter("bot_cannot_dm_member", "Bot tried and failed to send DM to member")
         self.reports_in_progress = prom.Gauge("reports_in_progress", "Number of reports currently in progress")
+        self.reports_waiting = prom.Gauge("reports_waiting", "Number of reports waiting for a free slot")
+        self.reports_active = prom.Gauge("reports_active", "Number of report sessions running")
         self.reports_started = prom.Counter("reports_started", "Number of reports started")
         self.reports_restarted = prom.Counter("reports_restarted", "Number of reports restarted")
+        self.bug_reports_total = prom.Gauge("bug_reports_total", "Number of bug reports in the database",
+                                            ["platform", "branch", "app_version"])
+        self.bug_reports_today = prom.Gauge("bug_reports_today", "Number of bug reports submitted today (UTC)",
+                                            ["platform", "branch"])
+        self.bug_info_reposts_saved = prom.Counter("bug_info_reposts_saved",
+                                                   "Bug info refreshes covered by a repost that was already pending")
         self.reports_abort_count = prom.Counter("reports_abort_count", "Number of reports aborted")
         self.report_incomplete_count = prom.Counter("report_incomplete_count", "Number of reports failed")
 
@@ -117,8 +125,13 @@ class PrometheusMon:
 
         bot.metrics_reg.register(self.bot_cannot_dm_member)
         bot.metrics_reg.register(self.reports_in_progress)
+        bot.metrics_reg.register(self.reports_waiting)
+        bot.metrics_reg.register(self.reports_active)
         bot.metrics_reg.register(self.reports_started)
         bot.metrics_reg.register(self.reports_restarted)
+        bot.metrics_reg.register(self.bug_info_reposts_saved)
+        bot.metrics_reg.register(self.bug_reports_total)
+        bot.metrics_reg.register(self.bug_reports_today)
         bot.metrics_reg.register(self.reports_abort_count)
         bot.metrics_reg.register(self.report_incomplete_count)
         bot.metrics_reg.register(self.reports_question_0_duration)
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import re
+import subprocess
+import sys
+from multiprocessing.connection import Connection
+
+POOL_SIZE = 2
+DEFAULT_TIMEOUT = 2
+PATTERN_CACHE_SIZE = 512
+
+_idle = None
+_workers = set()
+# set by shutdown. no workers are started or handed out after that
+_closed = False
+
+
+class RegexTimeout(asyncio.TimeoutError):
+    pass
+
+
+class RegexServiceClosed(ConnectionError):
+    pass
+
+
+def _worker_main(reader: Connection, writer: Connection):
+    """
+    Worker process loop. Receives (pattern, flags, subject), answers ('ok', (group0, groups)), ('ok', None)
+    or ('error', message). Compiled patterns are cached so a trigger is only compiled once per worker.
+    """
+    cache = dict()
+    writer.send(('ready', None))
+    while True:
+        try:
+            pattern, flags, subject = reader.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            compiled = cache.get((pattern, flags))
+            if compiled is None:
+                if len(cache) >= PATTERN_CACHE_SIZE:
+                    cache.clear()
+                compiled = cache[(pattern, flags)] = re.compile(pattern, flags)
+            match = compiled.search(subject)
+            writer.send(('ok', None if match is None else (match[0], match.groups())))
+        except Exception as e:
+            writer.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self):
+        # a fresh interpreter running only this module. forking the bot process (event loop, threads, sockets)
+        # is not safe, and multiprocessing spawn would re-import sky.py in every worker
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "utils.RegexService"],
+            cwd=root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE)
+        self.writer = Connection(os.dup(self.process.stdin.fileno()), readable=False)
+        self.reader = Connection(os.dup(self.process.stdout.fileno()), writable=False)
+        self.process.stdin.close()
+        self.process.stdout.close()
+        # wait for the interpreter to come up so startup time doesn't count against the first search
+        self.reader.recv()
+
+    def run(self, pattern: str, flags: int, subject: str, timeout: float):
+        """Blocking round trip. Runs in an executor thread"""
+        self.writer.send((pattern, flags, subject))
+        if not self.reader.poll(timeout):
+            raise RegexTimeout()
+        return self.reader.recv()
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(1)
+        except subprocess.TimeoutExpired:
+            pass
+        self.writer.close()
+        self.reader.close()
+
+
+async def _get_worker():
+    global _idle
+    if _closed:
+        raise RegexServiceClosed()
+    if _idle is None:
+        _idle = asyncio.Queue()
+        for i in range(POOL_SIZE):
+            # None is a placeholder. the worker is started when it is first needed
+            _idle.put_nowait(None)
+    worker = await _idle.get()
+    if worker is None:
+        try:
+            worker = await asyncio.get_running_loop().run_in_executor(None, _Worker)
+        except BaseException:
+            if _idle is not None:
+                _idle.put_nowait(None)
+            raise
+        if _closed:
+            # shut down while the worker was starting
+            worker.kill()
+            raise RegexServiceClosed()
+        _workers.add(worker)
+    return worker
+
+
+def _discard_worker(worker):
+    _workers.discard(worker)
+    worker.kill()
+    if _idle is not None and not _closed:
+        _idle.put_nowait(None)
+
+
+def _release_worker(worker):
+    if _closed:
+        # a search that was still running during shutdown. nothing would ever kill the worker otherwise
+        _workers.discard(worker)
+        worker.kill()
+    else:
+        _idle.put_nowait(worker)
+
+
+async def search(pattern: re.Pattern, subject: str, timeout: float = DEFAULT_TIMEOUT):
+    """
+    Search subject with pattern in a worker process, so a runaway pattern can't block the event loop.
+    A worker that runs past the timeout is killed and replaced.
+
+    :param pattern: compiled pattern. only the pattern string and flags are sent to the worker
+    :param subject: text to search
+    :param timeout: seconds to wait for the search
+    :return: None when there's no match, otherwise a tuple of (whole match, groups tuple)
+    :raises RegexTimeout: when the search took longer than timeout
+    :raises re.error: when the worker failed to run the pattern
+    :raises RegexServiceClosed: after shutdown
+    :raises EOFError, OSError: when the worker died. it is replaced for the next search
+    """
+    worker = await _get_worker()
+    try:
+        status, result = await asyncio.get_running_loop().run_in_executor(
+            None, worker.run, pattern.pattern, pattern.flags, subject, timeout)
+    except BaseException:
+        # timed out, cancelled, or the worker died. the pipe state is unknown so the worker can't be reused
+        _discard_worker(worker)
+        raise
+    _release_worker(worker)
+    if status == 'error':
+        raise re.error(result)
+    return result
+
+
+def shutdown():
+    global _idle, _closed
+    _closed = True
+    for worker in list(_workers):
+        worker.kill()
+    _workers.clear()
+    _idle = None
+
+
+if __name__ == '__main__':
+    # stdin/stdout belong to the parent for the protocol. keep stray prints off the pipe
+    _reader = Connection(os.dup(sys.stdin.fileno()), writable=False)
+    _writer = Connection(os.dup(sys.stdout.fileno()), readable=False)
+    sys.stdout = sys.stderr
+    _worker_main(_reader, _writer)
@@ -0,0 +1,222 @@
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+# 16 bands of 4 rows: reports that share about half their words almost always land in a band together
+BANDS = 16
+BAND_ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN_PATTERN = re.compile(r"\w{3,}")
+# words nearly every report has. they only make unrelated reports look alike
+STOP_WORDS = frozenset((
+    "the", "and", "then", "when", "with", "that", "this", "for", "not", "was", "you", "are", "have", "from", "into",
+    "after", "but", "its", "can", "just", "get", "got", "there", "what", "should", "will", "would", "been", "game",
+))
+
+# fixed seed, so a report gets the same signature on every run
+_random = np.random.RandomState(0x5ca1ab1e)
+PERM_A = _random.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _random.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+# odd multipliers that mix the rows of a band into one 64 bit key
+BAND_MIX = (_random.randint(1, 1 << 62, size=BAND_ROWS, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+
+
+def report_text(title, actual, steps) -> str:
+    """:return: the parts of a report that say what the bug is, in the form the index expects"""
+    return f"{title or ''} {actual or ''} {steps or ''}"
+
+
+def tokens(text) -> set:
+    return {token for token in TOKEN_PATTERN.findall(text.casefold()) if token not in STOP_WORDS}
+
+
+def signature(text):
+    """
+    :param text: report text
+    :return: MinHash signature of the words in text, None when there are no words to go by
+    """
+    words = tokens(text)
+    if not words:
+        return None
+    hashes = np.fromiter((zlib.crc32(word.encode()) for word in words), dtype=np.uint64, count=len(words))
+    # one row per permutation. uint64 overflow just wraps, which is fine for hashing
+    permuted = (PERM_A[:, None] * hashes[None, :] + PERM_B[:, None]) % MERSENNE_PRIME
+    return (permuted & MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+def signatures(texts):
+    """
+    Signatures for many texts. Only touches its arguments, so it can run in a thread
+    :param texts: report texts
+    :return: signature or None for each text
+    """
+    return [signature(text) for text in texts]
+
+
+def band_keys(signature_rows):
+    """:return: one 64 bit key per band for each signature row"""
+    rows = signature_rows.astype(np.uint64).reshape(len(signature_rows), BANDS, BAND_ROWS)
+    return (rows * BAND_MIX).sum(axis=2, dtype=np.uint64)
+
+
+class MinHashIndex:
+    """
+    Finds reports that share most of their words with a piece of text.
+
+    Each report is kept as a MinHash signature. Candidates come from locality sensitive hashing: a report is a
+    candidate when all rows of any band match. Bands of reports that have been around a while are kept sorted and
+    searched by bisection, new reports go to a short tail that is scanned, and the tail is folded into the sorted part
+    once it grows past an eighth of it. Candidates are then ranked by how many signature rows they share.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self.keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        self.rows = dict()
+        # rows [0, merged) are in the sorted bands, the rest is the tail
+        self.merged = 0
+        self.sorted_keys = np.zeros((BANDS, 0), dtype=np.uint64)
+        self.sorted_rows = np.zeros((BANDS, 0), dtype=np.int32)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, report_id):
+        return report_id in self.rows
+
+    def latest(self, count) -> list:
+        """:return: ids of the last count reports added"""
+        return self.ids[max(0, self.size - count):self.size].tolist()
+
+    def add(self, report_id, text):
+        self.insert([report_id], [signature(text)])
+
+    def insert(self, report_ids, report_signatures):
+        """
+        :param report_ids: ids of the reports
+        :param report_signatures: signature of each report, as made by signatures(). reports without one are skipped
+        """
+        new = [(report_id, sig) for report_id, sig in zip(report_ids, report_signatures)
+               if sig is not None and report_id not in self.rows]
+        if not new:
+            return
+        self._reserve(self.size + len(new))
+        start = self.size
+        end = start + len(new)
+        self.ids[start:end] = [report_id for report_id, sig in new]
+        self.signatures[start:end] = np.stack([sig for report_id, sig in new])
+        self.keys[start:end] = band_keys(self.signatures[start:end])
+        for row, (report_id, sig) in enumerate(new, start=start):
+            self.rows[report_id] = row
+        self.size = end
+        if self.size - self.merged > max(256, self.merged // 8):
+            self._merge()
+
+    def similar(self, text, limit=5, threshold=0.5, exclude=None) -> list:
+        """
+        :param text: report text
+        :param limit: max number of results
+        :param threshold: lowest similarity to return, 0 to 1
+        :param exclude: report id to leave out, like the report itself
+        :return: (report id, similarity) pairs, most similar first
+        """
+        sig = signature(text)
+        if sig is None:
+            return []
+        return self._rank(sig, self._candidates(sig, band_keys(sig[None, :])[0]), limit, threshold, exclude)
+
+    def similar_to(self, report_id, limit=5, threshold=0.5) -> list:
+        """Same as similar, for a report that is in the index"""
+        row = self.rows.get(report_id)
+        if row is None:
+            return []
+        sig = self.signatures[row]
+        return self._rank(sig, self._candidates(sig, self.keys[row]), limit, threshold, report_id)
+
+    def clusters(self, report_ids, threshold=0.5) -> list:
+        """
+        Group reports that are similar to each other, directly or through other reports in the group.
+        Safe to run in a thread while reports are added: it works on the arrays as they were when it started
+        :param report_ids: reports to group. ids that aren't in the index are ignored
+        :param threshold: lowest similarity for two reports to be linked
+        :return: lists of report ids with more than one report, biggest first
+        """
+        # adding reports replaces the arrays when they grow, rows already in them never change
+        ids, keys, signatures = self.ids, self.keys, self.signatures
+        rows = self.rows
+        members = sorted({rows[report_id] for report_id in report_ids if report_id in rows})
+        member_rows = np.array(members, dtype=np.int64)
+        parent = {row: row for row in members}
+
+        def find(row):
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        # only reports sharing a band with each other can be linked, so bucket the members by band key and compare
+        # within the buckets instead of looking every member up in the whole index
+        member_keys = keys[member_rows]
+        for band in range(BANDS):
+            order = np.argsort(member_keys[:, band], kind='stable')
+            band_column = member_keys[order, band]
+            band_rows = member_rows[order]
+            starts = np.flatnonzero(np.concatenate(([True], band_column[1:] != band_column[:-1])))
+            ends = np.append(starts[1:], len(band_column))
+            for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+                bucket = band_rows[start:end]
+                bucket_signatures = signatures[bucket]
+                scores = (bucket_signatures[:, None, :] == bucket_signatures[None, :, :]).mean(axis=2)
+                for first, second in zip(*np.nonzero(np.triu(scores >= threshold, k=1))):
+                    parent[find(int(bucket[first]))] = find(int(bucket[second]))
+
+        groups = dict()
+        for row in members:
+            groups.setdefault(find(row), []).append(int(ids[row]))
+        return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+    def _candidates(self, sig, keys):
+        found = []
+        for band in range(BANDS):
+            band_keys_sorted = self.sorted_keys[band]
+            low = np.searchsorted(band_keys_sorted, keys[band], side='left')
+            high = np.searchsorted(band_keys_sorted, keys[band], side='right')
+            if high > low:
+                found.append(self.sorted_rows[band, low:high])
+        tail = self.keys[self.merged:self.size]
+        if len(tail):
+            found.append(np.flatnonzero((tail == keys).any(axis=1)) + self.merged)
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def _score(self, sig, candidates):
+        scores = np.count_nonzero(self.signatures[candidates] == sig, axis=1) / NUM_PERM
+        return zip(candidates.tolist(), scores.tolist())
+
+    def _rank(self, sig, candidates, limit, threshold, exclude) -> list:
+        ranked = sorted(((score, int(self.ids[row])) for row, score in self._score(sig, candidates)
+                         if score >= threshold and self.ids[row] != exclude), reverse=True)
+        return [(report_id, score) for score, report_id in ranked[:limit]]
+
+    def _reserve(self, size):
+        capacity = len(self.ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self.ids = np.resize(self.ids, capacity)
+        self.signatures = np.resize(self.signatures, (capacity, NUM_PERM))
+        self.keys = np.resize(self.keys, (capacity, BANDS))
+
+    def _merge(self):
+        keys = self.keys[:self.size].T
+        order = np.argsort(keys, axis=1, kind='stable')
+        self.sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self.sorted_rows = order.astype(np.int32)
+        self.merged = self.size
@@ -1,6 +1,8 @@
 import csv
+import io
 import json
 import math
+import os
 import re
 import time
 import traceback
@@ -15,7 +17,7 @@ from aiohttp import ClientOSError, ServerDisconnectedError
 from discord import Embed, Colour, ConnectionClosed, NotFound, guild
 from discord.abc import PrivateChannel
 
-from utils import Logging, Configuration
+from utils import Logging, Configuration, Permissions
 
 BOT: typing.Any = None
 GUILD_CONFIGS = dict()
@@ -39,7 +41,7 @@ COLOR_LIME = 0xbefc03
 
 
 def get_home_guild():
-    return BOT.get_guild(Configuration.get_var("guild_id"))
+    return BOT.get_guild(Configuration.CONFIG.guild_id)
 
 
 def validate_channel_name(channel_name):
@@ -65,11 +67,11 @@ async def fetch_last_message_by_channel(channel):
 
 
 async def permission_official_mute(ctx):
-    return permission_official(ctx.author.id, 'mute_members') or await BOT.permission_manage_bot(ctx)
+    return await Permissions.check(ctx, Permissions.Capability.OFFICIAL_MUTE)
 
 
 async def permission_official_ban(ctx):
-    return permission_official(ctx.author.id, 'ban_members') or await BOT.permission_manage_bot(ctx)
+    return await Permissions.check(ctx, Permissions.Capability.OFFICIAL_BAN)
 
 
 async def can_mod_official(ctx):
@@ -111,18 +113,6 @@ def extract_info(o):
     return info
 
 
-async def do_re_search(pattern: typing.Union[re.Pattern, str], subject: str):
-    """
-    Regex search coro to allow running regex as a task and timeout for poorly formed patterns
-    :param pattern:
-    :param subject:
-    :return:
-    """
-    # Logging.info(f"pattern is {pattern}")
-    match = re.search(pattern, subject)
-    return match
-
-
 def get_embed_and_log_exception(exception_type, bot, exception, event=None, message=None, ctx=None, *args, **kwargs):
     with sentry_sdk.push_scope() as scope:
         embed = Embed(colour=Colour(0xff0000), timestamp=datetime.utcfromtimestamp(time.time()))
@@ -355,14 +345,22 @@ def fetch_from_disk(filename, alternative=None):
 
 
 def save_to_disk(filename, data, ext="json", fields=None):
-    with open(f"{filename}.{ext}", "w", encoding="UTF-8", newline='') as file:
-        if ext == 'json':
-            json.dump(data, file, indent=4, skipkeys=True, sort_keys=True)
-        elif ext == 'csv':
-            csvwriter = csv.DictWriter(file, fieldnames=fields)
-            csvwriter.writeheader()
-            for row in data:
-                csvwriter.writerow(row)
+    buffer = io.StringIO()
+    save_to_buffer(buffer, data, ext, fields)
+    save_text_to_disk(filename, buffer.getvalue(), ext)
+
+
+def save_text_to_disk(filename, text, ext="json"):
+    """
+    Atomically write already serialized text. Safe to call from a thread
+    """
+    # write next to the target and swap it in, so a crash mid-write never leaves a truncated file
+    temp_name = f"{filename}.{ext}.tmp"
+    with open(temp_name, "w", encoding="UTF-8", newline='') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_name, f"{filename}.{ext}")
 
 
 def save_to_buffer(buffer, data, ext="json", fields=None):